@@ -2,9 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.schemas.schemas import ClientLogin, ClientCreate
 from app.crud.client import authenticate_client, get_client_by_email
+from app.crud.loaders import RequestLoaders, get_loaders
 from app.core.security import create_token, verify_token, hash_password
 from app.models.models import Client
 
@@ -75,10 +77,14 @@ async def login(
 
 async def get_current_user(
     authorization: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    loaders: RequestLoaders = Depends(get_loaders)
 ):
     """
     Retorna o cliente autenticado a partir do token JWT.
+
+    O cliente é registrado nos loaders da requisição: rotas que buscam o próprio
+    cliente autenticado pelo ID não consultam o banco de novo.
     """
     try:
         token = authorization.credentials
@@ -91,6 +97,7 @@ async def get_current_user(
                 detail="Cliente não encontrado"
             )
 
+        loaders.clients.prime(client.id, client)
         return client
 
     except Exception:
@@ -98,3 +105,16 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido ou expirado"
         )
+
+
+async def get_current_admin(current_user: Client = Depends(get_current_user)):
+    """
+    Retorna o cliente autenticado se ele possuir acesso administrativo (ADMIN_EMAILS).
+    """
+    admin_emails = {email.strip().lower() for email in settings.ADMIN_EMAILS.split(",") if email.strip()}
+    if current_user.email.lower() not in admin_emails:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso restrito a administradores"
+        )
+    return current_user
@@ -1,17 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+import json
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.crud.client import (
     create_client,
-    get_client_by_id,
-    get_all_clients,
+    get_clients_page,
+    stream_clients,
     update_client,
-    delete_client
+    delete_client,
+    start_client_deletion_job,
+    get_deletion_job,
 )
+from app.crud.loaders import RequestLoaders, get_loaders
+from app.crud.importer import import_clients, import_format, iter_body_lines, iter_records
 from app.schemas.schemas import ClientCreate, ClientOut, ClientUpdate
-from app.api.v1.auth import get_current_user
+from app.api.v1.auth import get_current_user, get_current_admin
 
 router = APIRouter(tags=["clients"])
 
@@ -31,23 +38,85 @@ async def create(
     return await create_client(db, client)
 
 
+@router.post("/import", response_model=dict)
+async def import_clients_file(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """
+    Importa clientes em lote a partir de um arquivo CSV ou NDJSON enviado no corpo.
+
+    - Requer autenticação de administrador.
+    - Content-Type `text/csv` (com cabeçalho) ou `application/x-ndjson`.
+    - Campos: `name`, `email` e `hashed_password` (bcrypt, opcional; sem ele a senha fica pendente).
+    - E-mails já cadastrados são ignorados.
+    """
+    format = import_format(request.headers.get("content-type", ""))
+    if not format:
+        raise HTTPException(status_code=415, detail="Formato não suportado. Use text/csv ou application/x-ndjson.")
+
+    return await import_clients(db, iter_records(iter_body_lines(request.stream()), format))
+
+
+async def _clients_ndjson(db: AsyncSession):
+    """
+    Gera os clientes em NDJSON (um objeto JSON por linha), bloco a bloco.
+    """
+    async for chunk in stream_clients(db, chunk_size=settings.STREAM_CHUNK_SIZE):
+        yield "".join(
+            json.dumps({"id": c.id, "name": c.name, "email": c.email}) + "\n"
+            for c in chunk
+        )
+
+
 @router.get("/", response_model=List[ClientOut])
 async def list_clients(
+    response: Response,
+    limit: int = Query(settings.CLIENTS_PAGE_SIZE, ge=1, le=500),
+    after_id: int = Query(0, ge=0),
+    format: str = Query("json", regex="^(json|ndjson)$"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    Retorna a lista de todos os clientes cadastrados.
+    Retorna a lista de clientes cadastrados, paginada por cursor.
 
     - Requer autenticação.
+    - Use `after_id` com o valor do header `X-Next-Cursor` para obter a próxima página.
+    - Com `format=ndjson`, todos os clientes são enviados em streaming (um JSON por linha),
+      lidos do banco em blocos por um cursor do lado do servidor.
     """
-    return await get_all_clients(db)
+    if format == "ndjson":
+        return StreamingResponse(_clients_ndjson(db), media_type="application/x-ndjson")
+
+    clients = await get_clients_page(db, limit=limit, after_id=after_id)
+    if len(clients) == limit:
+        next_cursor = clients[-1].id
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+        response.headers["Link"] = f'<?limit={limit}&after_id={next_cursor}>; rel="next"'
+    return clients
+
+
+@router.get("/jobs/{job_id}", response_model=dict)
+async def deletion_job_status(job_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Retorna o andamento de uma exclusão assíncrona de cliente (status e favoritos apagados).
+
+    - Não requer autenticação: o `job_id` é um identificador aleatório entregue apenas
+      ao cliente que solicitou a exclusão (cujo token deixa de valer ao final do job).
+      Por isso a resposta não identifica o cliente.
+    """
+    job = await get_deletion_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
 
 
 @router.get("/{client_id}", response_model=ClientOut)
 async def retrieve_client(
     client_id: int,
-    db: AsyncSession = Depends(get_db),
+    loaders: RequestLoaders = Depends(get_loaders),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -55,7 +124,7 @@ async def retrieve_client(
 
     - Requer autenticação.
     """
-    client = await get_client_by_id(db, client_id)
+    client = await loaders.clients.load(client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     return client
@@ -95,6 +164,8 @@ async def delete(
     Exclui a conta do cliente autenticado.
 
     - Só permite exclusão dos próprios dados.
+    - Contas com muitos favoritos são excluídas em background: a resposta é `202`
+      com o `job_id`, cujo andamento pode ser consultado em `GET /clients/jobs/{job_id}`.
     """
     if client_id != current_user.id:
         raise HTTPException(
@@ -102,6 +173,19 @@ async def delete(
             detail="Acesso negado: não é possível excluir outro cliente."
         )
 
+    if current_user.favorites_count > settings.CLIENT_DELETE_ASYNC_THRESHOLD:
+        job_id = await start_client_deletion_job(
+            db,
+            client_id,
+            chunk_size=settings.CLIENT_DELETE_CHUNK_SIZE,
+            pause=settings.CLIENT_DELETE_PAUSE,
+        )
+        return JSONResponse(status_code=202, content={
+            "message": f"Exclusão do cliente {client_id} agendada",
+            "job_id": job_id,
+            "status_url": f"/api/v1/clients/jobs/{job_id}",
+        })
+
     success = await delete_client(db, client_id)
     if not success:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
@@ -1,27 +1,134 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Optional, List
+from urllib.parse import urlencode
+import csv
+import io
+import json
 
+from app.core.cache import get_raw_cache, set_raw_cache
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.http_cache import cache_headers, is_not_modified, make_etag, not_modified
+from app.core.upstream import with_deadline
 from app.crud.favorite import (
     add_favorite,
     get_favorites_by_client,
     remove_favorite,
-    get_product_by_id,
+    favorites_page_cache_key,
+    encode_favorites_cursor,
+    stream_favorites,
+    EXPORT_COLUMNS,
 )
-from app.schemas.schemas import FavoriteCreate, FavoriteOut
-from app.api.v1.auth import get_current_user
-from app.crud.client import get_client_by_id
+from app.crud.importer import import_favorites, import_format, iter_body_lines, iter_records
+from app.schemas.schemas import FavoriteCreate, FavoriteOut, FavoritesSummary
+from app.api.v1.auth import get_current_user, get_current_admin
+from app.crud.loaders import RequestLoaders, get_loaders
 
 router = APIRouter(tags=["favorites"])
 
+# Tipos de conteúdo suportados na exportação
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def _export_chunks(db: AsyncSession, client_id: Optional[int], format: str):
+    """
+    Converte os blocos lidos do banco em NDJSON ou CSV, enviando-os à medida que chegam.
+    """
+    if format == "csv":
+        yield ",".join(EXPORT_COLUMNS) + "\r\n"
+
+    async for chunk in stream_favorites(db, client_id=client_id, chunk_size=settings.STREAM_CHUNK_SIZE):
+        rows = [
+            row[:-1] + (row[-1].isoformat() if row[-1] else None,)
+            for row in chunk
+        ]
+        if format == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            yield buffer.getvalue()
+        else:
+            yield "".join(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in rows)
+
+
+def _export_response(db: AsyncSession, client_id: Optional[int], format: str) -> StreamingResponse:
+    filename = f"favorites-{client_id if client_id is not None else 'all'}.{format}"
+    return StreamingResponse(
+        _export_chunks(db, client_id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/export")
+async def export_all_favorites(
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """
+    Exporta os favoritos de todos os clientes em NDJSON ou CSV (streaming).
+
+    - Requer autenticação de administrador.
+    - Usa os dados salvos no favorito; a API externa não é consultada.
+    """
+    return _export_response(db, None, format)
+
+
+@router.post("/import", response_model=dict)
+async def import_favorites_file(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """
+    Importa favoritos em lote a partir de um arquivo CSV ou NDJSON enviado no corpo.
+
+    - Requer autenticação de administrador.
+    - Content-Type `text/csv` (com cabeçalho) ou `application/x-ndjson`.
+    - Campos: `client_email`, `product_id`, `title`, `image`, `price` e `review`.
+    - Favoritos duplicados ou de clientes inexistentes são ignorados.
+    """
+    format = import_format(request.headers.get("content-type", ""))
+    if not format:
+        raise HTTPException(status_code=415, detail="Formato não suportado. Use text/csv ou application/x-ndjson.")
+
+    return await import_favorites(db, iter_records(iter_body_lines(request.stream()), format))
+
+
+@router.get("/{client_id}/export")
+async def export_favorites(
+    client_id: int,
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Exporta os favoritos de um cliente em NDJSON ou CSV (streaming).
+
+    - Requer autenticação.
+    - O cliente autenticado só pode exportar seus próprios favoritos.
+    - Usa os dados salvos no favorito; a API externa não é consultada.
+    """
+    if client_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Você não tem permissão para acessar os favoritos desse cliente.")
+
+    return _export_response(db, client_id, format)
+
 
 @router.get("/{client_id}", response_model=List[FavoriteOut])
 async def list_favorites(
     client_id: int,
-    limit: int = 10,
-    offset: int = 0,
+    request: Request,
+    limit: int = Query(10, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    sort: str = Query("id", regex="^-?(id|price|created_at|title)$"),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    after: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
+    loaders: RequestLoaders = Depends(get_loaders),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -29,40 +136,91 @@ async def list_favorites(
 
     - Requer autenticação.
     - O cliente autenticado só pode acessar seus próprios favoritos.
-    - Os dados retornados incluem informações completas dos produtos (título, imagem, preço e review).
+    - Os dados retornados incluem informações completas dos produtos (título, imagem, preço e review),
+      servidas a partir do banco; um job em background as mantém atualizadas com a API externa.
+    - `sort` ordena por `id`, `price`, `created_at` ou `title` (prefixo `-` para ordem decrescente)
+      e `min_price`/`max_price` filtram pelo preço; ambos são resolvidos no banco.
+    - Paginação por cursor: use `after` com o valor do header `X-Next-Cursor` para obter a próxima
+      página (`offset` continua disponível).
+    - As páginas ficam em cache pela versão da lista de favoritos do cliente até a próxima alteração.
+    - Suporta requisições condicionais: a ETag vem da versão da lista e o Last-Modified da data
+      da última alteração; se a cópia do cliente ainda for válida, retorna 304 sem corpo.
     """
-    client = await get_client_by_id(db, client_id)
+    client = await loaders.clients.load(client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
 
     if client.id != current_user.id:
         raise HTTPException(status_code=403, detail="Você não tem permissão para acessar os favoritos desse cliente.")
 
-    favorites = await get_favorites_by_client(db, client_id, limit=limit, offset=offset)
+    params = {"limit": limit, "sort": sort, "min_price": min_price, "max_price": max_price}
+    params = {key: value for key, value in params.items() if value is not None}
+    page_params = urlencode({**params, "offset": offset, "after": after or ""})
+
+    # Validação antes de qualquer leitura de cache, consulta ou serialização da página
+    etag = make_etag(client_id, client.favorites_version, page_params)
+    last_modified = client.favorites_updated_at or client.created_at
+    headers = cache_headers(etag, last_modified, cache_control="private, no-cache")
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(headers)
+
+    # Valor em cache: cursor da próxima página (vazio na última) + página serializada
+    cache_key = favorites_page_cache_key(client_id, client.favorites_version, page_params)
+    cached_page = await get_raw_cache(cache_key)
+    if cached_page is not None:
+        next_cursor, page = cached_page.split("\n", 1)
+    else:
+        try:
+            favorites = await get_favorites_by_client(
+                db, client_id, limit=limit, offset=offset,
+                sort=sort, min_price=min_price, max_price=max_price, after=after,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        next_cursor = encode_favorites_cursor(favorites[-1], sort) if len(favorites) == limit else ""
+        page = json.dumps([FavoriteOut.from_orm(favorite).dict() for favorite in favorites])
+        await set_raw_cache(cache_key, f"{next_cursor}\n{page}", expire=settings.FAVORITES_PAGE_CACHE_TTL)
+
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<?{urlencode({**params, "after": next_cursor})}>; rel="next"'
+    return Response(content=page, media_type="application/json", headers=headers)
+
 
-    full_favorites = []
-    for favorite in favorites:
-        product_data = await get_product_by_id(favorite.product_id)
-        if product_data:
-            favorite_data = {
-                "id": favorite.id,
-                "client_id": favorite.client_id,
-                "product_id": favorite.product_id,
-                "title": product_data["title"],
-                "image": product_data["image"],
-                "price": product_data["price"],
-                "review": product_data.get("rating", {}).get("rate", None)
-            }
-            full_favorites.append(favorite_data)
+@router.get("/{client_id}/summary", response_model=FavoritesSummary)
+async def favorites_summary(
+    client_id: int,
+    db: AsyncSession = Depends(get_db),
+    loaders: RequestLoaders = Depends(get_loaders),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Retorna a quantidade de favoritos e o valor total da lista do cliente.
+
+    - Requer autenticação.
+    - Leitura O(1): os contadores são mantidos a cada inclusão/remoção de favorito.
+    """
+    client = await loaders.clients.load(client_id)
+    if not client:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+
+    if client.id != current_user.id:
+        raise HTTPException(status_code=403, detail="Você não tem permissão para acessar os favoritos desse cliente.")
 
-    return full_favorites
+    return FavoritesSummary(
+        client_id=client.id,
+        count=client.favorites_count,
+        total_price=round(client.favorites_price_sum, 2),
+    )
 
 
-@router.post("/{client_id}", response_model=FavoriteOut)
+@router.post("/{client_id}", response_model=FavoriteOut, dependencies=[Depends(with_deadline(settings.FAVORITES_SLA_SECONDS))])
 async def create_favorite(
     client_id: int,
     favorite: FavoriteCreate,
     db: AsyncSession = Depends(get_db),
+    loaders: RequestLoaders = Depends(get_loaders),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -72,14 +230,14 @@ async def create_favorite(
     - O produto é validado via API externa antes de ser salvo.
     - Se o produto já estiver nos favoritos, uma exceção será lançada.
     """
-    client = await get_client_by_id(db, client_id)
+    client = await loaders.clients.load(client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
 
     if client.id != current_user.id:
         raise HTTPException(status_code=403, detail="Você não tem permissão para adicionar favoritos para outro cliente.")
 
-    product = await get_product_by_id(favorite.product_id)
+    product = await loaders.products.load(favorite.product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Produto não encontrado")
 
@@ -95,6 +253,7 @@ async def delete_favorite(
     client_id: int,
     product_id: int,
     db: AsyncSession = Depends(get_db),
+    loaders: RequestLoaders = Depends(get_loaders),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -103,7 +262,7 @@ async def delete_favorite(
     - O cliente autenticado deve ser o mesmo informado na URL.
     - Caso o produto não esteja nos favoritos, retorna erro 404.
     """
-    client = await get_client_by_id(db, client_id)
+    client = await loaders.clients.load(client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
 
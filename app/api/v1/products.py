@@ -1,10 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, Response
 import httpx
+import json
 import logging
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, HttpUrl
 
-from app.core.cache import get_cache, set_cache
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.leaderboard import favorites_leaderboard
+from app.core.http_cache import cache_headers, content_etag, is_not_modified, not_modified
+from app.core.upstream import with_deadline
+from app.core.search import SORTS, product_index
+from app.crud.product import CATALOG_CACHE_KEY, ensure_product_index, fetch_catalog, get_product_raw
+from app.schemas.schemas import LeaderboardEntry
 
 # Configuração de logger
 logging.basicConfig(level=logging.INFO)
@@ -27,25 +35,28 @@ class Product(BaseModel):
     image: HttpUrl
     price: float
     rating: dict
+    category: Optional[str] = None
 
 router = APIRouter(tags=["products"])
 
 
 async def fetch_products() -> List[Product]:
     """
-    Busca todos os produtos da API externa. Em caso de erro ou timeout, retorna dados simulados.
+    Busca todos os produtos, com cache Redis. Em caso de erro ou timeout da API externa,
+    retorna dados simulados.
     """
+    cached = await get_cache(CATALOG_CACHE_KEY)
+    if cached:
+        return [Product(**product) for product in cached]
+
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get("https://fakestoreapi.com/products")
-            response.raise_for_status()
-            return [Product(**product) for product in response.json()]
+        return [Product(**product) for product in await fetch_catalog()]
     except (httpx.TimeoutException, httpx.RequestError):
         logger.warning("API externa demorou ou falhou. Retornando dados simulados.")
         return [Product(**product) for product in fake_products]
 
 
-@router.get("/", response_model=List[Product])
+@router.get("/", response_model=List[Product], dependencies=[Depends(with_deadline(settings.PRODUCTS_SLA_SECONDS))])
 async def list_products():
     """
     Lista todos os produtos disponíveis.
@@ -55,40 +66,82 @@ async def list_products():
     return await fetch_products()
 
 
-async def fetch_product_details(product_id: int) -> Product:
+@router.get("/leaderboard", response_model=List[LeaderboardEntry])
+async def products_leaderboard(limit: int = Query(10, ge=1, le=100)):
     """
-    Busca os detalhes de um produto específico, com cache Redis.
+    Ranking dos produtos mais favoritados.
 
-    - Primeiro tenta obter do cache.
-    - Se não existir no cache, busca na API externa.
-    - Em caso de falha, retorna um produto simulado.
+    - Servido a partir de um sorted set no Redis, atualizado a cada inclusão/remoção de
+      favorito e reconciliado periodicamente com o banco (O(log n + K) por consulta).
+    - Se o Redis estiver indisponível, usa a cópia em memória do worker.
     """
-    cache_key = f"product:{product_id}"
-    cached = await get_cache(cache_key)
-    if cached:
-        logger.info(f"[CACHE] Produto {product_id} retornado do Redis")
-        return Product(**cached)
+    return [
+        LeaderboardEntry(product_id=product_id, favorites=favorites)
+        for product_id, favorites in await favorites_leaderboard.top(limit)
+    ]
+
+
+@router.get("/search", response_model=List[Product])
+async def search_products(
+    response: Response,
+    q: Optional[str] = Query(None, description="Termos do título (todos devem aparecer; aceita prefixos)"),
+    category: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    sort: str = Query("relevance", regex=f"^({'|'.join(SORTS)})$"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Busca produtos por título, categoria e faixa de preço, com ordenação.
 
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"https://fakestoreapi.com/products/{product_id}")
-            response.raise_for_status()
-            product_data = response.json()
+    - Executada no índice em memória do worker (índice invertido e preços ordenados),
+      construído a partir do catálogo em cache; a API externa não é consultada.
+    - O total de produtos encontrados é retornado no header `X-Total-Count`.
+    """
+    await ensure_product_index()
+    total, products = product_index.search(
+        q=q, category=category, min_price=min_price, max_price=max_price,
+        sort=sort, limit=limit, offset=offset,
+    )
+    response.headers["X-Total-Count"] = str(total)
+    return products
 
-            await set_cache(cache_key, product_data, expire=300)
-            logger.info(f"[API] Produto {product_id} buscado da API externa")
-            return Product(**product_data)
 
+async def fetch_product_raw(product_id: int) -> Optional[str]:
+    """
+    Busca um produto já serializado (JSON), com cache Redis.
+
+    - Primeiro tenta obter do cache.
+    - Se não existir no cache, busca na API externa e armazena no cache (com os validadores da resposta).
+    - Em caso de falha da API externa, retorna None.
+    """
+    try:
+        return await get_product_raw(product_id)
     except (httpx.TimeoutException, httpx.RequestError):
         logger.warning(f"Falha ao buscar produto {product_id}. Usando dados simulados.")
-        return Product(**fake_products[0])
-
-    raise HTTPException(status_code=404, detail="Produto não encontrado")
+        return None
 
 
-@router.get("/{product_id}", response_model=Product)
-async def get_product(product_id: int):
+@router.get("/{product_id}", response_model=Product, dependencies=[Depends(with_deadline(settings.PRODUCTS_SLA_SECONDS))])
+async def get_product(product_id: int, request: Request):
     """
     Retorna os detalhes de um produto pelo ID, com uso de cache Redis.
+
+    Suporta requisições condicionais: a ETag é o hash do produto em cache e, se coincidir
+    com If-None-Match, retorna 304 sem desserializar nem validar o produto.
+    O produto simulado (fallback) é retornado sem ETag.
     """
-    return await fetch_product_details(product_id)
+    product_data = await fetch_product_raw(product_id)
+    if product_data is None:
+        return Product(**fake_products[0])
+
+    headers = cache_headers(content_etag(product_data))
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified(headers)
+
+    return Response(
+        content=Product(**json.loads(product_data)).json(),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,49 @@
+"""
+Importação em lote de clientes e favoritos a partir de arquivos CSV ou NDJSON.
+
+Uso:
+    python -m app.commands.import_data clients clientes.csv
+    python -m app.commands.import_data favorites favoritos.ndjson
+"""
+import argparse
+import asyncio
+import sys
+
+from app.core.database import SessionLocal
+from app.crud.importer import import_clients, import_favorites, import_format, iter_records
+
+IMPORTERS = {"clients": import_clients, "favorites": import_favorites}
+
+
+async def _file_lines(path: str):
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            yield line.rstrip("\r\n")
+
+
+async def run(kind: str, path: str, format: str) -> dict:
+    """
+    Executa a importação do arquivo informado.
+    """
+    async with SessionLocal() as session:
+        return await IMPORTERS[kind](session, iter_records(_file_lines(path), format))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa clientes ou favoritos em lote.")
+    parser.add_argument("kind", choices=IMPORTERS.keys(), help="Tipo de dado a importar")
+    parser.add_argument("path", help="Arquivo CSV (com cabeçalho) ou NDJSON")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Formato do arquivo (padrão: pela extensão)")
+    args = parser.parse_args()
+
+    format = args.format or import_format(args.path)
+    if not format:
+        parser.error("Não foi possível identificar o formato do arquivo. Use --format.")
+
+    result = asyncio.run(run(args.kind, args.path, format))
+    print(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
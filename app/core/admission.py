@@ -0,0 +1,180 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Rotas de saúde e documentação nunca passam pelo controle de admissão
+EXEMPT_PATHS = {"/", "/ready", "/metrics", "/docs", "/redoc", "/openapi.json"}
+
+# Prefixo das rotas de autenticação, que possuem fila própria (prioritária)
+AUTH_PREFIX = "/api/v1/auth"
+
+
+class RouteClassLimiter:
+    """
+    Limite de concorrência de uma classe de rotas, com fila de espera limitada.
+
+    Atributos:
+        name (str): Nome da classe de rotas (auth, read, write).
+        max_concurrency (int): Requisições processadas simultaneamente.
+        max_queue (int): Requisições aguardando na fila.
+        max_queue_time (float): Tempo máximo de espera na fila (em segundos).
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_queue_time: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queue_time = max_queue_time
+        self.active = 0
+        self.waiters = deque()
+        self.admitted = 0
+        self.shed = 0
+
+    async def acquire(self) -> bool:
+        """
+        Tenta obter uma vaga de execução.
+
+        Returns:
+            bool: True se admitida, False se a requisição deve ser descartada.
+        """
+        if self.active < self.max_concurrency and not self.waiters:
+            self.active += 1
+            self.admitted += 1
+            return True
+
+        if len(self.waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_queue_time)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self.shed += 1
+            return False
+        except BaseException:
+            # Cliente desconectou: devolve a vaga caso ela já tenha sido repassada
+            self._discard(waiter)
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+        self.admitted += 1
+        return True
+
+    def release(self):
+        """
+        Libera a vaga, repassando-a diretamente ao próximo da fila (se houver).
+        """
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self.waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queue_depth": len(self.waiters),
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+class AdmissionController:
+    """
+    Agrupa os limitadores por classe de rotas e decide a classe de cada requisição.
+    """
+
+    def __init__(
+        self,
+        auth_concurrency: int = settings.ADMISSION_AUTH_CONCURRENCY,
+        read_concurrency: int = settings.ADMISSION_READ_CONCURRENCY,
+        write_concurrency: int = settings.ADMISSION_WRITE_CONCURRENCY,
+        max_queue: int = settings.ADMISSION_MAX_QUEUE,
+        max_queue_time: float = settings.ADMISSION_MAX_QUEUE_TIME,
+        retry_after: int = settings.ADMISSION_RETRY_AFTER,
+    ):
+        self.retry_after = retry_after
+        self.limiters: Dict[str, RouteClassLimiter] = {
+            "auth": RouteClassLimiter("auth", auth_concurrency, max_queue, max_queue_time),
+            "read": RouteClassLimiter("read", read_concurrency, max_queue, max_queue_time),
+            "write": RouteClassLimiter("write", write_concurrency, max_queue, max_queue_time),
+        }
+
+    def classify(self, method: str, path: str) -> Optional[RouteClassLimiter]:
+        """
+        Retorna o limitador da rota, ou None para rotas isentas (saúde e documentação).
+        """
+        if path in EXEMPT_PATHS:
+            return None
+        if path.startswith(AUTH_PREFIX):
+            return self.limiters["auth"]
+        if method in ("GET", "HEAD", "OPTIONS"):
+            return self.limiters["read"]
+        return self.limiters["write"]
+
+    def stats(self) -> dict:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+class AdmissionControlMiddleware:
+    """
+    Middleware ASGI de controle de admissão.
+
+    Limita a concorrência por classe de rotas e responde rapidamente com 503 e
+    Retry-After quando a fila de espera está cheia ou o tempo de fila é excedido.
+    """
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.controller.classify(scope["method"], scope["path"])
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            logger.warning(f"[Admission] Requisição descartada ({limiter.name}): {scope['method']} {scope['path']}")
+            await self._reject(send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": "Servidor sobrecarregado. Tente novamente em instantes."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.controller.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Agrupa itens enviados por requisições concorrentes e os processa em lote (group commit).
+
+    Um lote é enviado quando atinge `max_items` itens ou quando a janela de `window`
+    segundos, aberta pelo primeiro item, termina — o que ocorrer primeiro. Janelas
+    maiores formam lotes maiores (mais vazão) ao custo de mais latência por requisição.
+
+    A função de processamento recebe a lista de itens e devolve um resultado por item,
+    na mesma ordem; um resultado que seja uma exceção é lançado apenas para quem enviou
+    aquele item. Se a função falhar por inteiro, todos os itens do lote recebem o erro.
+
+    Atributos:
+        flush (Callable): Corrotina que processa um lote de itens.
+        window (float): Tempo máximo de espera por mais itens (em segundos).
+        max_items (int): Tamanho máximo do lote.
+    """
+
+    def __init__(self, flush: Callable[[List[Any]], Awaitable[List[Any]]], window: float, max_items: int):
+        self.flush = flush
+        self.window = window
+        self.max_items = max_items
+        self.pending: List[tuple] = []
+        self.batches = 0
+        self.items = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Adiciona um item ao lote em formação e aguarda o resultado do seu processamento.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((item, future))
+        if len(self.pending) >= self.max_items:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._dispatch)
+        return await future
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[tuple]):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.flush([item for item, _ in batch])
+        except Exception as e:
+            logger.error(f"[Batch] Erro ao processar lote de {len(batch)} item(ns): {e}")
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            # A requisição pode ter sido cancelada (ex: prazo esgotado) enquanto aguardava
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self):
+        """
+        Envia o lote em formação e aguarda os lotes em andamento (encerramento do worker).
+        """
+        self._dispatch()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -1,20 +1,50 @@
 import redis.asyncio as redis
+import asyncio
 import json
 import logging
-from typing import Optional
+from typing import List, Optional
+
+from app.core.cache_backends import create_cache_backend
+from app.core.config import settings
+from app.core.tracing import CLIENT, tracer
+from app.core.write_behind import WriteBehindQueue
 
 # Configuração do logger
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-# URL padrão do Redis (pode ser movida para .env futuramente)
-REDIS_URL = "redis://redis:6379"
-redis_client = redis.from_url(REDIS_URL, encoding="utf-8", decode_responses=True)
+# Cliente Redis do worker (usado pelo backend "redis" e pelo ranking de favoritos)
+redis_client = redis.from_url(
+    settings.REDIS_URL, encoding="utf-8", decode_responses=True, max_connections=settings.REDIS_POOL_SIZE
+)
+
+# Backend de cache configurado (CACHE_BACKEND), usado pelas funções abaixo
+cache_backend = create_cache_backend(
+    settings.CACHE_BACKEND,
+    redis_client,
+    max_entries=settings.CACHE_MEMORY_MAX_ENTRIES,
+    failover=settings.CACHE_FAILOVER,
+    retry_interval=settings.CACHE_FAILOVER_RETRY,
+)
+
+# Gravações feitas em segundo plano (write-behind), sem aguardar o cache
+write_behind = WriteBehindQueue(
+    cache_backend,
+    max_size=settings.CACHE_WRITE_BEHIND_QUEUE_SIZE,
+    batch_size=settings.CACHE_WRITE_BEHIND_BATCH_SIZE,
+)
+
+
+def _span(operation: str, **attributes):
+    """
+    Span (tracing) de um comando de cache; não faz nada fora de requisições amostradas.
+    """
+    return tracer.span(f"cache {operation}", CLIENT, **{"db.system": cache_backend.name, "db.operation": operation}, **attributes)
 
 
 async def get_cache(key: str) -> Optional[dict]:
     """
-    Recupera um valor do Redis a partir de uma chave.
+    Recupera um valor do cache a partir de uma chave.
 
     Args:
         key (str): A chave do cache.
@@ -22,24 +52,138 @@ async def get_cache(key: str) -> Optional[dict]:
     Returns:
         dict | None: O valor armazenado (deserializado), ou None se não encontrado ou erro.
     """
-    try:
-        data = await redis_client.get(key)
-        return json.loads(data) if data else None
-    except Exception as e:
-        logger.warning(f"[Redis] Erro ao ler cache para '{key}': {e}")
-        return None
+    with _span("GET", **{"cache.key": key}):
+        try:
+            data = await cache_backend.get(key)
+            return json.loads(data) if data else None
+        except Exception as e:
+            logger.warning(f"[Cache] Erro ao ler cache para '{key}': {e}")
+            return None
 
 
 async def set_cache(key: str, value: dict, expire: int = 300):
     """
-    Armazena um valor no Redis com expiração (TTL).
+    Armazena um valor no cache com expiração (TTL).
 
     Args:
         key (str): A chave para armazenar o valor.
         value (dict): O valor a ser armazenado.
         expire (int): Tempo de expiração em segundos (padrão: 5 minutos).
     """
-    try:
-        await redis_client.set(key, json.dumps(value), ex=expire)
-    except Exception as e:
-        logger.warning(f"[Redis] Erro ao salvar cache para '{key}': {e}")
+    with _span("SET", **{"cache.key": key}):
+        try:
+            await cache_backend.set(key, json.dumps(value), ex=expire)
+        except Exception as e:
+            logger.warning(f"[Cache] Erro ao salvar cache para '{key}': {e}")
+
+
+async def get_raw_cache(key: str) -> Optional[str]:
+    """
+    Recupera um valor já serializado do cache, sem deserializar.
+
+    Args:
+        key (str): A chave do cache.
+
+    Returns:
+        str | None: O conteúdo armazenado, ou None se não encontrado ou erro.
+    """
+    with _span("GET", **{"cache.key": key}):
+        try:
+            return await cache_backend.get(key)
+        except Exception as e:
+            logger.warning(f"[Cache] Erro ao ler cache para '{key}': {e}")
+            return None
+
+
+async def set_raw_cache(key: str, value: str, expire: int = 300):
+    """
+    Armazena um valor já serializado no cache com expiração (TTL).
+
+    Args:
+        key (str): A chave para armazenar o valor.
+        value (str): O conteúdo serializado.
+        expire (int): Tempo de expiração em segundos (padrão: 5 minutos).
+    """
+    with _span("SET", **{"cache.key": key}):
+        try:
+            await cache_backend.set(key, value, ex=expire)
+        except Exception as e:
+            logger.warning(f"[Cache] Erro ao salvar cache para '{key}': {e}")
+
+
+async def set_cache_later(key: str, value: dict, expire: int = 300):
+    """
+    Enfileira a gravação de um valor no cache, sem aguardar o envio (write-behind).
+    Com CACHE_WRITE_BEHIND desativado, equivale a set_cache.
+
+    Args:
+        key (str): A chave para armazenar o valor.
+        value (dict): O valor a ser armazenado.
+        expire (int): Tempo de expiração em segundos (padrão: 5 minutos).
+    """
+    await set_raw_cache_later(key, json.dumps(value), expire)
+
+
+async def set_raw_cache_later(key: str, value: str, expire: int = 300):
+    """
+    Enfileira a gravação de um valor já serializado no cache, sem aguardar o envio
+    (write-behind). Com CACHE_WRITE_BEHIND desativado, equivale a set_raw_cache.
+
+    Args:
+        key (str): A chave para armazenar o valor.
+        value (str): O conteúdo serializado.
+        expire (int): Tempo de expiração em segundos (padrão: 5 minutos).
+    """
+    if not settings.CACHE_WRITE_BEHIND:
+        await set_raw_cache(key, value, expire)
+        return
+    if not write_behind.put(key, value, ex=expire):
+        logger.debug(f"[Cache] Fila de gravação cheia; '{key}' não será gravada.")
+
+
+async def get_many_raw_cache(keys: List[str]) -> List[Optional[str]]:
+    """
+    Recupera vários valores já serializados em uma única ida ao cache (MGET no Redis).
+
+    Args:
+        keys (List[str]): As chaves do cache.
+
+    Returns:
+        List[str | None]: Os conteúdos, na ordem das chaves (None se ausente ou erro).
+    """
+    with _span("MGET", **{"cache.keys": len(keys)}):
+        try:
+            return await cache_backend.mget(keys)
+        except Exception as e:
+            logger.warning(f"[Cache] Erro ao ler cache para {keys}: {e}")
+            return [None] * len(keys)
+
+
+async def touch_cache(keys: List[str], expire: int = 300) -> List[bool]:
+    """
+    Renova a expiração (TTL) de chaves existentes sem reescrever seus valores (EXPIRE em pipeline no Redis).
+
+    Args:
+        keys (List[str]): As chaves a renovar.
+        expire (int): Nova expiração em segundos.
+
+    Returns:
+        List[bool]: Para cada chave, True se ela ainda existia e foi renovada.
+    """
+    with _span("EXPIRE", **{"cache.keys": len(keys)}):
+        try:
+            return await cache_backend.expire(keys, expire)
+        except Exception as e:
+            logger.warning(f"[Cache] Erro ao renovar expiração de {keys}: {e}")
+            return [False] * len(keys)
+
+
+async def warm_up_cache(connections: int):
+    """
+    Abre conexões com o cache antes do worker receber tráfego (PINGs simultâneos,
+    cada um usando uma conexão do pool do Redis).
+
+    Args:
+        connections (int): Quantidade de conexões a abrir.
+    """
+    await asyncio.gather(*(cache_backend.ping() for _ in range(connections)))
@@ -0,0 +1,345 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Falhas que indicam Redis inacessível (e não um erro do comando)
+UNAVAILABLE_ERRORS = (RedisConnectionError, RedisTimeoutError, OSError)
+
+
+class CacheBackend(ABC):
+    """
+    Interface dos backends de cache. Os valores são strings já serializadas e as
+    expirações são dadas em segundos.
+
+    Atributos:
+        name (str): Nome do backend (usado nos logs, no tracing e nas métricas).
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Lê um valor (None se a chave não existir ou tiver expirado).
+        """
+
+    @abstractmethod
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """
+        Lê vários valores de uma vez, na ordem das chaves.
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ex: Optional[int] = None, nx: bool = False) -> bool:
+        """
+        Grava um valor. Com `nx=True`, só grava se a chave não existir.
+
+        Returns:
+            bool: True se o valor foi gravado.
+        """
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> int:
+        """
+        Remove chaves.
+
+        Returns:
+            int: Quantidade de chaves que existiam.
+        """
+
+    @abstractmethod
+    async def set_many(self, items: List[Tuple[str, str, Optional[int]]]):
+        """
+        Grava vários valores de uma vez: pares (chave, valor, expiração).
+        """
+
+    @abstractmethod
+    async def expire(self, keys: List[str], ex: int) -> List[bool]:
+        """
+        Renova a expiração de chaves existentes.
+
+        Returns:
+            List[bool]: Para cada chave, True se ela ainda existia e foi renovada.
+        """
+
+    @abstractmethod
+    async def ping(self) -> bool:
+        """
+        Verifica se o backend está acessível.
+        """
+
+    def redis_client(self) -> Optional[redis.Redis]:
+        """
+        Cliente Redis para estruturas que a interface não cobre (ex: sorted sets do ranking),
+        ou None se o backend em uso não é o Redis.
+        """
+        return None
+
+    def reset(self):
+        """
+        Descarta o estado mantido no worker (dados em memória, falhas registradas).
+        """
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class RedisBackend(CacheBackend):
+    """
+    Cache compartilhado entre os workers, no Redis.
+    """
+
+    name = "redis"
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        return await self.client.mget(keys)
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None, nx: bool = False) -> bool:
+        return bool(await self.client.set(key, value, ex=ex, nx=nx))
+
+    async def set_many(self, items: List[Tuple[str, str, Optional[int]]]):
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value, ex in items:
+                pipe.set(key, value, ex=ex)
+            await pipe.execute()
+
+    async def delete(self, *keys: str) -> int:
+        return await self.client.delete(*keys)
+
+    async def expire(self, keys: List[str], ex: int) -> List[bool]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.expire(key, ex)
+            return [bool(renewed) for renewed in await pipe.execute()]
+
+    async def ping(self) -> bool:
+        return await self.client.ping()
+
+    def redis_client(self) -> Optional[redis.Redis]:
+        return self.client
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Cache em memória do worker, com expiração (TTL) e número máximo de chaves.
+
+    Ao atingir o limite, a chave usada há mais tempo (LRU) é descartada; chaves expiradas
+    são removidas ao serem lidas. Não é compartilhado entre workers.
+
+    Atributos:
+        max_entries (int): Número máximo de chaves mantidas.
+        clock (Callable): Relógio monotônico usado nas expirações (substituível nos testes).
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self.evictions = 0
+
+    def _lookup(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= self.clock():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._lookup(key)
+        return entry[0] if entry else None
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None, nx: bool = False) -> bool:
+        if nx and self._lookup(key) is not None:
+            return False
+        if key not in self.entries and len(self.entries) >= self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        self.entries[key] = (value, self.clock() + ex if ex is not None else None)
+        self.entries.move_to_end(key)
+        return True
+
+    async def set_many(self, items: List[Tuple[str, str, Optional[int]]]):
+        for key, value, ex in items:
+            await self.set(key, value, ex=ex)
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._lookup(key) is not None:
+                del self.entries[key]
+                removed += 1
+        return removed
+
+    async def expire(self, keys: List[str], ex: int) -> List[bool]:
+        renewed = []
+        for key in keys:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.entries[key] = (entry[0], self.clock() + ex)
+            renewed.append(entry is not None)
+        return renewed
+
+    async def ping(self) -> bool:
+        return True
+
+    def reset(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "entries": len(self.entries), "evictions": self.evictions}
+
+
+class NullBackend(CacheBackend):
+    """
+    Cache desativado: nada é gravado e toda leitura é uma ausência.
+    """
+
+    name = "null"
+
+    async def get(self, key: str) -> Optional[str]:
+        return None
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        return [None] * len(keys)
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None, nx: bool = False) -> bool:
+        return True
+
+    async def set_many(self, items: List[Tuple[str, str, Optional[int]]]):
+        pass
+
+    async def delete(self, *keys: str) -> int:
+        return 0
+
+    async def expire(self, keys: List[str], ex: int) -> List[bool]:
+        return [False] * len(keys)
+
+    async def ping(self) -> bool:
+        return True
+
+
+class FailoverBackend(CacheBackend):
+    """
+    Usa o backend principal (Redis) e, quando ele está inacessível, o cache em memória.
+
+    Uma falha de conexão desvia os comandos para a memória por `retry_interval` segundos;
+    depois disso o principal é tentado novamente. Ao voltar para o principal, a cópia em
+    memória é descartada (os dados gravados durante a falha não são reaproveitados).
+    Erros dos comandos que não indicam indisponibilidade são repassados normalmente.
+
+    Atributos:
+        primary (CacheBackend): Backend principal.
+        fallback (MemoryBackend): Backend usado durante a indisponibilidade.
+        retry_interval (float): Tempo (em segundos) até tentar o principal novamente.
+    """
+
+    def __init__(self, primary: CacheBackend, fallback: MemoryBackend, retry_interval: float = 30.0):
+        self.primary = primary
+        self.fallback = fallback
+        self.retry_interval = retry_interval
+        self.down_until: Optional[float] = None
+        self.failovers = 0
+
+    @property
+    def name(self) -> str:
+        return self.fallback.name if self.down_until is not None else self.primary.name
+
+    async def _call(self, method: str, *args, **kwargs):
+        if self.down_until is not None and time.monotonic() < self.down_until:
+            return await getattr(self.fallback, method)(*args, **kwargs)
+        try:
+            result = await getattr(self.primary, method)(*args, **kwargs)
+        except UNAVAILABLE_ERRORS as e:
+            if self.down_until is None:
+                self.failovers += 1
+                logger.warning(
+                    f"[Cache] {self.primary.name} indisponível ({e}). "
+                    f"Usando cache em memória por {self.retry_interval:.0f}s."
+                )
+            self.down_until = time.monotonic() + self.retry_interval
+            return await getattr(self.fallback, method)(*args, **kwargs)
+        if self.down_until is not None:
+            logger.info(f"[Cache] {self.primary.name} disponível novamente.")
+            self.down_until = None
+            self.fallback.reset()
+        return result
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._call("get", key)
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        return await self._call("mget", keys)
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None, nx: bool = False) -> bool:
+        return await self._call("set", key, value, ex=ex, nx=nx)
+
+    async def set_many(self, items: List[Tuple[str, str, Optional[int]]]):
+        return await self._call("set_many", items)
+
+    async def delete(self, *keys: str) -> int:
+        return await self._call("delete", *keys)
+
+    async def expire(self, keys: List[str], ex: int) -> List[bool]:
+        return await self._call("expire", keys, ex)
+
+    async def ping(self) -> bool:
+        return await self._call("ping")
+
+    def redis_client(self) -> Optional[redis.Redis]:
+        if self.down_until is not None and time.monotonic() < self.down_until:
+            return None
+        return self.primary.redis_client()
+
+    def reset(self):
+        self.down_until = None
+        self.fallback.reset()
+
+    def stats(self) -> dict:
+        return {**self.fallback.stats(), "backend": self.name, "failovers": self.failovers}
+
+
+def create_cache_backend(
+    kind: str,
+    redis_client: redis.Redis,
+    max_entries: int,
+    failover: bool,
+    retry_interval: float,
+) -> CacheBackend:
+    """
+    Cria o backend de cache configurado ("redis", "memory" ou "null").
+
+    Raises:
+        ValueError: Se o tipo de backend for desconhecido.
+    """
+    if kind == "redis":
+        backend = RedisBackend(redis_client)
+        if failover:
+            return FailoverBackend(backend, MemoryBackend(max_entries), retry_interval)
+        return backend
+    if kind == "memory":
+        return MemoryBackend(max_entries)
+    if kind == "null":
+        return NullBackend()
+    raise ValueError(f"Backend de cache desconhecido: '{kind}' (use redis, memory ou null).")
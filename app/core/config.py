@@ -13,8 +13,92 @@ class Settings(BaseSettings):
 
     SECRET_KEY: str = Field(..., env="SECRET_KEY")  # Chave secreta usada para JWT
     DATABASE_URL: str = Field(..., env="DATABASE_URL")  # URL de conexão com o banco de dados
+    DB_POOL_SIZE: int = Field(10, env="DB_POOL_SIZE")  # Conexões mantidas no pool (por worker)
+    DB_MAX_OVERFLOW: int = Field(10, env="DB_MAX_OVERFLOW")  # Conexões extras permitidas acima do pool (por worker)
+    SLOW_QUERY_LOG: bool = Field(False, env="SLOW_QUERY_LOG")  # Registra as instruções SQL lentas (com a rota e os parâmetros ocultados)
+    SLOW_QUERY_THRESHOLD_MS: float = Field(100.0, env="SLOW_QUERY_THRESHOLD_MS")  # Duração mínima de uma instrução lenta (em milissegundos)
+    SLOW_QUERY_EXPLAIN: bool = Field(False, env="SLOW_QUERY_EXPLAIN")  # Obtém o plano (EXPLAIN) das consultas lentas em background
+    TRACING_ENABLED: bool = Field(False, env="TRACING_ENABLED")  # Registra spans das requisições (rota, SQL, cache e API externa)
+    TRACING_SAMPLE_RATE: float = Field(0.01, env="TRACING_SAMPLE_RATE")  # Fração das requisições amostradas (sem traceparent de origem)
+    TRACING_EXPORT_FILE: str = Field("", env="TRACING_EXPORT_FILE")  # Arquivo de exportação dos spans (OTLP/JSON, uma linha por lote)
+    TRACING_EXPORT_URL: str = Field("", env="TRACING_EXPORT_URL")  # Coletor OTLP/HTTP (ex: http://localhost:4318/v1/traces)
+    TRACING_EXPORT_INTERVAL: int = Field(5, env="TRACING_EXPORT_INTERVAL")  # Intervalo de exportação dos spans (em segundos)
+    TRACING_SERVICE_NAME: str = Field("favorite-api", env="TRACING_SERVICE_NAME")  # Nome do serviço nos spans exportados
     TOKEN_EXPIRE_MINUTES: int = Field(30, env="TOKEN_EXPIRE_MINUTES")  # Expiração do token (em minutos)
     ALGORITHM: str = Field("HS256", env="ALGORITHM")  # Algoritmo usado para assinatura do token
+    ADMIN_EMAILS: str = Field("", env="ADMIN_EMAILS")  # E-mails com acesso administrativo (separados por vírgula)
+
+    # API externa de produtos
+    PRODUCTS_API_URL: str = Field("https://fakestoreapi.com", env="PRODUCTS_API_URL")  # URL base da API de produtos
+    UPSTREAM_TIMEOUT: float = Field(5.0, env="UPSTREAM_TIMEOUT")  # Timeout máximo por chamada (em segundos)
+    UPSTREAM_MAX_CONNECTIONS: int = Field(100, env="UPSTREAM_MAX_CONNECTIONS")  # Conexões simultâneas por worker
+    UPSTREAM_HEDGE_MIN_SAMPLES: int = Field(20, env="UPSTREAM_HEDGE_MIN_SAMPLES")  # Amostras mínimas antes de usar o p95
+    UPSTREAM_HEDGE_MAX_RATIO: float = Field(0.1, env="UPSTREAM_HEDGE_MAX_RATIO")  # Fração máxima de requisições duplicadas
+    FAVORITES_SLA_SECONDS: float = Field(2.0, env="FAVORITES_SLA_SECONDS")  # Orçamento de tempo das rotas de favoritos
+    PRODUCTS_SLA_SECONDS: float = Field(1.5, env="PRODUCTS_SLA_SECONDS")  # Orçamento de tempo das rotas de produtos
+
+    # Cache
+    CACHE_BACKEND: str = Field("redis", env="CACHE_BACKEND")  # Backend de cache: redis, memory (por worker) ou null (desativado)
+    REDIS_URL: str = Field("redis://redis:6379", env="REDIS_URL")  # URL de conexão com o Redis
+    REDIS_POOL_SIZE: int = Field(50, env="REDIS_POOL_SIZE")  # Conexões máximas com o Redis (por worker)
+    CACHE_MEMORY_MAX_ENTRIES: int = Field(10000, env="CACHE_MEMORY_MAX_ENTRIES")  # Chaves mantidas no cache em memória (por worker)
+    CACHE_FAILOVER: bool = Field(True, env="CACHE_FAILOVER")  # Usa o cache em memória enquanto o Redis estiver inacessível
+    CACHE_FAILOVER_RETRY: float = Field(30.0, env="CACHE_FAILOVER_RETRY")  # Tempo até tentar o Redis novamente após uma falha (em segundos)
+    CACHE_WRITE_BEHIND: bool = Field(True, env="CACHE_WRITE_BEHIND")  # Grava no cache em segundo plano os produtos buscados pelas rotas
+    CACHE_WRITE_BEHIND_QUEUE_SIZE: int = Field(10000, env="CACHE_WRITE_BEHIND_QUEUE_SIZE")  # Chaves pendentes na fila de gravação (excedentes são descartadas)
+    CACHE_WRITE_BEHIND_BATCH_SIZE: int = Field(100, env="CACHE_WRITE_BEHIND_BATCH_SIZE")  # Chaves por lote enviado ao cache (pipeline)
+    PRODUCT_CACHE_TTL: int = Field(300, env="PRODUCT_CACHE_TTL")  # TTL dos produtos em cache (em segundos)
+    CATALOG_REFRESH_INTERVAL: int = Field(240, env="CATALOG_REFRESH_INTERVAL")  # Revalidação do catálogo na API externa (em segundos, 0 desativa)
+    FAVORITES_PAGE_CACHE_TTL: int = Field(600, env="FAVORITES_PAGE_CACHE_TTL")  # TTL das páginas de favoritos (em segundos)
+
+    # Gravação de favoritos em lote (group commit)
+    FAVORITES_WRITE_BATCHING: bool = Field(False, env="FAVORITES_WRITE_BATCHING")  # Agrupa inclusões/remoções concorrentes em uma transação
+    FAVORITES_WRITE_BATCH_WINDOW_MS: float = Field(5.0, env="FAVORITES_WRITE_BATCH_WINDOW_MS")  # Espera máxima por mais gravações (em milissegundos)
+    FAVORITES_WRITE_BATCH_SIZE: int = Field(100, env="FAVORITES_WRITE_BATCH_SIZE")  # Gravações por lote (envia antes do fim da janela)
+
+    # Paginação e streaming
+    CLIENTS_PAGE_SIZE: int = Field(50, env="CLIENTS_PAGE_SIZE")  # Tamanho padrão da página de clientes
+    STREAM_CHUNK_SIZE: int = Field(1000, env="STREAM_CHUNK_SIZE")  # Linhas lidas por bloco nas respostas em streaming
+
+    # Exclusão de clientes
+    CLIENT_DELETE_ASYNC_THRESHOLD: int = Field(5000, env="CLIENT_DELETE_ASYNC_THRESHOLD")  # Favoritos acima dos quais a exclusão é assíncrona
+    CLIENT_DELETE_CHUNK_SIZE: int = Field(1000, env="CLIENT_DELETE_CHUNK_SIZE")  # Favoritos apagados por lote
+    CLIENT_DELETE_PAUSE: float = Field(0.05, env="CLIENT_DELETE_PAUSE")  # Pausa entre lotes (em segundos)
+    CLIENT_DELETE_RESUME_INTERVAL: int = Field(60, env="CLIENT_DELETE_RESUME_INTERVAL")  # Busca de exclusões interrompidas (em segundos, 0 desativa)
+    CLIENT_DELETE_STALE_AFTER: int = Field(300, env="CLIENT_DELETE_STALE_AFTER")  # Tempo sem atividade até uma exclusão ser retomada (em segundos)
+
+    # Aquecimento (warm-up) na inicialização de cada worker
+    WARMUP_DB_CONNECTIONS: int = Field(2, env="WARMUP_DB_CONNECTIONS")  # Conexões do banco abertas antes de receber tráfego
+    WARMUP_REDIS_CONNECTIONS: int = Field(2, env="WARMUP_REDIS_CONNECTIONS")  # Conexões do Redis abertas antes de receber tráfego
+    WARMUP_PRELOAD_CATALOG: bool = Field(True, env="WARMUP_PRELOAD_CATALOG")  # Carrega o catálogo de produtos no cache
+    WARMUP_TIMEOUT: float = Field(10.0, env="WARMUP_TIMEOUT")  # Tempo máximo do aquecimento (em segundos)
+
+    # Jobs em background
+    BACKGROUND_JOBS_ENABLED: bool = Field(True, env="BACKGROUND_JOBS_ENABLED")  # Liga/desliga os jobs periódicos
+    JOBS_LEADER_TTL: int = Field(30, env="JOBS_LEADER_TTL")  # Expiração da liderança dos jobs entre os workers (em segundos)
+    COUNTERS_RECONCILE_INTERVAL: int = Field(3600, env="COUNTERS_RECONCILE_INTERVAL")  # Reconciliação dos contadores (em segundos, 0 desativa)
+    SNAPSHOT_REFRESH_INTERVAL: int = Field(900, env="SNAPSHOT_REFRESH_INTERVAL")  # Atualização dos dados de produto nos favoritos (em segundos, 0 desativa)
+    SNAPSHOT_MAX_AGE: int = Field(3600, env="SNAPSHOT_MAX_AGE")  # Idade máxima dos dados de produto salvos (em segundos)
+    LEADERBOARD_RECONCILE_INTERVAL: int = Field(600, env="LEADERBOARD_RECONCILE_INTERVAL")  # Reconciliação do ranking de favoritos (em segundos, 0 desativa)
+    FAVORITES_PURGE_INTERVAL: int = Field(600, env="FAVORITES_PURGE_INTERVAL")  # Expurgo de favoritos removidos (em segundos, 0 desativa)
+    FAVORITES_PURGE_RETENTION: int = Field(604800, env="FAVORITES_PURGE_RETENTION")  # Retenção dos favoritos removidos (em segundos)
+    FAVORITES_PURGE_BATCH_SIZE: int = Field(500, env="FAVORITES_PURGE_BATCH_SIZE")  # Registros apagados por lote
+    FAVORITES_PURGE_PAUSE: float = Field(0.1, env="FAVORITES_PURGE_PAUSE")  # Pausa entre lotes de expurgo (em segundos)
+
+    # Idempotência das rotas POST (header Idempotency-Key)
+    IDEMPOTENCY_ENABLED: bool = Field(True, env="IDEMPOTENCY_ENABLED")  # Liga/desliga o suporte ao header Idempotency-Key
+    IDEMPOTENCY_TTL: int = Field(86400, env="IDEMPOTENCY_TTL")  # Tempo que a resposta fica disponível para repetições (em segundos)
+    IDEMPOTENCY_LOCK_TTL: int = Field(30, env="IDEMPOTENCY_LOCK_TTL")  # Expiração do marcador de requisição em andamento (em segundos)
+    IDEMPOTENCY_WAIT: float = Field(10.0, env="IDEMPOTENCY_WAIT")  # Espera máxima de uma duplicata pela requisição em andamento (em segundos)
+
+    # Controle de admissão (load shedding)
+    ADMISSION_ENABLED: bool = Field(True, env="ADMISSION_ENABLED")  # Liga/desliga o controle de admissão
+    ADMISSION_AUTH_CONCURRENCY: int = Field(16, env="ADMISSION_AUTH_CONCURRENCY")  # Requisições simultâneas de autenticação
+    ADMISSION_READ_CONCURRENCY: int = Field(64, env="ADMISSION_READ_CONCURRENCY")  # Requisições simultâneas de leitura
+    ADMISSION_WRITE_CONCURRENCY: int = Field(32, env="ADMISSION_WRITE_CONCURRENCY")  # Requisições simultâneas de escrita
+    ADMISSION_MAX_QUEUE: int = Field(100, env="ADMISSION_MAX_QUEUE")  # Tamanho máximo da fila de espera por classe
+    ADMISSION_MAX_QUEUE_TIME: float = Field(0.5, env="ADMISSION_MAX_QUEUE_TIME")  # Tempo máximo na fila (em segundos)
+    ADMISSION_RETRY_AFTER: int = Field(1, env="ADMISSION_RETRY_AFTER")  # Valor do header Retry-After (em segundos)
 
     class Config:
         """
@@ -1,9 +1,17 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 from fastapi import HTTPException
+from contextlib import AsyncExitStack
+from contextvars import ContextVar
+from typing import Dict, Optional, Set
+import asyncio
+import hashlib
 import logging
 import os
+import re
+import time
 
 # Logger para eventos relacionados ao banco de dados
 logger = logging.getLogger(__name__)
@@ -11,13 +19,237 @@ log_level = logging.INFO if os.getenv("ENV") != "production" else logging.ERROR
 logger.setLevel(log_level)
 
 # Criação do engine assíncrono a partir da URL do banco
+# Tamanho do pool por worker (o SQLite usa um pool próprio, sem esses parâmetros)
+pool_options = {}
+if not settings.DATABASE_URL.startswith("sqlite"):
+    pool_options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+    }
+
 try:
-    engine = create_async_engine(settings.DATABASE_URL, echo=False)  # echo=True para debug
+    engine = create_async_engine(settings.DATABASE_URL, echo=False, **pool_options)  # echo=True para debug
     logger.info(f"Conexão com o banco de dados estabelecida: {settings.DATABASE_URL}")
 except Exception as e:
     logger.error(f"Erro ao conectar ao banco de dados: {e}")
     raise ValueError("Erro ao conectar ao banco de dados. Verifique a variável DATABASE_URL no .env.")
 
+# No SQLite as chaves estrangeiras (e o ON DELETE CASCADE) precisam ser habilitadas por conexão
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+# ------------------------------------------------------------------------------
+# Log de consultas lentas
+# ------------------------------------------------------------------------------
+
+# Requisição em execução (escopo ASGI), definida por RouteContextMiddleware
+current_request: ContextVar[Optional[dict]] = ContextVar("current_request", default=None)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|\$\d+|%\(\w+\)s|%s|:\w+")
+_VALUE_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_MULTI_ROW_VALUES = re.compile(r"(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+", re.IGNORECASE)
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Normaliza uma instrução SQL para agrupamento: literais e parâmetros viram "?",
+    listas de valores (IN, VALUES de várias linhas) viram "(...)" e espaços são unificados.
+    """
+    normalized = _LITERALS.sub("?", " ".join(statement.split()))
+    normalized = _VALUE_LISTS.sub("(...)", normalized).replace("(?)", "(...)")
+    return _MULTI_ROW_VALUES.sub(r"\1", normalized)
+
+
+def current_route() -> str:
+    """
+    Rota em execução, pelo modelo do caminho (ex: "GET /api/v1/favorites/{client_id}").
+    """
+    scope = current_request.get()
+    if scope is None:
+        return "-"
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else scope['path']}"
+
+
+def _redact(parameters) -> str:
+    """
+    Descreve os parâmetros de uma instrução sem expor valores (apenas tipos e quantidade).
+    """
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return f"<{len(parameters)} linhas>"
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return "()"
+
+
+def explain_prefix(dialect: str, statement: str) -> Optional[str]:
+    """
+    Prefixo EXPLAIN para obter o plano de uma consulta no banco informado, ou None se não suportado.
+
+    No PostgreSQL o ANALYZE executa a instrução: fica restrito a SELECT, pois um WITH
+    pode conter UPDATE/DELETE/INSERT (CTE que modifica dados), que seria executado de novo.
+    """
+    if dialect == "postgresql":
+        if statement.lstrip().upper().startswith("SELECT"):
+            return "EXPLAIN (ANALYZE, BUFFERS) "
+        return "EXPLAIN "
+    if dialect == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    return None
+
+
+class SlowQueryLog:
+    """
+    Registro das instruções SQL que excedem `threshold_ms`, agrupadas pela instrução
+    normalizada (fingerprint).
+
+    Cada instrução lenta é registrada em log com a rota em execução e os parâmetros
+    ocultados (apenas tipos). Com `explain`, o plano da primeira ocorrência de cada
+    SELECT é obtido em background, em uma conexão própria: `EXPLAIN (ANALYZE, BUFFERS)`
+    no PostgreSQL (`EXPLAIN` sem ANALYZE para consultas com WITH) ou `EXPLAIN QUERY PLAN`
+    no SQLite.
+
+    Atributos:
+        threshold_ms (float): Duração mínima (em milissegundos) para registrar a instrução.
+        explain (bool): Obtém o plano de execução das consultas lentas.
+        max_fingerprints (int): Quantidade máxima de instruções distintas agrupadas.
+    """
+
+    def __init__(self, threshold_ms: float = 100.0, explain: bool = False, max_fingerprints: int = 200):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.max_fingerprints = max_fingerprints
+        self.stats: Dict[str, dict] = {}
+        self._engine: Optional[AsyncEngine] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def install(self, async_engine: AsyncEngine):
+        """
+        Registra os eventos de execução no engine.
+        """
+        self._engine = async_engine
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self._before)
+        event.listen(async_engine.sync_engine, "after_cursor_execute", self._after)
+        event.listen(async_engine.sync_engine, "handle_error", self._error)
+
+    def uninstall(self):
+        event.remove(self._engine.sync_engine, "before_cursor_execute", self._before)
+        event.remove(self._engine.sync_engine, "after_cursor_execute", self._after)
+        event.remove(self._engine.sync_engine, "handle_error", self._error)
+
+    @staticmethod
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @staticmethod
+    def _error(exception_context):
+        # Instrução com erro não dispara after_cursor_execute: descarta seu início
+        starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+        if starts:
+            starts.pop()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        if elapsed_ms < self.threshold_ms or statement.lstrip().upper().startswith("EXPLAIN"):
+            return
+
+        normalized = normalize_statement(statement)
+        fingerprint = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+        route = current_route()
+        logger.warning(
+            f"[SQL lento] {elapsed_ms:.1f} ms em {route} ({fingerprint}): {normalized} "
+            f"parâmetros={_redact(parameters)}"
+        )
+
+        entry = self.stats.get(fingerprint)
+        if entry is None:
+            if len(self.stats) >= self.max_fingerprints:
+                return
+            entry = self.stats[fingerprint] = {
+                "statement": normalized, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "routes": {}, "plan": None,
+            }
+            if self.explain and not executemany and normalized.upper().startswith(("SELECT", "WITH")):
+                self._schedule_explain(fingerprint, statement, parameters)
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["routes"][route] = entry["routes"].get(route, 0) + 1
+
+    def _schedule_explain(self, fingerprint: str, statement: str, parameters):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._explain(fingerprint, statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, fingerprint: str, statement: str, parameters):
+        prefix = explain_prefix(self._engine.dialect.name, statement)
+        if prefix is None:
+            return
+        try:
+            async with self._engine.connect() as connection:
+                result = await connection.exec_driver_sql(prefix + statement, parameters)
+                plan = "\n".join(str(row[-1]) for row in result.all())
+        except Exception as e:
+            logger.warning(f"[SQL lento] Não foi possível obter o plano de {fingerprint}: {e}")
+            return
+        self.stats[fingerprint]["plan"] = plan
+        logger.warning(f"[SQL lento] Plano de {fingerprint}:\n{plan}")
+
+    async def drain(self):
+        """
+        Aguarda os EXPLAIN em andamento.
+        """
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def summary(self, limit: int = 20) -> list:
+        """
+        Instruções lentas agrupadas, da maior para a menor duração total.
+        """
+        entries = sorted(self.stats.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        return [
+            {"fingerprint": fingerprint, **entry, "total_ms": round(entry["total_ms"], 1), "max_ms": round(entry["max_ms"], 1)}
+            for fingerprint, entry in entries[:limit]
+        ]
+
+
+class RouteContextMiddleware:
+    """
+    Middleware ASGI que registra a requisição em execução (current_request) para o log de
+    consultas lentas. A rota correspondente é preenchida no escopo pelo roteador.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_request.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request.reset(token)
+
+
+# Log de consultas lentas do worker (ativado por SLOW_QUERY_LOG)
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+)
+if settings.SLOW_QUERY_LOG:
+    slow_query_log.install(engine)
+
 # Criador de sessões assíncronas para uso nas rotas
 SessionLocal = sessionmaker(
     bind=engine,
@@ -39,3 +271,20 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+async def warm_up_pool(connections: int):
+    """
+    Abre conexões do pool antes do worker receber tráfego, evitando que as primeiras
+    requisições paguem o custo de conexão (handshake e autenticação) com o banco.
+
+    As conexões são mantidas abertas ao mesmo tempo para que o pool crie a quantidade
+    pedida, e depois devolvidas ao pool.
+
+    Args:
+        connections (int): Quantidade de conexões a abrir.
+    """
+    async with AsyncExitStack() as stack:
+        opened = [await stack.enter_async_context(engine.connect()) for _ in range(connections)]
+        for connection in opened:
+            await connection.execute(text("SELECT 1"))
@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Set
+
+
+class DataLoader:
+    """
+    Carrega registros por chave em lote e sem repetição (padrão DataLoader), no escopo
+    de uma requisição.
+
+    - Chaves pedidas na mesma volta do event loop (ex: em um asyncio.gather) são agrupadas
+      em uma única chamada a `batch_fn`.
+    - Cada chave é carregada no máximo uma vez: pedidos repetidos recebem o mesmo resultado.
+    - Registros já obtidos de outra forma podem ser registrados com `prime`.
+
+    Atributos:
+        batch_fn (Callable): Corrotina que recebe uma lista de chaves e retorna um
+            dicionário chave -> registro (chaves ausentes resultam em None).
+        batches (int): Quantidade de chamadas a `batch_fn`.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]):
+        self.batch_fn = batch_fn
+        self.results: Dict[Hashable, asyncio.Future] = {}
+        self.queue: List[Hashable] = []
+        self.batches = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        """
+        Retorna o registro da chave, carregando-o no próximo lote se ainda não foi pedido.
+        """
+        future = self.results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self.results[key] = loop.create_future()
+            if not self.queue:
+                loop.call_soon(self._start_dispatch, loop)
+            self.queue.append(key)
+        # shield: o cancelamento de quem aguarda não cancela o resultado compartilhado
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: List[Hashable]) -> List[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Hashable, value: Any):
+        """
+        Registra um registro já carregado, para que pedidos dessa chave não consultem a origem.
+        """
+        if key not in self.results:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self.results[key] = future
+
+    def _start_dispatch(self, loop: asyncio.AbstractEventLoop):
+        # Referência mantida até o fim: tasks sem referência podem ser coletadas pelo GC
+        task = loop.create_task(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self):
+        keys, self.queue = self.queue, []
+        self.batches += 1
+        try:
+            values = await self.batch_fn(keys)
+        except Exception as e:
+            # Falhas não ficam memorizadas: um novo pedido tenta carregar a chave de novo
+            for key in keys:
+                self.results.pop(key).set_exception(e)
+            return
+        for key in keys:
+            self.results[key].set_result(values.get(key))
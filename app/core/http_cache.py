@@ -0,0 +1,89 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+# ------------------------------------------------------------------------------
+# Requisições condicionais (ETag / Last-Modified)
+# ------------------------------------------------------------------------------
+
+
+def make_etag(*parts) -> str:
+    """
+    Monta uma ETag forte a partir de valores que identificam a representação
+    (ex: cliente, versão da lista e página).
+    """
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def content_etag(content: str) -> str:
+    """
+    Monta uma ETag forte a partir do hash do conteúdo serializado.
+    """
+    return '"' + hashlib.sha1(content.encode("utf-8")).hexdigest() + '"'
+
+
+def http_date(value: datetime) -> str:
+    """
+    Formata uma data no padrão HTTP (RFC 7231), ex: "Wed, 21 Oct 2015 07:28:00 GMT".
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Comparação fraca (RFC 7232): ignora o prefixo W/
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def is_not_modified(request: Request, etag: Optional[str] = None, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Verifica se a cópia do cliente ainda é válida (If-None-Match / If-Modified-Since).
+
+    If-Modified-Since só é considerado quando If-None-Match não é enviado.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and _matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # Datas HTTP têm precisão de segundos
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def cache_headers(
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = "no-cache"
+) -> Dict[str, str]:
+    """
+    Headers de validação da resposta. O padrão "no-cache" permite guardar a resposta,
+    mas exige revalidação (requisição condicional) a cada uso.
+    """
+    headers = {"Cache-Control": cache_control}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """
+    Resposta 304 (sem corpo) com os mesmos headers de validação da resposta completa.
+    """
+    return Response(status_code=304, headers=headers)
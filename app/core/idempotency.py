@@ -0,0 +1,264 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.core.cache import cache_backend
+from app.core.config import settings
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Rotas que aceitam o header Idempotency-Key (método, caminho)
+IDEMPOTENT_ROUTES = [
+    ("POST", re.compile(r"^/api/v1/auth/signup$")),
+    ("POST", re.compile(r"^/api/v1/favorites/\d+$")),
+]
+
+# Tamanho máximo aceito para a chave enviada pelo cliente
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeys:
+    """
+    Registro das requisições idempotentes (header Idempotency-Key), mantido no cache (Redis).
+
+    - A primeira requisição com uma chave grava um marcador "em andamento" (SET NX, com
+      expiração curta) e, ao terminar, a resposta completa com expiração `ttl`.
+    - Duplicatas concorrentes aguardam o resultado da primeira: no mesmo worker por um
+      future em memória, em outros workers consultando o Redis.
+    - Repetições posteriores recebem a resposta gravada, sem executar a rota.
+
+    A chave é associada ao caminho e ao header Authorization, e o corpo da primeira
+    requisição é registrado: reutilizar a chave com outro corpo retorna 422.
+    Respostas 5xx não são gravadas, para que uma nova tentativa execute a rota de novo.
+
+    Com o cache em memória (CACHE_BACKEND=memory ou Redis inacessível), as respostas valem
+    apenas para o próprio worker; com o cache desativado (null), apenas as duplicatas
+    concorrentes no mesmo worker são agrupadas.
+
+    Atributos:
+        ttl (int): Tempo (em segundos) que a resposta fica disponível para repetições.
+        lock_ttl (int): Expiração do marcador "em andamento" (em segundos).
+        wait (float): Tempo máximo de espera por uma requisição em andamento (em segundos).
+        poll_interval (float): Intervalo entre consultas ao Redis durante a espera (em segundos).
+    """
+
+    def __init__(
+        self,
+        ttl: int = settings.IDEMPOTENCY_TTL,
+        lock_ttl: int = settings.IDEMPOTENCY_LOCK_TTL,
+        wait: float = settings.IDEMPOTENCY_WAIT,
+        poll_interval: float = 0.05,
+    ):
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.wait = wait
+        self.poll_interval = poll_interval
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.executed = 0
+        self.replayed = 0
+        self.conflicts = 0
+
+    @staticmethod
+    def matches(method: str, path: str) -> bool:
+        return any(method == route_method and pattern.match(path) for route_method, pattern in IDEMPOTENT_ROUTES)
+
+    @staticmethod
+    def storage_key(path: str, authorization: str, key: str) -> str:
+        digest = hashlib.sha256("\n".join((path, authorization, key)).encode()).hexdigest()
+        return f"idempotency:{digest}"
+
+    async def claim(self, key: str, fingerprint: str) -> Tuple[str, Optional[dict]]:
+        """
+        Decide o que fazer com uma requisição: executá-la ou aguardar/reaproveitar outra.
+
+        Returns:
+            tuple[str, dict | None]: ("execute", None) quando esta requisição deve executar a rota,
+            ("replay", resposta) quando já existe uma resposta, ou ("busy", None) quando a
+            requisição em andamento não terminou dentro do tempo de espera.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait
+        while True:
+            local = self.inflight.get(key)
+            if local is not None:
+                try:
+                    record = await asyncio.wait_for(asyncio.shield(local), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    return "busy", None
+                if record is not None:
+                    return "replay", record
+                continue
+
+            marker = json.dumps({"state": "in_flight", "fingerprint": fingerprint})
+            try:
+                acquired = await cache_backend.set(key, marker, ex=self.lock_ttl, nx=True)
+                stored = None if acquired else await cache_backend.get(key)
+            except Exception as e:
+                logger.warning(f"[Redis] Erro ao registrar chave de idempotência: {e}")
+                acquired, stored = True, None
+
+            if acquired:
+                self.inflight[key] = loop.create_future()
+                return "execute", None
+            if stored is None:
+                # A requisição em andamento terminou com erro (marcador removido): tenta de novo
+                continue
+            record = json.loads(stored)
+            if record["state"] == "done" or record["fingerprint"] != fingerprint:
+                return "replay", record
+            if loop.time() >= deadline:
+                return "busy", None
+            await asyncio.sleep(self.poll_interval)
+
+    async def complete(self, key: str, record: Optional[dict]):
+        """
+        Grava a resposta de uma requisição executada (ou remove o marcador, se None)
+        e libera as duplicatas que aguardam no worker.
+        """
+        try:
+            if record is not None:
+                await cache_backend.set(key, json.dumps(record), ex=self.ttl)
+            else:
+                await cache_backend.delete(key)
+        except Exception as e:
+            logger.warning(f"[Redis] Erro ao gravar resposta idempotente: {e}")
+        finally:
+            future = self.inflight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(record)
+
+    def stats(self) -> dict:
+        return {
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "conflicts": self.conflicts,
+            "in_flight": len(self.inflight),
+        }
+
+
+class IdempotencyMiddleware:
+    """
+    Middleware ASGI que aplica o header Idempotency-Key às rotas de IDEMPOTENT_ROUTES.
+
+    Requisições sem o header (ou de outras rotas) seguem normalmente.
+    """
+
+    def __init__(self, app, keys: IdempotencyKeys):
+        self.app = app
+        self.keys = keys
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.keys.matches(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        idempotency_key = headers.get(b"idempotency-key", b"").decode("latin-1")
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await _json_response(send, 400, {"detail": "Idempotency-Key inválida."})
+            return
+
+        body = await _read_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        key = self.keys.storage_key(
+            scope["path"], headers.get(b"authorization", b"").decode("latin-1"), idempotency_key
+        )
+
+        action, record = await self.keys.claim(key, fingerprint)
+        if action == "busy":
+            self.keys.conflicts += 1
+            await _json_response(
+                send, 409, {"detail": "Requisição com a mesma Idempotency-Key ainda em andamento."},
+                [(b"retry-after", b"1")],
+            )
+            return
+        if action == "replay":
+            if record["fingerprint"] != fingerprint:
+                self.keys.conflicts += 1
+                await _json_response(send, 422, {"detail": "Idempotency-Key já usada com outra requisição."})
+                return
+            self.keys.replayed += 1
+            await _replay(send, record)
+            return
+
+        self.keys.executed += 1
+        response = {"status": 500, "headers": [], "body": b""}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+            await send(message)
+
+        record = None
+        try:
+            await self.app(scope, _replay_body(body, receive), capture)
+            if response["status"] < 500:
+                record = {
+                    "state": "done",
+                    "fingerprint": fingerprint,
+                    "status": response["status"],
+                    "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in response["headers"]],
+                    "body": base64.b64encode(response["body"]).decode(),
+                }
+        finally:
+            await self.keys.complete(key, record)
+
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            return body
+
+
+def _replay_body(body: bytes, receive):
+    """
+    Entrega à rota o corpo já lido pelo middleware; mensagens seguintes (ex: desconexão)
+    vêm do servidor.
+    """
+    sent = False
+
+    async def _receive():
+        nonlocal sent
+        if sent:
+            return await receive()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return _receive
+
+
+async def _replay(send, record: dict):
+    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]]
+    await send({
+        "type": "http.response.start",
+        "status": record["status"],
+        "headers": headers + [(b"idempotent-replayed", b"true")],
+    })
+    await send({"type": "http.response.body", "body": base64.b64decode(record["body"])})
+
+
+async def _json_response(send, status: int, content: dict, headers: Optional[List[tuple]] = None):
+    body = json.dumps(content).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ] + (headers or []),
+    })
+    await send({"type": "http.response.body", "body": body})
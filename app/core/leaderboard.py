@@ -0,0 +1,140 @@
+import logging
+from bisect import bisect_left, insort
+from typing import Dict, List, Tuple
+
+from app.core.cache import cache_backend
+from app.core.cache_backends import CacheBackend
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+
+class SortedScores:
+    """
+    Ranking em memória: dicionário de pontuações + lista ordenada por (-pontuação, membro).
+
+    A consulta dos K primeiros é uma fatia da lista (O(K)); a atualização localiza
+    a posição por busca binária (O(log n)).
+    """
+
+    def __init__(self):
+        self.scores: Dict[int, int] = {}
+        self.ranking: List[Tuple[int, int]] = []
+
+    def incr(self, member: int, delta: int):
+        old = self.scores.get(member, 0)
+        new = old + delta
+        if old > 0:
+            del self.ranking[bisect_left(self.ranking, (-old, member))]
+        if new > 0:
+            insort(self.ranking, (-new, member))
+            self.scores[member] = new
+        else:
+            self.scores.pop(member, None)
+
+    def replace(self, scores: Dict[int, int]):
+        self.scores = {member: score for member, score in scores.items() if score > 0}
+        self.ranking = sorted((-score, member) for member, score in self.scores.items())
+
+    def top(self, k: int) -> List[Tuple[int, int]]:
+        return [(member, -score) for score, member in self.ranking[:k]]
+
+
+class Leaderboard:
+    """
+    Ranking incremental mantido em um sorted set do Redis (ZINCRBY a cada alteração,
+    ZREVRANGE nas consultas: O(log n + K)).
+
+    Cada worker mantém também uma cópia em memória, usada quando o Redis está
+    indisponível. A cópia recebe as alterações feitas pelo próprio worker e é
+    substituída por completo a cada reconciliação. Com um backend de cache que não é
+    o Redis (CACHE_BACKEND=memory/null), ou com o Redis fora pelo failover, apenas a
+    cópia em memória é usada, sem tentativas de conexão.
+
+    Atributos:
+        key (str): Chave do sorted set no Redis.
+        backend (CacheBackend): Backend de cache configurado (fornece o cliente Redis).
+    """
+
+    def __init__(self, key: str, backend: CacheBackend):
+        self.key = key
+        self.backend = backend
+        self.memory = SortedScores()
+
+    async def incr(self, member: int, delta: int):
+        """
+        Incrementa (ou decrementa) a pontuação de um membro. Membros sem pontuação saem do ranking.
+        """
+        self.memory.incr(member, delta)
+        redis_client = self.backend.redis_client()
+        if redis_client is None:
+            return
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.zincrby(self.key, delta, member)
+                if delta < 0:
+                    pipe.zremrangebyscore(self.key, "-inf", 0)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[Redis] Erro ao atualizar ranking '{self.key}': {e}")
+
+    async def top(self, k: int) -> List[Tuple[int, int]]:
+        """
+        Retorna os K membros com maior pontuação, do Redis ou, se indisponível, da memória.
+
+        Returns:
+            list[tuple[int, int]]: Pares (membro, pontuação) em ordem decrescente.
+        """
+        redis_client = self.backend.redis_client()
+        if redis_client is None:
+            return self.memory.top(k)
+        try:
+            entries = await redis_client.zrevrange(self.key, 0, k - 1, withscores=True)
+            return [(int(member), int(score)) for member, score in entries]
+        except Exception as e:
+            logger.warning(f"[Redis] Erro ao ler ranking '{self.key}', usando cópia em memória: {e}")
+            return self.memory.top(k)
+
+    async def load(self) -> bool:
+        """
+        Carrega a cópia em memória a partir do Redis.
+
+        Returns:
+            bool: True se o ranking existia no Redis; False se vazio ou indisponível.
+        """
+        redis_client = self.backend.redis_client()
+        if redis_client is None:
+            return False
+        try:
+            entries = await redis_client.zrange(self.key, 0, -1, withscores=True)
+        except Exception as e:
+            logger.warning(f"[Redis] Erro ao carregar ranking '{self.key}': {e}")
+            return False
+        self.memory.replace({int(member): int(score) for member, score in entries})
+        return bool(entries)
+
+    async def rebuild(self, scores: Dict[int, int]):
+        """
+        Substitui o ranking inteiro (reconciliação). O novo sorted set é montado em uma
+        chave temporária e trocado atomicamente (RENAME), sem janela com o ranking vazio.
+        """
+        self.memory.replace(scores)
+        redis_client = self.backend.redis_client()
+        if redis_client is None:
+            return
+        staging = f"{self.key}:rebuild"
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(staging)
+                if self.memory.scores:
+                    pipe.zadd(staging, self.memory.scores)
+                    pipe.rename(staging, self.key)
+                else:
+                    pipe.delete(self.key)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[Redis] Erro ao reconstruir ranking '{self.key}': {e}")
+
+
+# Produtos mais favoritados (membro: product_id, pontuação: quantidade de favoritos ativos)
+favorites_leaderboard = Leaderboard("leaderboard:favorites", cache_backend)
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import os
+import socket
+from typing import Awaitable, Callable, List, Optional
+
+from app.core.cache_backends import CacheBackend
+from app.core.database import SessionLocal
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+
+def with_session(job: Callable[..., Awaitable]) -> Callable[[], Awaitable]:
+    """
+    Adapta uma função de CRUD (que recebe uma sessão) para execução como job,
+    abrindo uma sessão de banco de dados própria a cada execução.
+    """
+    async def _run():
+        async with SessionLocal() as session:
+            return await job(session)
+
+    return _run
+
+
+class LeaderLease:
+    """
+    Eleição de um worker líder por meio de uma chave com expiração no cache
+    compartilhado (SET NX no Redis).
+
+    O worker que grava a chave é o líder enquanto renová-la a cada `ttl / 3` segundos;
+    se ele parar (encerramento, reciclagem, falha), a chave expira e outro worker assume
+    em até `ttl` segundos. Com um cache que não é compartilhado entre os workers
+    (memória, ou Redis indisponível com failover), cada worker é o próprio líder.
+
+    Atributos:
+        backend (CacheBackend): Cache onde a chave é gravada.
+        key (str): Chave da eleição.
+        ttl (int): Expiração da chave (em segundos).
+        owner (str): Identificador deste worker (host, PID e sufixo aleatório).
+    """
+
+    def __init__(self, backend: CacheBackend, key: str = "jobs:leader", ttl: int = 30):
+        self.backend = backend
+        self.key = key
+        self.ttl = ttl
+        self.is_leader = False
+        self._pid: Optional[int] = None
+        self._owner = ""
+
+    @property
+    def owner(self) -> str:
+        # Gerado no processo que o usa: com preload_app, a lease é criada no master do
+        # Gunicorn antes do fork e seria copiada, com o mesmo identificador, para todos os workers
+        pid = os.getpid()
+        if pid != self._pid:
+            self._pid = pid
+            self._owner = f"{socket.gethostname()}:{pid}:{os.urandom(4).hex()}"
+            self.is_leader = False
+        return self._owner
+
+    async def renew(self) -> bool:
+        """
+        Adquire a liderança se a chave estiver livre, ou a renova se já for deste worker.
+
+        Returns:
+            bool: True se este worker é o líder.
+        """
+        try:
+            leader = await self.backend.set(self.key, self.owner, ex=self.ttl, nx=True)
+            if not leader and await self.backend.get(self.key) == self.owner:
+                leader = all(await self.backend.expire([self.key], self.ttl))
+        except Exception as e:
+            logger.warning(f"[Jobs] Erro ao renovar a liderança: {e}")
+            leader = False
+        if leader != self.is_leader:
+            logger.info(f"[Jobs] Worker {self.owner} {'assumiu' if leader else 'deixou'} a liderança dos jobs.")
+        self.is_leader = leader
+        return leader
+
+    async def release(self):
+        """
+        Libera a liderança no encerramento do worker, para que outro assuma sem aguardar a expiração.
+        """
+        if self.is_leader:
+            self.is_leader = False
+            try:
+                if await self.backend.get(self.key) == self.owner:
+                    await self.backend.delete(self.key)
+            except Exception as e:
+                logger.warning(f"[Jobs] Erro ao liberar a liderança: {e}")
+
+
+class JobScheduler:
+    """
+    Executa jobs periódicos em background no event loop do worker.
+
+    Cada job roda em sua própria task; falhas são registradas em log e o job
+    continua agendado para a próxima execução.
+
+    Com vários workers, os jobs que operam sobre dados compartilhados (banco, Redis,
+    API externa) rodam apenas no worker líder (`lease`); os jobs registrados com
+    `per_worker=True` (estado em memória do worker) rodam em todos.
+
+    Atributos:
+        lease (LeaderLease | None): Eleição do líder; sem ela, todos os jobs rodam no worker.
+    """
+
+    def __init__(self, lease: Optional[LeaderLease] = None):
+        self.lease = lease
+        self.jobs: List[tuple] = []
+        self.tasks: List[asyncio.Task] = []
+
+    def add(self, name: str, interval: float, job: Callable[[], Awaitable], per_worker: bool = False):
+        """
+        Registra um job periódico. Intervalos menores ou iguais a zero desativam o job.
+
+        Args:
+            name (str): Nome do job (usado nos logs).
+            interval (float): Intervalo entre execuções (em segundos).
+            job (Callable): Corrotina sem argumentos a ser executada.
+            per_worker (bool): Executa em todos os workers, e não apenas no líder.
+        """
+        if interval > 0:
+            self.jobs.append((name, interval, job, per_worker))
+
+    def start(self):
+        """
+        Inicia a eleição do líder e todos os jobs registrados.
+        """
+        if self.lease is not None:
+            self.tasks.append(asyncio.create_task(self._keep_lease(self.lease)))
+        for name, interval, job, per_worker in self.jobs:
+            lease = None if per_worker else self.lease
+            self.tasks.append(asyncio.create_task(self._loop(name, interval, job, lease)))
+
+    async def stop(self):
+        """
+        Cancela os jobs em execução, aguarda seu encerramento e libera a liderança.
+        """
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+        if self.lease is not None:
+            await self.lease.release()
+
+    @staticmethod
+    async def _keep_lease(lease: LeaderLease):
+        while True:
+            await lease.renew()
+            await asyncio.sleep(lease.ttl / 3)
+
+    @staticmethod
+    async def _loop(name: str, interval: float, job: Callable[[], Awaitable], lease: Optional[LeaderLease]):
+        while True:
+            await asyncio.sleep(interval)
+            if lease is not None and not lease.is_leader:
+                continue
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[Jobs] Erro ao executar '{name}': {e}")
@@ -0,0 +1,187 @@
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Ordenações suportadas na busca
+SORTS = ("relevance", "price_asc", "price_desc", "title")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Divide um texto em termos de busca: minúsculas, sem acentos, apenas letras e números.
+    """
+    normalized = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    return re.findall(r"[a-z0-9]+", normalized.lower())
+
+
+class ProductIndex:
+    """
+    Índice de busca de produtos em memória (um por worker).
+
+    - Índice invertido: termo do título -> IDs dos produtos.
+    - Vocabulário ordenado, para busca por prefixo com bisect.
+    - Categorias: categoria -> IDs dos produtos.
+    - Preços ordenados (preço, ID), para filtros por faixa e ordenação por preço com bisect.
+
+    O índice é atualizado de forma incremental a cada recarga do catálogo: apenas
+    produtos novos, alterados ou removidos são reindexados.
+
+    Atributos:
+        version (str | None): Identificador do catálogo indexado (ex: ETag da API externa).
+    """
+
+    def __init__(self):
+        self.products: Dict[int, dict] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self.vocabulary: List[str] = []
+        self.categories: Dict[str, Set[int]] = {}
+        self.prices: List[Tuple[float, int]] = []
+        self.version: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    # --------------------------------------------------------------------------
+    # Atualização
+    # --------------------------------------------------------------------------
+
+    def update(self, products: Iterable[dict], version: Optional[str] = None) -> int:
+        """
+        Sincroniza o índice com o catálogo informado.
+
+        Args:
+            products (Iterable[dict]): Catálogo completo.
+            version (str | None): Identificador do catálogo (ex: ETag).
+
+        Returns:
+            int: Quantidade de produtos reindexados (novos, alterados ou removidos).
+        """
+        catalog = {product["id"]: product for product in products}
+        changed = 0
+        for product_id in [pid for pid in self.products if pid not in catalog]:
+            self._remove(product_id)
+            changed += 1
+        for product_id, product in catalog.items():
+            if self.products.get(product_id) == product:
+                continue
+            if product_id in self.products:
+                self._remove(product_id)
+            self._add(product)
+            changed += 1
+        self.version = version
+        return changed
+
+    def _add(self, product: dict):
+        product_id = product["id"]
+        self.products[product_id] = product
+        for term in set(tokenize(product.get("title", ""))):
+            if term not in self.postings:
+                self.postings[term] = set()
+                insort(self.vocabulary, term)
+            self.postings[term].add(product_id)
+        category = (product.get("category") or "").lower()
+        if category:
+            self.categories.setdefault(category, set()).add(product_id)
+        insort(self.prices, (float(product["price"]), product_id))
+
+    def _remove(self, product_id: int):
+        product = self.products.pop(product_id)
+        for term in set(tokenize(product.get("title", ""))):
+            ids = self.postings[term]
+            ids.discard(product_id)
+            if not ids:
+                del self.postings[term]
+                del self.vocabulary[bisect_left(self.vocabulary, term)]
+        category = (product.get("category") or "").lower()
+        if category:
+            self.categories[category].discard(product_id)
+            if not self.categories[category]:
+                del self.categories[category]
+        del self.prices[bisect_left(self.prices, (float(product["price"]), product_id))]
+
+    # --------------------------------------------------------------------------
+    # Consulta
+    # --------------------------------------------------------------------------
+
+    def _term_matches(self, term: str) -> Tuple[Set[int], Set[int]]:
+        """
+        Produtos cujo título contém o termo exato e os que contêm um termo que começa com ele.
+        """
+        start = bisect_left(self.vocabulary, term)
+        end = bisect_right(self.vocabulary, term + "\uffff")
+        exact = self.postings.get(term, set())
+        matches = set(exact)
+        for word in self.vocabulary[start:end]:
+            if word != term:
+                matches |= self.postings[word]
+        return exact, matches
+
+    def _price_range(self, min_price: Optional[float], max_price: Optional[float]) -> List[Tuple[float, int]]:
+        start = 0 if min_price is None else bisect_left(self.prices, (min_price, float("-inf")))
+        end = len(self.prices) if max_price is None else bisect_right(self.prices, (max_price, float("inf")))
+        return self.prices[start:end]
+
+    def search(
+        self,
+        q: Optional[str] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        sort: str = "relevance",
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Tuple[int, List[dict]]:
+        """
+        Busca produtos pelo título (todos os termos, com prefixo), categoria e faixa de preço.
+
+        Returns:
+            tuple[int, list[dict]]: Total de produtos encontrados e a página solicitada.
+        """
+        terms = set(tokenize(q or ""))
+        exact_matches: List[Set[int]] = []
+        candidates: Optional[Set[int]] = None
+        for term in terms:
+            exact, matches = self._term_matches(term)
+            exact_matches.append(exact)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return 0, []
+
+        if category:
+            in_category = self.categories.get(category.lower(), set())
+            candidates = in_category if candidates is None else candidates & in_category
+
+        if candidates is None:
+            # Sem filtro de termo/categoria: a faixa de preço já vem ordenada por preço
+            matched = [product_id for _, product_id in self._price_range(min_price, max_price)]
+            total = len(matched)
+            if sort == "price_desc":
+                matched.reverse()
+            elif sort != "price_asc":
+                matched = heapq.nsmallest(offset + limit, matched, key=self._sort_key(sort, exact_matches))
+            return total, [self.products[pid] for pid in matched[offset:offset + limit]]
+
+        matched = list(candidates)
+        if min_price is not None or max_price is not None:
+            low = float("-inf") if min_price is None else min_price
+            high = float("inf") if max_price is None else max_price
+            matched = [pid for pid in matched if low <= self.products[pid]["price"] <= high]
+        # Apenas a página solicitada é ordenada por completo (O(m log k))
+        page = heapq.nsmallest(offset + limit, matched, key=self._sort_key(sort, exact_matches))[offset:]
+        return len(matched), [self.products[pid] for pid in page]
+
+    def _sort_key(self, sort: str, exact_matches: List[Set[int]]):
+        if sort == "price_asc":
+            return lambda pid: (self.products[pid]["price"], pid)
+        if sort == "price_desc":
+            return lambda pid: (-self.products[pid]["price"], -pid)
+        if sort == "title":
+            return lambda pid: (self.products[pid]["title"].lower(), pid)
+        # Relevância: termos encontrados por inteiro valem mais que os encontrados por prefixo
+        return lambda pid: (-sum(pid in exact for exact in exact_matches), pid)
+
+
+# Índice de busca do catálogo de produtos (por worker)
+product_index = ProductIndex()
@@ -9,6 +9,9 @@ from app.core.config import settings
 # Contexto de criptografia para senhas
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Marcador de senha inutilizável (clientes importados sem senha definida)
+UNUSABLE_PASSWORD = "!"
+
 # Esquema de autenticação HTTP Bearer (JWT)
 security = HTTPBearer()
 
@@ -26,7 +29,10 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifica se a senha fornecida corresponde ao hash armazenado.
+    Hashes inutilizáveis (senha ainda não definida) nunca conferem.
     """
+    if not hashed_password or hashed_password.startswith(UNUSABLE_PASSWORD):
+        return False
     return pwd_context.verify(plain_password, hashed_password)
 
 def create_token(email: str, expires_delta: Optional[int] = None) -> str:
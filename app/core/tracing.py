@@ -0,0 +1,333 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, List, Optional
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.database import engine, normalize_statement
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Tipos de span (SpanKind do OTLP)
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+
+# Header W3C Trace Context: versão-trace_id-span_id-flags
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """
+    Operação medida dentro de um trace (rota, instrução SQL, comando de cache, chamada externa).
+    """
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "end", "attributes", "error")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, kind: int, attributes: dict):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 0},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+# Span em andamento na requisição; None quando a requisição não foi amostrada
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class _NoopSpan:
+    """
+    Contexto usado fora de requisições amostradas: não aloca nem registra nada.
+    """
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _SpanContext:
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback):
+        _current_span.reset(self.token)
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        self.tracer.finish(self.span)
+        return False
+
+
+class Tracer:
+    """
+    Tracing distribuído em processo, com exportação no formato OTLP/JSON.
+
+    - Amostragem por requisição: a decisão é tomada uma vez, na entrada, e respeitada
+      pelos spans internos. Requisições não amostradas não criam spans (apenas uma
+      leitura de ContextVar por operação), mantendo o custo desprezível com taxas baixas.
+    - O contexto é propagado pelo header W3C `traceparent`: um trace iniciado por outro
+      serviço é continuado (e a decisão de amostragem dele é respeitada), e as chamadas
+      à API externa levam o header adiante.
+    - Os spans concluídos são acumulados e exportados em lote para um arquivo (uma
+      mensagem OTLP/JSON por linha) e/ou para um coletor OTLP/HTTP (ex: /v1/traces).
+
+    Atributos:
+        sample_rate (float): Fração das requisições (sem trace de origem) amostradas.
+        export_file (str): Caminho do arquivo de exportação ("" desativa).
+        export_url (str): Endpoint OTLP/HTTP do coletor ("" desativa).
+        service_name (str): Nome do serviço nos recursos exportados.
+        batch_size (int): Quantidade de spans que dispara uma exportação.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.01,
+        export_file: str = "",
+        export_url: str = "",
+        service_name: str = "favorite-api",
+        batch_size: int = 512,
+    ):
+        self.sample_rate = sample_rate
+        self.export_file = export_file
+        self.export_url = export_url
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.finished: List[Span] = []
+        self.exported = 0
+        self._flushing: Optional[asyncio.Task] = None
+        self._engine: Optional[AsyncEngine] = None
+
+    # --------------------------------------------------------------------------
+    # Criação de spans
+    # --------------------------------------------------------------------------
+
+    def start_trace(self, traceparent: Optional[str], name: str, **attributes) -> Any:
+        """
+        Abre o span raiz de uma requisição recebida, se ela for amostrada.
+
+        Returns:
+            Contexto (with) que retorna o Span, ou None se a requisição não for amostrada.
+        """
+        match = _TRACEPARENT.match(traceparent or "")
+        if match:
+            trace_id, parent_id, flags = match.groups()
+            sampled = int(flags, 16) & 1
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+            sampled = random.random() < self.sample_rate
+        if not sampled:
+            return _NOOP
+        return _SpanContext(self, Span(trace_id, parent_id, name, SERVER, attributes))
+
+    def span(self, name: str, kind: int = INTERNAL, **attributes) -> Any:
+        """
+        Abre um span filho do span em andamento. Fora de requisições amostradas, não faz nada.
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return _NOOP
+        return _SpanContext(self, Span(parent.trace_id, parent.span_id, name, kind, attributes))
+
+    @staticmethod
+    def current() -> Optional[Span]:
+        return _current_span.get()
+
+    def finish(self, span: Span):
+        span.end = time.time_ns()
+        self.finished.append(span)
+        if len(self.finished) >= self.batch_size and (self._flushing is None or self._flushing.done()):
+            try:
+                self._flushing = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                pass
+
+    # --------------------------------------------------------------------------
+    # Instruções SQL
+    # --------------------------------------------------------------------------
+
+    def install(self, async_engine: AsyncEngine):
+        """
+        Registra os eventos de execução no engine: um span (CLIENT) por instrução SQL
+        executada em requisições amostradas.
+        """
+        self._engine = async_engine
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self._before)
+        event.listen(async_engine.sync_engine, "after_cursor_execute", self._after)
+        event.listen(async_engine.sync_engine, "handle_error", self._error)
+
+    def uninstall(self):
+        event.remove(self._engine.sync_engine, "before_cursor_execute", self._before)
+        event.remove(self._engine.sync_engine, "after_cursor_execute", self._after)
+        event.remove(self._engine.sync_engine, "handle_error", self._error)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        span = None
+        if parent is not None:
+            span = Span(parent.trace_id, parent.span_id, "db.query", CLIENT, {
+                "db.system": conn.dialect.name,
+                "db.statement": normalize_statement(statement),
+            })
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        span = conn.info["trace_spans"].pop()
+        if span is not None:
+            self.finish(span)
+
+    def _error(self, exception_context):
+        spans = exception_context.connection.info.get("trace_spans") if exception_context.connection else None
+        if spans:
+            span = spans.pop()
+            if span is not None:
+                span.error = str(exception_context.original_exception)
+                self.finish(span)
+
+    # --------------------------------------------------------------------------
+    # Exportação
+    # --------------------------------------------------------------------------
+
+    def to_otlp(self, spans: List[Span]) -> dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.core.tracing"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+
+    async def flush(self):
+        """
+        Exporta os spans concluídos. Falhas de exportação são registradas e os spans descartados.
+        """
+        spans, self.finished = self.finished, []
+        if not spans:
+            return
+        payload = json.dumps(self.to_otlp(spans))
+        if self.export_file:
+            try:
+                await asyncio.to_thread(self._append, payload)
+            except Exception as e:
+                logger.warning(f"[Tracing] Erro ao gravar spans em '{self.export_file}': {e}")
+        if self.export_url:
+            try:
+                async with httpx.AsyncClient(timeout=5.0) as client:
+                    response = await client.post(
+                        self.export_url, content=payload, headers={"Content-Type": "application/json"}
+                    )
+                    response.raise_for_status()
+            except Exception as e:
+                logger.warning(f"[Tracing] Erro ao enviar spans para '{self.export_url}': {e}")
+        self.exported += len(spans)
+
+    def _append(self, payload: str):
+        with open(self.export_file, "a", encoding="utf-8") as file:
+            file.write(payload + "\n")
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI que abre o span de cada requisição (SERVER), continuando o trace do
+    header `traceparent` quando presente. O nome do span usa o modelo da rota
+    (ex: "GET /api/v1/favorites/{client_id}").
+    """
+
+    def __init__(self, app, tracer: "Tracer"):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = dict(scope["headers"]).get(b"traceparent", b"").decode("latin-1")
+        context = self.tracer.start_trace(
+            traceparent, f"{scope['method']} {scope['path']}",
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        with context as span:
+            if span is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    span.attributes["http.status_code"] = message["status"]
+                    if message["status"] >= 500:
+                        span.error = f"HTTP {message['status']}"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{scope['method']} {route.path}"
+                    span.attributes["http.route"] = route.path
+
+
+# Tracer do worker (ativado por TRACING_ENABLED)
+tracer = Tracer(
+    sample_rate=settings.TRACING_SAMPLE_RATE,
+    export_file=settings.TRACING_EXPORT_FILE,
+    export_url=settings.TRACING_EXPORT_URL,
+    service_name=settings.TRACING_SERVICE_NAME,
+)
+if settings.TRACING_ENABLED:
+    tracer.install(engine)
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.tracing import CLIENT, tracer
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Prazo final (relógio monotônico) da requisição em andamento
+_deadline: ContextVar[Optional[float]] = ContextVar("upstream_deadline", default=None)
+
+# Cliente HTTP compartilhado pelo worker (pool de conexões reaproveitado entre requisições)
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+# ------------------------------------------------------------------------------
+# Cliente HTTP por worker
+# ------------------------------------------------------------------------------
+
+async def start_http_client() -> httpx.AsyncClient:
+    """
+    Cria o cliente HTTP do worker. Chamado no evento de inicialização da aplicação.
+    """
+    global _http_client, _http_client_loop
+    _http_client = httpx.AsyncClient(
+        timeout=settings.UPSTREAM_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+        ),
+    )
+    _http_client_loop = asyncio.get_running_loop()
+    return _http_client
+
+
+async def close_http_client():
+    """
+    Fecha o cliente HTTP do worker. Chamado no evento de encerramento da aplicação.
+    """
+    global _http_client, _http_client_loop
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client, _http_client_loop = None, None
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """
+    Retorna o cliente HTTP do worker, criando-o se a aplicação foi iniciada sem
+    o evento de inicialização (ex: testes) ou em outro event loop.
+    """
+    if _http_client is None or _http_client_loop is not asyncio.get_running_loop():
+        return await start_http_client()
+    return _http_client
+
+
+# ------------------------------------------------------------------------------
+# Orçamento de tempo (deadline) por requisição
+# ------------------------------------------------------------------------------
+
+def with_deadline(budget: float):
+    """
+    Cria uma dependência FastAPI que define o orçamento de tempo da requisição.
+
+    Todas as chamadas à API externa feitas durante a requisição usam apenas o
+    tempo restante desse orçamento, em vez de um timeout novo a cada chamada.
+
+    Args:
+        budget (float): SLA da rota em segundos.
+    """
+    async def _deadline_dependency():
+        token = _deadline.set(time.monotonic() + budget)
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+
+    return _deadline_dependency
+
+
+def remaining_budget() -> float:
+    """
+    Retorna o tempo restante (em segundos) para chamadas à API externa.
+
+    Sem prazo definido, usa o timeout padrão configurado em UPSTREAM_TIMEOUT.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return settings.UPSTREAM_TIMEOUT
+    return max(0.0, min(settings.UPSTREAM_TIMEOUT, deadline - time.monotonic()))
+
+
+# ------------------------------------------------------------------------------
+# Latência observada da API externa
+# ------------------------------------------------------------------------------
+
+class LatencyTracker:
+    """
+    Janela deslizante das últimas latências observadas, usada para estimar o p95.
+    """
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=size)
+        self.min_samples = min_samples
+        self._p95: Optional[float] = None
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self._p95 = None
+
+    def p95(self) -> Optional[float]:
+        """
+        Retorna o p95 das latências, ou None se ainda não houver amostras suficientes.
+        """
+        if len(self.samples) < self.min_samples:
+            return None
+        if self._p95 is None:
+            ordered = sorted(self.samples)
+            self._p95 = ordered[int(len(ordered) * 0.95) - 1]
+        return self._p95
+
+
+latency = LatencyTracker(min_samples=settings.UPSTREAM_HEDGE_MIN_SAMPLES)
+
+# Contadores para limitar a fração de requisições duplicadas
+_stats = {"requests": 0, "hedged": 0}
+
+
+def _may_hedge() -> bool:
+    return _stats["hedged"] < _stats["requests"] * settings.UPSTREAM_HEDGE_MAX_RATIO
+
+
+# ------------------------------------------------------------------------------
+# Requisições com deadline e hedging
+# ------------------------------------------------------------------------------
+
+async def upstream_get(path: str, headers: Optional[dict] = None) -> httpx.Response:
+    """
+    Executa um GET na API externa respeitando o orçamento de tempo da requisição.
+
+    Se a resposta demorar mais que o p95 observado, uma segunda requisição idêntica
+    é disparada e a primeira resposta a chegar é utilizada.
+
+    Args:
+        path (str): Caminho relativo à URL base (ex: "/products/1").
+        headers (Optional[dict]): Headers adicionais (ex: If-None-Match em revalidações).
+
+    Returns:
+        httpx.Response: Resposta da API externa.
+
+    Raises:
+        httpx.TimeoutException: Se o orçamento de tempo se esgotar.
+        httpx.RequestError: Em caso de falha de rede.
+    """
+    budget = remaining_budget()
+    if budget <= 0:
+        raise httpx.TimeoutException(f"Orçamento de tempo esgotado antes de buscar {path}")
+
+    url = f"{settings.PRODUCTS_API_URL}{path}"
+    deadline = time.monotonic() + budget
+    _stats["requests"] += 1
+
+    client = await get_http_client()
+
+    async def attempt() -> httpx.Response:
+        with tracer.span(f"GET {path}", CLIENT, **{"http.method": "GET", "http.url": url}) as span:
+            request_headers = headers
+            if span is not None:
+                # Propaga o trace para a API externa (W3C Trace Context)
+                request_headers = {**(headers or {}), "traceparent": span.traceparent}
+            started = time.monotonic()
+            response = await client.get(url, headers=request_headers, timeout=max(0.001, deadline - started))
+            latency.observe(time.monotonic() - started)
+            if span is not None:
+                span.attributes["http.status_code"] = response.status_code
+            return response
+
+    pending = {asyncio.create_task(attempt())}
+    try:
+        hedge_after = latency.p95()
+        if hedge_after is not None and hedge_after < budget and _may_hedge():
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            if not done:
+                _stats["hedged"] += 1
+                logger.info(f"[Upstream] {path} passou do p95 ({hedge_after:.3f}s). Enviando requisição duplicada.")
+                pending.add(asyncio.create_task(attempt()))
+
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(0.0, deadline - time.monotonic()),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+
+        if error is not None:
+            raise error
+        raise httpx.TimeoutException(f"Orçamento de tempo esgotado ao buscar {path}")
+    finally:
+        for task in pending:
+            task.cancel()
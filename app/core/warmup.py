@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+
+class WarmUp:
+    """
+    Fase de aquecimento executada na inicialização de cada worker, antes de receber tráfego.
+
+    As etapas (abrir conexões, carregar caches) rodam em paralelo e com tempo máximo.
+    Falhas são registradas em log e não impedem o worker de subir: o aquecimento
+    reduz a latência das primeiras requisições, mas não é pré-requisito para atendê-las.
+
+    Atributos:
+        ready (bool): Indica se o worker concluiu o aquecimento e pode receber tráfego.
+        results (dict): Resultado de cada etapa ("ok", "error" ou "timeout") e sua duração.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.steps: List[Tuple[str, Callable[[], Awaitable]]] = []
+        self.results: Dict[str, dict] = {}
+        self.ready = False
+
+    def add(self, name: str, step: Callable[[], Awaitable]):
+        """
+        Registra uma etapa do aquecimento.
+
+        Args:
+            name (str): Nome da etapa (usado nos logs e no endpoint de prontidão).
+            step (Callable): Corrotina sem argumentos a ser executada.
+        """
+        self.steps.append((name, step))
+
+    async def run(self):
+        """
+        Executa todas as etapas registradas e marca o worker como pronto.
+        """
+        started = time.monotonic()
+        await asyncio.gather(*(self._run_step(name, step) for name, step in self.steps))
+        self.ready = True
+        logger.info(f"[WarmUp] Aquecimento concluído em {time.monotonic() - started:.3f}s: {self.results}")
+
+    async def _run_step(self, name: str, step: Callable[[], Awaitable]):
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(step(), timeout=self.timeout)
+            status = "ok"
+        except asyncio.TimeoutError:
+            logger.warning(f"[WarmUp] Etapa '{name}' excedeu {self.timeout}s.")
+            status = "timeout"
+        except Exception as e:
+            logger.warning(f"[WarmUp] Erro na etapa '{name}': {e}")
+            status = "error"
+        self.results[name] = {"status": status, "seconds": round(time.monotonic() - started, 3)}
+
+    def status(self) -> dict:
+        """
+        Estado do aquecimento, exposto pelo endpoint de prontidão.
+        """
+        return {"status": "ready" if self.ready else "warming_up", "steps": self.results}
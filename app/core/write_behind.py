@@ -0,0 +1,99 @@
+import asyncio
+import contextvars
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.cache_backends import CacheBackend
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """
+    Fila de gravações no cache feitas em segundo plano (write-behind).
+
+    A requisição apenas enfileira a gravação e segue; uma task do worker esvazia a fila
+    em lotes de até `batch_size` chaves, cada lote enviado ao cache de uma vez (pipeline
+    no Redis). A task é criada na primeira gravação e termina quando a fila esvazia.
+
+    Gravações repetidas da mesma chave ainda pendentes são agrupadas (vale a última).
+    Com a fila cheia (`max_size` chaves pendentes), novas chaves são descartadas e
+    contadas: o cache é apenas uma cópia, e a próxima leitura busca o dado na origem.
+
+    Atributos:
+        backend (CacheBackend): Backend de cache que recebe as gravações.
+        max_size (int): Número máximo de chaves pendentes.
+        batch_size (int): Número máximo de chaves por lote.
+    """
+
+    def __init__(self, backend: CacheBackend, max_size: int, batch_size: int):
+        self.backend = backend
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.pending: "OrderedDict[str, Tuple[str, Optional[int]]]" = OrderedDict()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def put(self, key: str, value: str, ex: Optional[int] = None) -> bool:
+        """
+        Enfileira a gravação de um valor já serializado, sem aguardar o cache.
+
+        Returns:
+            bool: False se a gravação foi descartada (fila cheia).
+        """
+        if key not in self.pending and len(self.pending) >= self.max_size:
+            self.dropped += 1
+            return False
+        self.pending[key] = (value, ex)
+        if not self._draining():
+            # Contexto vazio: a task sobrevive à requisição e não herda seu estado (ex: tracing)
+            self._task = asyncio.get_running_loop().create_task(self._drain(), context=contextvars.Context())
+        return True
+
+    def _draining(self) -> bool:
+        """
+        Indica se há uma task esvaziando a fila no loop em execução. Uma task de outro loop
+        (ex: loop encerrado e recriado) nunca termina e não pode ser reaproveitada.
+        """
+        return (
+            self._task is not None
+            and not self._task.done()
+            and self._task.get_loop() is asyncio.get_running_loop()
+        )
+
+    async def _drain(self):
+        while self.pending:
+            batch = []
+            while self.pending and len(batch) < self.batch_size:
+                key, (value, ex) = self.pending.popitem(last=False)
+                batch.append((key, value, ex))
+            try:
+                await self.backend.set_many(batch)
+                self.written += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.warning(f"[Cache] Erro ao gravar lote de {len(batch)} chave(s) em segundo plano: {e}")
+            self.batches += 1
+
+    async def flush(self):
+        """
+        Grava as chaves pendentes e aguarda a task em andamento (encerramento do worker).
+        """
+        if self._draining():
+            await self._task
+        if self.pending:
+            await self._drain()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self.pending),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
@@ -1,12 +1,22 @@
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
+import asyncio
+import logging
+import uuid
 
-from app.models.models import Client
+from app.models.models import Client, ClientDeletionJob, Favorite
 from app.schemas.schemas import ClientCreate, ClientUpdate
+from app.core.database import SessionLocal
 from app.core.security import hash_password, verify_password
 
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------------------
 # CRUD de Cliente
 # ---------------------------------------------------------------------
@@ -72,19 +82,41 @@ async def get_client_by_email(db: AsyncSession, email: str) -> Client:
     result = await db.execute(select(Client).where(Client.email == email))
     return result.scalars().first()
 
-async def get_all_clients(db: AsyncSession):
+async def get_clients_page(db: AsyncSession, limit: int = 50, after_id: Optional[int] = None) -> List[Client]:
     """
-    Lista todos os clientes.
+    Lista clientes com paginação por cursor (keyset), ordenados por ID.
 
     Args:
         db (AsyncSession): Sessão de banco de dados.
+        limit (int): Número máximo de resultados.
+        after_id (Optional[int]): Retorna apenas clientes com ID maior que este (cursor).
 
     Returns:
-        list[Client]: Lista de clientes.
+        list[Client]: Página de clientes.
     """
-    result = await db.execute(select(Client))
+    stmt = select(Client).order_by(Client.id).limit(limit)
+    if after_id:
+        stmt = stmt.where(Client.id > after_id)
+    result = await db.execute(stmt)
     return result.scalars().all()
 
+async def stream_clients(db: AsyncSession, chunk_size: int = 1000) -> AsyncIterator[List[Client]]:
+    """
+    Percorre todos os clientes por um cursor do lado do servidor, em blocos.
+
+    Args:
+        db (AsyncSession): Sessão de banco de dados.
+        chunk_size (int): Quantidade de clientes lidos por bloco.
+
+    Yields:
+        list[Client]: Bloco de clientes.
+    """
+    result = await db.stream_scalars(
+        select(Client).order_by(Client.id).execution_options(yield_per=chunk_size)
+    )
+    async for chunk in result.partitions(chunk_size):
+        yield chunk
+
 async def update_client(db: AsyncSession, client_id: int, client: ClientUpdate):
     """
     Atualiza os dados de um cliente existente.
@@ -130,6 +162,9 @@ async def delete_client(db: AsyncSession, client_id: int):
     """
     Exclui um cliente do banco de dados.
 
+    A exclusão é um único DELETE: os favoritos são removidos pelo ON DELETE CASCADE
+    da chave estrangeira, sem carregá-los na sessão.
+
     Args:
         db (AsyncSession): Sessão de banco de dados.
         client_id (int): ID do cliente a ser excluído.
@@ -140,11 +175,163 @@ async def delete_client(db: AsyncSession, client_id: int):
     Raises:
         HTTPException: Se o cliente não for encontrado.
     """
-    existing = await get_client_by_id(db, client_id)
-    await db.delete(existing)
+    result = await db.execute(delete(Client.__table__).where(Client.__table__.c.id == client_id))
     await db.commit()
+    if not result.rowcount:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado")
     return {"message": f"Cliente {client_id} excluído com sucesso"}
 
+# ---------------------------------------------------------------------
+# Exclusão assíncrona (contas com muitos favoritos)
+# ---------------------------------------------------------------------
+
+# Tempo de retenção dos jobs de exclusão concluídos (em segundos)
+DELETION_JOB_TTL = 24 * 3600
+
+# Jobs ainda não concluídos (retomados se ficarem parados)
+_UNFINISHED = ("pending", "running")
+
+# Tasks de exclusão em execução neste worker
+_deletion_tasks: set = set()
+
+
+async def get_deletion_job(db: AsyncSession, job_id: str) -> Optional[dict]:
+    """
+    Retorna o status de um job de exclusão de cliente.
+
+    Args:
+        db (AsyncSession): Sessão de banco de dados.
+        job_id (str): ID do job.
+
+    Returns:
+        dict | None: Status do job, ou None se não encontrado.
+    """
+    job = await db.get(ClientDeletionJob, job_id)
+    if job is None:
+        return None
+    return {"job_id": job.id, "status": job.status, "deleted_favorites": job.deleted_favorites}
+
+
+def _update_deletion_job(job_id: str, **values):
+    table = ClientDeletionJob.__table__
+    return update(table).where(table.c.id == job_id).values(updated_at=datetime.now(timezone.utc), **values)
+
+
+async def delete_client_in_chunks(client_id: int, job_id: str, chunk_size: int = 1000, pause: float = 0.05):
+    """
+    Exclui os favoritos do cliente em lotes (cada um em sua transação) e, por fim, o cliente.
+
+    O progresso do job é gravado na mesma transação de cada lote. Como cada lote apaga
+    apenas os favoritos restantes, um job interrompido pode ser executado novamente.
+
+    Args:
+        client_id (int): ID do cliente.
+        job_id (str): ID do job, para registro do progresso.
+        chunk_size (int): Favoritos apagados por lote.
+        pause (float): Pausa entre lotes (em segundos).
+    """
+    table = Favorite.__table__
+    jobs = ClientDeletionJob.__table__
+
+    try:
+        async with SessionLocal() as db:
+            await db.execute(_update_deletion_job(job_id, status="running"))
+            await db.commit()
+            while True:
+                batch = select(table.c.id).where(table.c.client_id == client_id).limit(chunk_size)
+                result = await db.execute(delete(table).where(table.c.id.in_(batch)))
+                await db.execute(_update_deletion_job(
+                    job_id, deleted_favorites=jobs.c.deleted_favorites + result.rowcount
+                ))
+                await db.commit()
+                if result.rowcount < chunk_size:
+                    break
+                await asyncio.sleep(pause)
+
+            await db.execute(delete(Client.__table__).where(Client.__table__.c.id == client_id))
+            await db.execute(_update_deletion_job(job_id, status="done"))
+            await db.commit()
+    except Exception as e:
+        logger.error(f"Erro ao excluir cliente {client_id} (job {job_id}): {e}")
+        try:
+            async with SessionLocal() as db:
+                await db.execute(_update_deletion_job(job_id, status="failed"))
+                await db.commit()
+        except Exception as error:
+            # O job permanece inacabado e será retomado
+            logger.error(f"Erro ao registrar falha do job {job_id}: {error}")
+
+
+def _run_deletion_job(client_id: int, job_id: str, chunk_size: int, pause: float):
+    task = asyncio.create_task(delete_client_in_chunks(client_id, job_id, chunk_size, pause))
+    _deletion_tasks.add(task)
+    task.add_done_callback(_deletion_tasks.discard)
+
+
+async def start_client_deletion_job(db: AsyncSession, client_id: int, chunk_size: int = 1000, pause: float = 0.05) -> str:
+    """
+    Registra e inicia a exclusão assíncrona de um cliente em background.
+
+    Args:
+        db (AsyncSession): Sessão de banco de dados.
+        client_id (int): ID do cliente.
+        chunk_size (int): Favoritos apagados por lote.
+        pause (float): Pausa entre lotes (em segundos).
+
+    Returns:
+        str: ID do job, para consulta do status.
+    """
+    job_id = uuid.uuid4().hex
+    db.add(ClientDeletionJob(id=job_id, client_id=client_id, updated_at=datetime.now(timezone.utc)))
+    await db.commit()
+
+    _run_deletion_job(client_id, job_id, chunk_size, pause)
+    return job_id
+
+
+async def resume_client_deletion_jobs(
+    db: AsyncSession,
+    stale_after: int = 300,
+    chunk_size: int = 1000,
+    pause: float = 0.05
+) -> int:
+    """
+    Retoma as exclusões interrompidas (worker encerrado durante o job) e remove os jobs
+    concluídos há mais de um dia.
+
+    Um job é considerado interrompido quando não registra atividade há `stale_after`
+    segundos. Cada job é reivindicado com um UPDATE condicional, para ser retomado
+    por um único worker.
+
+    Args:
+        db (AsyncSession): Sessão de banco de dados.
+        stale_after (int): Tempo sem atividade (em segundos) até o job ser retomado.
+        chunk_size (int): Favoritos apagados por lote.
+        pause (float): Pausa entre lotes (em segundos).
+
+    Returns:
+        int: Quantidade de jobs retomados.
+    """
+    table = ClientDeletionJob.__table__
+    now = datetime.now(timezone.utc)
+    stale = (table.c.status.in_(_UNFINISHED), table.c.updated_at < now - timedelta(seconds=stale_after))
+
+    rows = (await db.execute(select(table.c.id, table.c.client_id).where(*stale))).all()
+    resumed = 0
+    for job_id, client_id in rows:
+        claimed = await db.execute(update(table).where(table.c.id == job_id, *stale).values(updated_at=now))
+        await db.commit()
+        if claimed.rowcount:
+            logger.info(f"Retomando exclusão do cliente {client_id} (job {job_id}).")
+            _run_deletion_job(client_id, job_id, chunk_size, pause)
+            resumed += 1
+
+    await db.execute(delete(table).where(
+        table.c.status.not_in(_UNFINISHED), table.c.updated_at < now - timedelta(seconds=DELETION_JOB_TTL)
+    ))
+    await db.commit()
+    return resumed
+
 # ---------------------------------------------------------------------
 # Autenticação
 # ---------------------------------------------------------------------
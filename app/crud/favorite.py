@@ -1,7 +1,22 @@
+from sqlalchemy import delete, update, func, or_, bindparam, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.models.models import Favorite
+from sqlalchemy.sql import Select
+from app.models.models import Client, Favorite
+from app.core.batching import MicroBatcher
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.leaderboard import favorites_leaderboard
+from app.core.upstream import upstream_get
+from app.crud.product import revalidate_product
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Union
+from datetime import datetime, timedelta, timezone
+import asyncio
+import base64
+import binascii
 import httpx
+import json
 import logging
 
 # Configuração de logging
@@ -25,6 +40,8 @@ async def get_product_by_id(product_id: int) -> dict:
     Busca detalhes de um produto pela API externa.
     Em caso de falha, retorna dados simulados (fallback).
 
+    A chamada respeita o orçamento de tempo da requisição em andamento.
+
     Args:
         product_id (int): ID do produto.
 
@@ -32,17 +49,16 @@ async def get_product_by_id(product_id: int) -> dict:
         dict: Dados do produto.
     """
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"https://fakestoreapi.com/products/{product_id}")
-            response.raise_for_status()
-            product = response.json()
+        response = await upstream_get(f"/products/{product_id}")
+        response.raise_for_status()
+        product = response.json()
 
-            required_fields = ["id", "title", "image", "price"]
-            if not all(field in product for field in required_fields):
-                logger.warning(f"Produto {product_id} retornou dados incompletos: {product}")
-                return None
+        required_fields = ["id", "title", "image", "price"]
+        if not all(field in product for field in required_fields):
+            logger.warning(f"Produto {product_id} retornou dados incompletos: {product}")
+            return None
 
-            return product
+        return product
 
     except httpx.RequestError as e:
         logger.error(f"Erro na requisição do produto {product_id}: {e}")
@@ -54,14 +70,230 @@ async def get_product_by_id(product_id: int) -> dict:
     logger.warning(f"API externa falhou para o produto {product_id}. Usando dados simulados.")
     return fake_product_data
 
+
+async def fetch_product_snapshot(product_id: int) -> Optional[dict]:
+    """
+    Busca um produto na API externa para atualizar os dados salvos nos favoritos.
+    Diferente de get_product_by_id, nunca retorna dados simulados.
+
+    A busca é condicional: se o produto em cache não mudou na API externa (304),
+    apenas a expiração do cache é renovada e a cópia em cache é usada.
+
+    Args:
+        product_id (int): ID do produto.
+
+    Returns:
+        Optional[dict]: Dados do produto, ou None se indisponível ou incompleto.
+    """
+    try:
+        product = json.loads(await revalidate_product(product_id))
+    except Exception as e:
+        logger.warning(f"Não foi possível atualizar o produto {product_id}: {e}")
+        return None
+
+    if not all(field in product for field in ["id", "title", "image", "price"]):
+        return None
+    return product
+
+# ------------------------------------------------------------------------------
+# Versão e contadores da lista de favoritos
+# ------------------------------------------------------------------------------
+
+def favorites_page_cache_key(client_id: int, version: int, page: str) -> str:
+    """
+    Monta a chave de cache de uma página de favoritos.
+
+    A chave inclui a versão da lista do cliente: ao alterar os favoritos a versão
+    é incrementada e as páginas antigas deixam de ser acessadas imediatamente.
+
+    Args:
+        client_id (int): ID do cliente.
+        version (int): Versão da lista de favoritos do cliente.
+        page (str): Parâmetros da página (paginação, ordenação e filtros).
+    """
+    return f"favorites:{client_id}:v{version}:{page}"
+
+
+async def record_favorites_change(db: AsyncSession, client_id: int, count_delta: int, price_delta: float):
+    """
+    Atualiza, na transação corrente, a versão, a data de alteração e os contadores
+    desnormalizados (quantidade e soma de preços) da lista de favoritos do cliente.
+
+    Args:
+        db (AsyncSession): Sessão do banco de dados.
+        client_id (int): ID do cliente.
+        count_delta (int): Variação na quantidade de favoritos.
+        price_delta (float): Variação na soma dos preços.
+    """
+    await db.execute(
+        update(Client)
+        .where(Client.id == client_id)
+        .values(
+            favorites_version=Client.favorites_version + 1,
+            favorites_count=Client.favorites_count + count_delta,
+            favorites_price_sum=Client.favorites_price_sum + price_delta,
+            favorites_updated_at=func.now(),
+        )
+    )
+
+
+def _actual_counters():
+    """
+    Subconsultas com a quantidade e a soma de preços reais dos favoritos de cada cliente.
+    """
+    actual_count = (
+        select(func.count(Favorite.id))
+        .where(Favorite.client_id == Client.id, Favorite.deleted_at.is_(None))
+        .scalar_subquery()
+    )
+    actual_sum = (
+        select(func.coalesce(func.sum(Favorite.price), 0.0))
+        .where(Favorite.client_id == Client.id, Favorite.deleted_at.is_(None))
+        .scalar_subquery()
+    )
+    return actual_count, actual_sum
+
+
+async def refresh_favorite_counters(db: AsyncSession, client_ids: Union[List[int], Select]):
+    """
+    Recalcula, na transação corrente, os contadores e a versão dos clientes informados.
+    Usado após escritas em lote (ex: importação), em que os deltas não são conhecidos.
+
+    Args:
+        db (AsyncSession): Sessão do banco de dados.
+        client_ids (list[int] | Select): IDs dos clientes afetados, ou subconsulta que os retorna.
+    """
+    if isinstance(client_ids, list) and not client_ids:
+        return
+    actual_count, actual_sum = _actual_counters()
+    await db.execute(
+        update(Client)
+        .where(Client.id.in_(client_ids))
+        .values(
+            favorites_version=Client.favorites_version + 1,
+            favorites_count=actual_count,
+            favorites_price_sum=actual_sum,
+            favorites_updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def reconcile_favorite_counters(db: AsyncSession) -> int:
+    """
+    Corrige divergências entre os contadores desnormalizados e a tabela de favoritos.
+
+    Args:
+        db (AsyncSession): Sessão do banco de dados.
+
+    Returns:
+        int: Quantidade de clientes corrigidos.
+    """
+    actual_count, actual_sum = _actual_counters()
+    result = await db.execute(
+        update(Client)
+        .where(or_(
+            Client.favorites_count != actual_count,
+            func.abs(Client.favorites_price_sum - actual_sum) > 0.005,
+        ))
+        .values(favorites_count=actual_count, favorites_price_sum=actual_sum)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if result.rowcount:
+        logger.warning(f"Contadores de favoritos corrigidos para {result.rowcount} cliente(s).")
+    return result.rowcount
+
+# ------------------------------------------------------------------------------
+# Ranking de produtos mais favoritados
+# ------------------------------------------------------------------------------
+
+async def reconcile_leaderboard(db: AsyncSession) -> int:
+    """
+    Reconstrói o ranking de produtos mais favoritados a partir do banco.
+
+    O ranking é atualizado de forma incremental em cada inclusão/remoção; esta
+    reconciliação periódica corrige divergências (ex: importações em lote, exclusão
+    de clientes e falhas do Redis).
+
+    Args:
+        db (AsyncSession): Sessão do banco de dados.
+
+    Returns:
+        int: Quantidade de produtos no ranking.
+    """
+    scores = await _leaderboard_scores(db)
+    await favorites_leaderboard.rebuild(scores)
+    return len(scores)
+
+
+async def _leaderboard_scores(db: AsyncSession) -> Dict[int, int]:
+    """
+    Conta os favoritos ativos de cada produto.
+    """
+    result = await db.execute(
+        select(Favorite.product_id, func.count(Favorite.id))
+        .where(Favorite.deleted_at.is_(None))
+        .group_by(Favorite.product_id)
+    )
+    return dict(result.all())
+
+
+async def refresh_leaderboard_memory(db: AsyncSession) -> int:
+    """
+    Atualiza a cópia em memória do ranking neste worker, a partir do Redis ou, se
+    vazio ou indisponível, do banco. Não grava no Redis: a reconstrução compartilhada
+    fica com o worker líder (reconcile_leaderboard).
+
+    Returns:
+        int: Quantidade de produtos no ranking.
+    """
+    if await favorites_leaderboard.load():
+        return len(favorites_leaderboard.memory.scores)
+    scores = await _leaderboard_scores(db)
+    favorites_leaderboard.memory.replace(scores)
+    return len(scores)
+
+
+async def load_leaderboard(db: AsyncSession) -> int:
+    """
+    Carrega o ranking na memória do worker a partir do Redis (aquecimento).
+    Se o Redis estiver vazio ou indisponível, reconstrói o ranking a partir do banco.
+
+    Returns:
+        int: Quantidade de produtos no ranking.
+    """
+    if await favorites_leaderboard.load():
+        return len(favorites_leaderboard.memory.scores)
+    return await reconcile_leaderboard(db)
+
 # ------------------------------------------------------------------------------
 # CRUD de favoritos
 # ------------------------------------------------------------------------------
 
+def _favorite_values(product_data: dict, now: datetime) -> dict:
+    """
+    Dados do produto salvos no favorito no momento da inclusão.
+    """
+    return {
+        "title": product_data["title"],
+        "image": product_data["image"],
+        "price": product_data["price"],
+        "review": str(product_data.get("rating", {}).get("rate", "")),
+        "created_at": now,
+        "synced_at": now,
+        "deleted_at": None,
+    }
+
+
 async def add_favorite(db: AsyncSession, client_id: int, product_data: dict) -> Favorite:
     """
     Adiciona um produto aos favoritos de um cliente.
 
+    Com FAVORITES_WRITE_BATCHING ativo, a inclusão é agrupada com as de outras
+    requisições e gravada em lote (ver favorite_writes), e a sessão informada é fechada
+    antes da espera pelo lote; caso contrário, é gravada diretamente na sessão informada.
+
     Args:
         db (AsyncSession): Sessão do banco de dados.
         client_id (int): ID do cliente.
@@ -70,55 +302,288 @@ async def add_favorite(db: AsyncSession, client_id: int, product_data: dict) ->
     Returns:
         Favorite: Instância do favorito criado ou existente.
     """
+    if settings.FAVORITES_WRITE_BATCHING:
+        # O lote usa sessão própria: a conexão da requisição volta ao pool durante a espera
+        await db.close()
+        return await favorite_writes.submit(("add", client_id, product_data))
+    return await _add_favorite(db, client_id, product_data)
+
+
+async def _add_favorite(db: AsyncSession, client_id: int, product_data: dict) -> Favorite:
     stmt = select(Favorite).where(
         Favorite.client_id == client_id,
         Favorite.product_id == product_data["id"]
     )
     result = await db.execute(stmt)
     existing = result.scalars().first()
-    if existing:
+    if existing and existing.deleted_at is None:
         logger.info(f"Produto {product_data['id']} já está nos favoritos.")
         return existing
 
-    favorite = Favorite(
-        client_id=client_id,
-        product_id=product_data["id"],
-        title=product_data["title"],
-        image=product_data["image"],
-        price=product_data["price"],
-        review=str(product_data.get("rating", {}).get("rate", ""))
-    )
-    db.add(favorite)
+    values = _favorite_values(product_data, datetime.now(timezone.utc))
+    if existing:
+        # Favorito removido (soft delete) ainda não expurgado: é reativado
+        favorite = existing
+        for key, value in values.items():
+            setattr(favorite, key, value)
+    else:
+        favorite = Favorite(client_id=client_id, product_id=product_data["id"], **values)
+        db.add(favorite)
+    await record_favorites_change(db, client_id, 1, favorite.price)
     await db.commit()
     await db.refresh(favorite)
+    await favorites_leaderboard.incr(favorite.product_id, 1)
     logger.info(f"Produto {product_data['id']} adicionado aos favoritos.")
     return favorite
 
-async def get_favorites_by_client(db: AsyncSession, client_id: int, limit: int = 10, offset: int = 0):
+
+# Ordenações da listagem de favoritos ("-" no início para ordem decrescente).
+# O ID desempata registros com o mesmo valor e completa o cursor.
+FAVORITE_SORTS = {
+    "id": Favorite.id,
+    "price": Favorite.price,
+    "created_at": Favorite.created_at,
+    "title": Favorite.title,
+}
+
+
+def encode_favorites_cursor(favorite: Favorite, sort: str) -> str:
     """
-    Retorna a lista de favoritos de um cliente com paginação.
+    Monta o cursor (opaco) que aponta para depois do favorito informado, na ordenação pedida.
+    """
+    value = getattr(favorite, sort.lstrip("-"))
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    # Sem o preenchimento "=", o cursor vai na URL sem precisar de escape
+    return base64.urlsafe_b64encode(json.dumps([value, favorite.id]).encode()).decode().rstrip("=")
+
+
+def decode_favorites_cursor(cursor: str, sort: str) -> tuple:
+    """
+    Lê um cursor gerado por encode_favorites_cursor.
+
+    Raises:
+        ValueError: Se o cursor for inválido.
+    """
+    try:
+        value, favorite_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if sort.lstrip("-") == "created_at":
+            value = datetime.fromisoformat(value)
+        return value, int(favorite_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+
+
+async def get_favorites_by_client(
+    db: AsyncSession,
+    client_id: int,
+    limit: int = 10,
+    offset: int = 0,
+    sort: str = "id",
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    after: Optional[str] = None,
+):
+    """
+    Retorna a lista de favoritos de um cliente com paginação, ordenação e filtro por preço.
+
+    Ordenação e filtros são feitos no banco, sobre as colunas desnormalizadas do favorito,
+    usando os índices (client_id, price) e (client_id, created_at). Com `after`, a página
+    começa depois do cursor (keyset), sem percorrer os registros anteriores como no offset.
 
     Args:
         db (AsyncSession): Sessão do banco de dados.
         client_id (int): ID do cliente.
         limit (int): Número máximo de resultados.
         offset (int): Quantidade de itens a pular.
+        sort (str): Campo de ordenação (id, price, created_at ou title; "-" para decrescente).
+        min_price (Optional[float]): Preço mínimo.
+        max_price (Optional[float]): Preço máximo.
+        after (Optional[str]): Cursor da página anterior (encode_favorites_cursor).
 
     Returns:
         list[Favorite]: Lista de produtos favoritos.
+
+    Raises:
+        ValueError: Se o cursor for inválido.
     """
-    result = await db.execute(
-        select(Favorite)
-        .where(Favorite.client_id == client_id)
-        .limit(limit)
-        .offset(offset)
-    )
+    descending = sort.startswith("-")
+    column = FAVORITE_SORTS[sort.lstrip("-")]
+
+    stmt = select(Favorite).where(Favorite.client_id == client_id, Favorite.deleted_at.is_(None))
+    if min_price is not None:
+        stmt = stmt.where(Favorite.price >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(Favorite.price <= max_price)
+
+    if after:
+        value, favorite_id = decode_favorites_cursor(after, sort)
+        position = tuple_(column, Favorite.id) if column is not Favorite.id else Favorite.id
+        bound = tuple_(value, favorite_id) if column is not Favorite.id else favorite_id
+        stmt = stmt.where(position < bound if descending else position > bound)
+
+    if column is Favorite.id:
+        order = [Favorite.id.desc() if descending else Favorite.id]
+    else:
+        order = [column.desc(), Favorite.id.desc()] if descending else [column, Favorite.id]
+
+    result = await db.execute(stmt.order_by(*order).limit(limit).offset(offset))
     return result.scalars().all()
 
+# ------------------------------------------------------------------------------
+# Atualização dos dados de produto salvos nos favoritos
+# ------------------------------------------------------------------------------
+
+SNAPSHOT_COLUMNS = ["title", "image", "price", "review"]
+
+
+def _snapshot(product: dict) -> dict:
+    return {
+        "title": product["title"],
+        "image": product["image"],
+        "price": product["price"],
+        "review": str(product.get("rating", {}).get("rate", "")),
+    }
+
+
+async def refresh_favorite_snapshots(
+    db: AsyncSession,
+    max_age: int = 3600,
+    batch_size: int = 100,
+    concurrency: int = 10
+) -> int:
+    """
+    Atualiza os dados de produto (título, imagem, preço e review) salvos nos favoritos.
+
+    Os favoritos desatualizados são agrupados por product_id, de modo que cada produto
+    distinto é buscado uma única vez na API externa, independente de quantos clientes
+    o favoritaram. As colunas alteradas são atualizadas em lote e `synced_at` é registrado.
+
+    Args:
+        db (AsyncSession): Sessão do banco de dados.
+        max_age (int): Idade máxima (em segundos) de um snapshot antes de ser atualizado.
+        batch_size (int): Quantidade de produtos distintos por lote.
+        concurrency (int): Requisições simultâneas à API externa.
+
+    Returns:
+        int: Quantidade de produtos atualizados.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+    semaphore = asyncio.Semaphore(concurrency)
+    failed: set = set()
+    refreshed = 0
+
+    async def fetch(product_id: int):
+        async with semaphore:
+            return product_id, await fetch_product_snapshot(product_id)
+
+    while True:
+        stale = (Favorite.synced_at.is_(None)) | (Favorite.synced_at < cutoff)
+        stmt = (
+            select(Favorite.product_id)
+            .where(stale, Favorite.deleted_at.is_(None))
+            .group_by(Favorite.product_id)
+            .order_by(Favorite.product_id)
+            .limit(batch_size)
+        )
+        if failed:
+            stmt = stmt.where(Favorite.product_id.not_in(failed))
+        product_ids = (await db.execute(stmt)).scalars().all()
+
+        # Variações dos dados salvos para cada produto do lote (normalmente uma por produto)
+        snapshot_columns = [getattr(Favorite, column) for column in SNAPSHOT_COLUMNS]
+        current = {}
+        if product_ids:
+            rows = await db.execute(
+                select(Favorite.product_id, *snapshot_columns)
+                .where(Favorite.product_id.in_(product_ids), Favorite.deleted_at.is_(None))
+                .group_by(Favorite.product_id, *snapshot_columns)
+            )
+            for product_id, *values in rows.all():
+                current.setdefault(product_id, []).append(dict(zip(SNAPSHOT_COLUMNS, values)))
+        if not current:
+            break
+
+        fetched = {}
+        for product_id, product in await asyncio.gather(*(fetch(pid) for pid in current)):
+            if product is None:
+                failed.add(product_id)
+            else:
+                fetched[product_id] = _snapshot(product)
+
+        now = datetime.now(timezone.utc)
+        changed = [
+            {"pid": product_id, **snapshot}
+            for product_id, snapshot in fetched.items()
+            if any(row != snapshot for row in current[product_id])
+        ]
+        if changed:
+            await db.execute(
+                update(Favorite.__table__)
+                .where(Favorite.__table__.c.product_id == bindparam("pid"))
+                .values(**{column: bindparam(column) for column in SNAPSHOT_COLUMNS}),
+                changed,
+            )
+            # Preços alterados mudam o valor total e o conteúdo das páginas dos clientes afetados
+            await refresh_favorite_counters(
+                db,
+                select(Favorite.client_id).where(Favorite.product_id.in_([row["pid"] for row in changed]))
+            )
+        if fetched:
+            await db.execute(
+                update(Favorite.__table__)
+                .where(Favorite.__table__.c.product_id.in_(list(fetched)))
+                .values(synced_at=now)
+            )
+        await db.commit()
+        refreshed += len(changed)
+
+    if refreshed or failed:
+        logger.info(f"Snapshots de favoritos: {refreshed} produto(s) atualizado(s), {len(failed)} falha(s).")
+    return refreshed
+
+# Colunas desnormalizadas usadas na exportação (sem consulta à API externa)
+EXPORT_COLUMNS = ["client_id", "product_id", "title", "image", "price", "review", "created_at"]
+
+
+async def stream_favorites(
+    db: AsyncSession,
+    client_id: Optional[int] = None,
+    chunk_size: int = 1000
+) -> AsyncIterator[List[tuple]]:
+    """
+    Percorre os favoritos por um cursor do lado do servidor, em blocos de tuplas.
+
+    Args:
+        db (AsyncSession): Sessão do banco de dados.
+        client_id (Optional[int]): Restringe a um cliente; None exporta todos os favoritos.
+        chunk_size (int): Quantidade de linhas lidas por bloco.
+
+    Yields:
+        list[tuple]: Bloco de linhas na ordem de EXPORT_COLUMNS.
+    """
+    stmt = (
+        select(*(getattr(Favorite, column) for column in EXPORT_COLUMNS))
+        .where(Favorite.deleted_at.is_(None))
+        .order_by(Favorite.id)
+    )
+    if client_id is not None:
+        stmt = stmt.where(Favorite.client_id == client_id)
+
+    result = await db.stream(stmt.execution_options(yield_per=chunk_size))
+    async for chunk in result.partitions(chunk_size):
+        yield chunk
+
+
 async def remove_favorite(db: AsyncSession, client_id: int, product_id: int) -> bool:
     """
     Remove um produto da lista de favoritos de um cliente.
 
+    A remoção é lógica (soft delete): um único UPDATE preenche `deleted_at`, e o
+    job de expurgo apaga fisicamente os registros antigos em pequenos lotes.
+    Com FAVORITES_WRITE_BATCHING ativo, a remoção é gravada em lote (ver favorite_writes)
+    e a sessão informada é fechada antes da espera pelo lote.
+
     Args:
         db (AsyncSession): Sessão do banco de dados.
         client_id (int): ID do cliente.
@@ -127,18 +592,238 @@ async def remove_favorite(db: AsyncSession, client_id: int, product_id: int) ->
     Returns:
         bool: True se removido, False se não encontrado.
     """
-    stmt = select(Favorite).where(
-        Favorite.client_id == client_id,
-        Favorite.product_id == product_id
+    if settings.FAVORITES_WRITE_BATCHING:
+        # O lote usa sessão própria: a conexão da requisição volta ao pool durante a espera
+        await db.close()
+        return await favorite_writes.submit(("remove", client_id, product_id))
+    return await _remove_favorite(db, client_id, product_id)
+
+
+async def _remove_favorite(db: AsyncSession, client_id: int, product_id: int) -> bool:
+    result = await db.execute(
+        update(Favorite.__table__)
+        .where(
+            Favorite.__table__.c.client_id == client_id,
+            Favorite.__table__.c.product_id == product_id,
+            Favorite.__table__.c.deleted_at.is_(None),
+        )
+        .values(deleted_at=datetime.now(timezone.utc))
+        .returning(Favorite.__table__.c.price)
     )
-    result = await db.execute(stmt)
-    favorite = result.scalars().first()
+    price = result.scalar()
 
-    if not favorite:
+    if price is None:
+        await db.rollback()
         logger.warning(f"Produto {product_id} não encontrado nos favoritos do cliente {client_id}.")
         return False
 
-    await db.delete(favorite)
+    await record_favorites_change(db, client_id, -1, -price)
     await db.commit()
+    await favorites_leaderboard.incr(product_id, -1)
     logger.info(f"Produto {product_id} removido dos favoritos do cliente {client_id}.")
     return True
+
+# ------------------------------------------------------------------------------
+# Gravação em lote (group commit) de inclusões e remoções
+# ------------------------------------------------------------------------------
+
+def _write_key(write: tuple) -> tuple:
+    action, client_id, target = write
+    return client_id, target["id"] if action == "add" else target
+
+
+def _conflict_free_groups(writes: List[tuple]) -> List[List[int]]:
+    """
+    Divide o lote (índices, na ordem de chegada) em grupos sem dois pedidos para o mesmo
+    par cliente/produto, de modo que incluir e remover o mesmo favorito no mesmo lote
+    tenha o mesmo efeito que as gravações individuais em sequência.
+    """
+    groups: List[List[int]] = [[]]
+    seen: set = set()
+    for index, write in enumerate(writes):
+        key = _write_key(write)
+        if key in seen:
+            groups.append([])
+            seen.clear()
+        seen.add(key)
+        groups[-1].append(index)
+    return groups
+
+
+async def _apply_favorite_writes(
+    db: AsyncSession,
+    writes: List[tuple],
+    indexes: List[int],
+    results: list,
+    deltas: Dict[int, list],
+    scores: Dict[int, int],
+):
+    """
+    Aplica, na transação corrente, um grupo de inclusões e remoções com uma instrução
+    por tipo: um UPDATE ... RETURNING para as remoções, um SELECT dos favoritos já
+    existentes e um INSERT de várias linhas para os novos.
+    """
+    now = datetime.now(timezone.utc)
+    table = Favorite.__table__
+    removes = [index for index in indexes if writes[index][0] == "remove"]
+    adds = [index for index in indexes if writes[index][0] == "add"]
+
+    if removes:
+        rows = await db.execute(
+            update(table)
+            .where(
+                tuple_(table.c.client_id, table.c.product_id).in_([_write_key(writes[i]) for i in removes]),
+                table.c.deleted_at.is_(None),
+            )
+            .values(deleted_at=now)
+            .returning(table.c.client_id, table.c.product_id, table.c.price)
+        )
+        removed = {(client_id, product_id): price for client_id, product_id, price in rows.all()}
+        for index in removes:
+            key = _write_key(writes[index])
+            results[index] = key in removed
+            if key in removed:
+                deltas[key[0]][0] -= 1
+                deltas[key[0]][1] -= removed[key]
+                scores[key[1]] -= 1
+
+    if adds:
+        result = await db.execute(
+            select(Favorite)
+            .where(tuple_(Favorite.client_id, Favorite.product_id).in_([_write_key(writes[i]) for i in adds]))
+            # Remoções de grupos anteriores (UPDATE direto na tabela) não atualizam os objetos já carregados
+            .execution_options(populate_existing=True)
+        )
+        existing = {(favorite.client_id, favorite.product_id): favorite for favorite in result.scalars()}
+        for index in adds:
+            _, client_id, product_data = writes[index]
+            favorite = existing.get((client_id, product_data["id"]))
+            if favorite is not None and favorite.deleted_at is None:
+                results[index] = favorite
+                continue
+            values = _favorite_values(product_data, now)
+            if favorite is not None:
+                for key, value in values.items():
+                    setattr(favorite, key, value)
+            else:
+                favorite = Favorite(client_id=client_id, product_id=product_data["id"], **values)
+                db.add(favorite)
+            results[index] = favorite
+            deltas[client_id][0] += 1
+            deltas[client_id][1] += favorite.price
+            scores[favorite.product_id] += 1
+        await db.flush()
+
+
+async def _write_favorite(write: tuple):
+    """
+    Grava um pedido individualmente, em sessão própria, devolvendo o erro em vez de lançá-lo.
+    """
+    action, client_id, target = write
+    try:
+        async with SessionLocal() as db:
+            if action == "add":
+                return await _add_favorite(db, client_id, target)
+            return await _remove_favorite(db, client_id, target)
+    except Exception as e:
+        return e
+
+
+async def flush_favorite_writes(writes: List[tuple]) -> list:
+    """
+    Grava um lote de inclusões e remoções de favoritos em uma única transação.
+
+    Cada pedido é uma tupla ("add", client_id, product_data) ou ("remove", client_id, product_id).
+    Os contadores dos clientes afetados são atualizados em um único UPDATE (executemany)
+    e o ranking de produtos depois do commit. Se o lote falhar, os pedidos são gravados
+    um a um, para que o erro de um não afete os demais.
+
+    Returns:
+        list: Resultado de cada pedido, na ordem recebida (Favorite, bool ou exceção).
+    """
+    results: list = [None] * len(writes)
+    deltas: Dict[int, list] = defaultdict(lambda: [0, 0.0])
+    scores: Dict[int, int] = defaultdict(int)
+    try:
+        async with SessionLocal() as db:
+            for indexes in _conflict_free_groups(writes):
+                await _apply_favorite_writes(db, writes, indexes, results, deltas, scores)
+            changes = [
+                {"cid": client_id, "dcount": count, "dprice": price}
+                for client_id, (count, price) in deltas.items() if count
+            ]
+            if changes:
+                clients = Client.__table__
+                await db.execute(
+                    update(clients)
+                    .where(clients.c.id == bindparam("cid"))
+                    .values(
+                        favorites_version=clients.c.favorites_version + 1,
+                        favorites_count=clients.c.favorites_count + bindparam("dcount"),
+                        favorites_price_sum=clients.c.favorites_price_sum + bindparam("dprice"),
+                        favorites_updated_at=func.now(),
+                    ),
+                    changes,
+                )
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"Falha ao gravar lote de {len(writes)} favorito(s), gravando individualmente: {e}")
+        return [await _write_favorite(write) for write in writes]
+
+    for product_id, delta in scores.items():
+        if delta:
+            await favorites_leaderboard.incr(product_id, delta)
+    logger.info(f"Lote de {len(writes)} gravação(ões) de favoritos aplicado.")
+    return results
+
+
+# Agrupador das gravações de favoritos (por worker), usado com FAVORITES_WRITE_BATCHING
+favorite_writes = MicroBatcher(
+    flush_favorite_writes,
+    window=settings.FAVORITES_WRITE_BATCH_WINDOW_MS / 1000,
+    max_items=settings.FAVORITES_WRITE_BATCH_SIZE,
+)
+
+
+async def purge_deleted_favorites(
+    db: AsyncSession,
+    retention: int = 7 * 24 * 3600,
+    batch_size: int = 500,
+    pause: float = 0.1
+) -> int:
+    """
+    Apaga fisicamente os favoritos removidos há mais de `retention` segundos.
+
+    Os registros são apagados em pequenos lotes, cada um em sua própria transação, com
+    uma pausa entre lotes para limitar o tempo de lock e a pressão sobre o vacuum.
+
+    Args:
+        db (AsyncSession): Sessão do banco de dados.
+        retention (int): Tempo (em segundos) que um favorito removido é mantido.
+        batch_size (int): Quantidade de registros apagados por lote.
+        pause (float): Pausa entre lotes (em segundos).
+
+    Returns:
+        int: Quantidade de registros apagados.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=retention)
+    table = Favorite.__table__
+    purged = 0
+
+    while True:
+        batch = (
+            select(table.c.id)
+            .where(table.c.deleted_at.is_not(None), table.c.deleted_at < cutoff)
+            .order_by(table.c.deleted_at)
+            .limit(batch_size)
+        )
+        result = await db.execute(delete(table).where(table.c.id.in_(batch)))
+        await db.commit()
+        purged += result.rowcount
+        if result.rowcount < batch_size:
+            break
+        await asyncio.sleep(pause)
+
+    if purged:
+        logger.info(f"{purged} favorito(s) removido(s) expurgado(s).")
+    return purged
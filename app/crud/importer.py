@@ -0,0 +1,275 @@
+from datetime import datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from typing import AsyncIterator, Dict, List, Optional
+import codecs
+import csv
+import json
+import logging
+
+from app.crud.favorite import refresh_favorite_counters
+from app.models.models import Client, Favorite
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Linhas por lote (COPY no PostgreSQL / INSERT em lote via executemany nos demais bancos)
+COPY_BATCH_SIZE = 10000
+INSERT_BATCH_SIZE = 1000
+
+CLIENT_FIELDS = ["name", "email", "hashed_password"]
+FAVORITE_FIELDS = ["client_email", "product_id", "title", "image", "price", "review"]
+
+# ------------------------------------------------------------------------------
+# Leitura de arquivos CSV / NDJSON
+# ------------------------------------------------------------------------------
+
+def import_format(content_type: str) -> Optional[str]:
+    """
+    Identifica o formato do arquivo de importação pelo Content-Type ou extensão.
+
+    Returns:
+        str | None: "csv", "ndjson" ou None se não suportado.
+    """
+    value = content_type.split(";")[0].strip().lower()
+    if value in ("text/csv", "csv") or value.endswith(".csv"):
+        return "csv"
+    if value in ("application/x-ndjson", "application/ndjson", "ndjson") or value.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+async def iter_records(lines: AsyncIterator[str], format: str) -> AsyncIterator[Optional[dict]]:
+    """
+    Converte linhas de um arquivo CSV (com cabeçalho) ou NDJSON em dicionários.
+
+    Campos CSV com quebra de linha dentro de aspas não são suportados. Linhas NDJSON
+    que não são um objeto JSON válido geram None (contadas como inválidas na importação).
+
+    Args:
+        lines (AsyncIterator[str]): Linhas do arquivo.
+        format (str): "csv" ou "ndjson".
+
+    Yields:
+        dict | None: Registro lido, ou None se a linha é inválida.
+    """
+    header: Optional[List[str]] = None
+    async for line in lines:
+        if not line.strip():
+            continue
+        if format == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield record if isinstance(record, dict) else None
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        yield dict(zip(header, values))
+
+
+async def iter_body_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Divide o corpo de uma requisição (recebido em blocos) em linhas de texto.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def _client_row(record: Optional[dict]) -> Optional[dict]:
+    try:
+        name = (record.get("name") or "").strip()
+        email = (record.get("email") or "").strip()
+        hashed_password = (record.get("hashed_password") or "").strip()
+    except (TypeError, AttributeError):
+        return None
+    # Sem hash bcrypt o cliente não teria como autenticar (não há fluxo de definição de senha)
+    if not name or not email or not hashed_password.startswith("$2"):
+        return None
+    return {"name": name, "email": email, "hashed_password": hashed_password}
+
+
+def _favorite_row(record: Optional[dict]) -> Optional[dict]:
+    try:
+        return {
+            "client_email": record["client_email"].strip(),
+            "product_id": int(record["product_id"]),
+            "title": record["title"],
+            "image": record["image"],
+            "price": float(record["price"]),
+            "review": str(record["review"]) if record.get("review") not in (None, "") else None,
+        }
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+
+async def _batches(records: AsyncIterator[Optional[dict]], to_row, size: int, result: Dict[str, int]):
+    batch = []
+    async for record in records:
+        row = to_row(record)
+        if row is None:
+            result["invalid"] += 1
+            continue
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# ------------------------------------------------------------------------------
+# Escrita em lote
+# ------------------------------------------------------------------------------
+
+def _is_postgres(db: AsyncSession) -> bool:
+    return db.bind.dialect.name == "postgresql"
+
+
+async def _copy_to_staging(db: AsyncSession, staging: str, like: str, columns: List[str], rows: List[dict]):
+    """
+    Cria uma tabela temporária e carrega as linhas via COPY (protocolo binário do asyncpg).
+    """
+    await db.execute(text(f"CREATE TEMP TABLE {staging} ({like}) ON COMMIT DROP"))
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        staging,
+        records=[tuple(row[column] for column in columns) for row in rows],
+        columns=columns,
+    )
+
+
+async def import_clients(db: AsyncSession, records: AsyncIterator[Optional[dict]]) -> Dict[str, int]:
+    """
+    Importa clientes em lote. E-mails já cadastrados são ignorados; registros sem
+    nome, e-mail ou hash bcrypt da senha são contados como inválidos.
+
+    No PostgreSQL usa COPY para uma tabela temporária seguida de
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING; nos demais bancos usa INSERT em lote (executemany).
+
+    Args:
+        db (AsyncSession): Sessão do banco de dados.
+        records (AsyncIterator[dict]): Registros com name, email e hashed_password (hash bcrypt).
+
+    Returns:
+        dict: Quantidade de linhas inseridas, ignoradas (conflito) e inválidas.
+    """
+    result = {"inserted": 0, "skipped": 0, "invalid": 0}
+    postgres = _is_postgres(db)
+    batch_size = COPY_BATCH_SIZE if postgres else INSERT_BATCH_SIZE
+
+    async for batch in _batches(records, _client_row, batch_size, result):
+        if postgres:
+            await _copy_to_staging(
+                db, "import_clients",
+                "name varchar(255), email varchar(255), hashed_password varchar(255)",
+                CLIENT_FIELDS, batch,
+            )
+            inserted = (await db.execute(text(
+                "INSERT INTO clients (name, email, hashed_password) "
+                "SELECT name, email, hashed_password FROM import_clients "
+                "ON CONFLICT (email) DO NOTHING"
+            ))).rowcount
+        else:
+            inserted = (await db.execute(
+                sqlite_insert(Client.__table__).on_conflict_do_nothing(index_elements=["email"]), batch
+            )).rowcount
+        await db.commit()
+
+        result["inserted"] += inserted
+        result["skipped"] += len(batch) - inserted
+
+    logger.info(f"Importação de clientes concluída: {result}")
+    return result
+
+
+async def import_favorites(db: AsyncSession, records: AsyncIterator[Optional[dict]]) -> Dict[str, int]:
+    """
+    Importa favoritos em lote, associando-os aos clientes pelo e-mail.
+
+    Favoritos já ativos (unique_favorite_per_client) e de clientes inexistentes são ignorados.
+    Favoritos removidos (soft delete) ainda não expurgados são reativados com os dados
+    importados, como na inclusão pela API, e contados como inseridos.
+    Os contadores e a versão da lista dos clientes afetados são atualizados a cada lote.
+
+    Args:
+        db (AsyncSession): Sessão do banco de dados.
+        records (AsyncIterator[dict]): Registros com client_email, product_id, title, image, price e review.
+
+    Returns:
+        dict: Quantidade de linhas inseridas, ignoradas e inválidas.
+    """
+    result = {"inserted": 0, "skipped": 0, "invalid": 0}
+    postgres = _is_postgres(db)
+    batch_size = COPY_BATCH_SIZE if postgres else INSERT_BATCH_SIZE
+
+    async for batch in _batches(records, _favorite_row, batch_size, result):
+        emails = {row["client_email"] for row in batch}
+        client_ids = dict((await db.execute(
+            select(Client.email, Client.id).where(Client.email.in_(emails))
+        )).all())
+
+        if postgres:
+            await _copy_to_staging(
+                db, "import_favorites",
+                "client_email varchar(255), product_id integer, title varchar(255), "
+                "image varchar(255), price double precision, review varchar(255)",
+                FAVORITE_FIELDS, batch,
+            )
+            # DISTINCT ON: o DO UPDATE não pode alterar a mesma linha duas vezes no comando
+            inserted = (await db.execute(text(
+                "INSERT INTO favorites (client_id, product_id, title, image, price, review) "
+                "SELECT DISTINCT ON (c.id, s.product_id) c.id, s.product_id, s.title, s.image, s.price, s.review "
+                "FROM import_favorites s JOIN clients c ON c.email = s.client_email "
+                "ON CONFLICT ON CONSTRAINT unique_favorite_per_client DO UPDATE SET "
+                "title = EXCLUDED.title, image = EXCLUDED.image, price = EXCLUDED.price, "
+                "review = EXCLUDED.review, created_at = now(), synced_at = NULL, deleted_at = NULL "
+                "WHERE favorites.deleted_at IS NOT NULL"
+            ))).rowcount
+        else:
+            rows = [
+                {**{k: v for k, v in row.items() if k != "client_email"}, "client_id": client_ids[row["client_email"]]}
+                for row in batch
+                if row["client_email"] in client_ids
+            ]
+            inserted = 0
+            if rows:
+                stmt = sqlite_insert(Favorite.__table__)
+                inserted = (await db.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["client_id", "product_id"],
+                        set_={
+                            "title": stmt.excluded.title,
+                            "image": stmt.excluded.image,
+                            "price": stmt.excluded.price,
+                            "review": stmt.excluded.review,
+                            "created_at": datetime.now(timezone.utc),
+                            "synced_at": None,
+                            "deleted_at": None,
+                        },
+                        where=Favorite.__table__.c.deleted_at.is_not(None),
+                    ),
+                    rows,
+                )).rowcount
+
+        await refresh_favorite_counters(db, list(client_ids.values()))
+        await db.commit()
+
+        result["inserted"] += inserted
+        result["skipped"] += len(batch) - inserted
+
+    logger.info(f"Importação de favoritos concluída: {result}")
+    return result
@@ -0,0 +1,46 @@
+import asyncio
+from typing import Dict, List
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.database import get_db
+from app.core.dataloader import DataLoader
+from app.crud.favorite import get_product_by_id
+from app.models.models import Client
+
+
+class RequestLoaders:
+    """
+    Loaders de uma requisição: cada cliente e cada produto é carregado no máximo uma
+    vez, não importa quantas dependências ou etapas da rota o peçam.
+
+    Atributos:
+        clients (DataLoader): Clientes por ID (SELECT ... WHERE id IN (...) na sessão da requisição).
+        products (DataLoader): Produtos por ID (API externa, com fallback).
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.clients = DataLoader(self._load_clients)
+        self.products = DataLoader(self._load_products)
+
+    async def _load_clients(self, client_ids: List[int]) -> Dict[int, Client]:
+        result = await self.db.execute(select(Client).where(Client.id.in_(client_ids)))
+        return {client.id: client for client in result.scalars()}
+
+    @staticmethod
+    async def _load_products(product_ids: List[int]) -> Dict[int, dict]:
+        products = await asyncio.gather(*(get_product_by_id(product_id) for product_id in product_ids))
+        return dict(zip(product_ids, products))
+
+
+def get_loaders(request: Request, db: AsyncSession = Depends(get_db)) -> RequestLoaders:
+    """
+    Dependência que retorna os loaders da requisição, guardados em `request.state`.
+    """
+    loaders = getattr(request.state, "loaders", None)
+    if loaders is None:
+        loaders = request.state.loaders = RequestLoaders(db)
+    return loaders
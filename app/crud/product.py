@@ -1,7 +1,12 @@
+import asyncio
 import httpx
+import json
 from fastapi import HTTPException
-from app.core.cache import get_cache, set_cache
-from typing import List, Optional
+from app.core.cache import get_cache, set_cache, set_cache_later, set_raw_cache_later, get_many_raw_cache, touch_cache
+from app.core.config import settings
+from app.core.search import product_index
+from app.core.upstream import upstream_get
+from typing import List, Optional, Tuple
 import logging
 
 # Configuração de logging
@@ -45,10 +50,9 @@ async def get_all_products() -> List[dict]:
         List[dict]: Lista de produtos.
     """
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get("https://fakestoreapi.com/products")
-            response.raise_for_status()
-            return response.json()
+        response = await upstream_get("/products")
+        response.raise_for_status()
+        return response.json()
     except httpx.RequestError as e:
         logger.error(f"Erro na requisição para listar produtos: {e}")
     except httpx.HTTPStatusError as e:
@@ -76,18 +80,17 @@ async def get_product_by_id(product_id: int) -> Optional[dict]:
         return cached
 
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"https://fakestoreapi.com/products/{product_id}")
-            response.raise_for_status()
-            product = response.json()
-
-            valid_product = validate_product_data(product)
-            if valid_product:
-                await set_cache(cache_key, valid_product, expire=300)
-                return valid_product
-            else:
-                logger.warning(f"Produto {product_id} com dados incompletos: {product}")
-                return None
+        response = await upstream_get(f"/products/{product_id}")
+        response.raise_for_status()
+        product = response.json()
+
+        valid_product = validate_product_data(product)
+        if valid_product:
+            await set_cache_later(cache_key, valid_product, expire=300)
+            return valid_product
+        else:
+            logger.warning(f"Produto {product_id} com dados incompletos: {product}")
+            return None
 
     except httpx.RequestError as e:
         logger.error(f"Erro na requisição do produto {product_id}: {e}")
@@ -115,3 +118,213 @@ def validate_product_data(product_data: dict) -> Optional[dict]:
         logger.warning(f"Produto inválido: campos ausentes em {product_data}")
         return None
     return product_data
+
+
+# ------------------------------------------------------------------------------
+# Cache de produtos com revalidação condicional na API externa
+# ------------------------------------------------------------------------------
+
+# Chave do catálogo completo no cache
+CATALOG_CACHE_KEY = "products:catalog"
+
+
+def product_cache_key(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def validators_key(cache_key: str) -> str:
+    """
+    Chave dos validadores da API externa (ETag / Last-Modified) guardados junto à entrada do cache.
+    """
+    return f"{cache_key}:validators"
+
+
+def _validators(response: httpx.Response) -> dict:
+    validators = {}
+    if "etag" in response.headers:
+        validators["etag"] = response.headers["etag"]
+    if "last-modified" in response.headers:
+        validators["last_modified"] = response.headers["last-modified"]
+    return validators
+
+
+def _conditional_headers(validators: dict) -> dict:
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+async def _store(cache_key: str, body: str, validators: dict):
+    """
+    Grava um recurso buscado na API externa e seus validadores em segundo plano
+    (write-behind): a requisição não aguarda o cache.
+    """
+    ttl = settings.PRODUCT_CACHE_TTL
+    await set_raw_cache_later(cache_key, body, expire=ttl)
+    if validators:
+        await set_cache_later(validators_key(cache_key), validators, expire=ttl)
+
+
+async def _revalidate(path: str, cache_key: str) -> Tuple[Optional[httpx.Response], Optional[str], Optional[dict]]:
+    """
+    Busca um recurso na API externa, enviando uma requisição condicional quando há
+    uma cópia em cache com validadores.
+
+    Se a API externa responder 304, apenas a expiração da cópia e dos validadores é
+    renovada: nada é baixado, desserializado ou reescrito.
+
+    Returns:
+        tuple: (resposta 200, None, None) se o recurso mudou ou não estava em cache;
+        (None, conteúdo em cache, validadores) se não foi modificado.
+
+    Raises:
+        httpx.HTTPError: Em caso de falha da API externa.
+    """
+    cached, stored = await get_many_raw_cache([cache_key, validators_key(cache_key)])
+    validators = json.loads(stored) if stored else None
+    headers = _conditional_headers(validators) if cached is not None and validators else None
+
+    response = await upstream_get(path, headers=headers)
+    if response.status_code == 304 and headers:
+        renewed = await touch_cache([cache_key, validators_key(cache_key)], expire=settings.PRODUCT_CACHE_TTL)
+        if all(renewed):
+            return None, cached, validators
+        # A cópia expirou entre a leitura e a renovação: busca completa
+        response = await upstream_get(path)
+
+    response.raise_for_status()
+    return response, None, None
+
+
+async def get_product_raw(product_id: int) -> str:
+    """
+    Retorna um produto já serializado (JSON): do cache, ou da API externa se ausente,
+    armazenando-o junto com os validadores da resposta.
+
+    Raises:
+        httpx.HTTPError: Em caso de falha da API externa.
+    """
+    cache_key = product_cache_key(product_id)
+    cached, = await get_many_raw_cache([cache_key])
+    if cached is not None:
+        return cached
+
+    response = await upstream_get(f"/products/{product_id}")
+    response.raise_for_status()
+    body = json.dumps(response.json())
+    await _store(cache_key, body, _validators(response))
+    return body
+
+
+async def revalidate_product(product_id: int) -> str:
+    """
+    Atualiza um produto a partir da API externa com requisição condicional
+    (If-None-Match / If-Modified-Since) e retorna o produto serializado (JSON).
+
+    Raises:
+        httpx.HTTPError: Em caso de falha da API externa.
+    """
+    cache_key = product_cache_key(product_id)
+    response, cached, _ = await _revalidate(f"/products/{product_id}", cache_key)
+    if response is None:
+        return cached
+
+    body = json.dumps(response.json())
+    await _store(cache_key, body, _validators(response))
+    return body
+
+
+async def cache_catalog(products: List[dict], validators: Optional[dict] = None):
+    """
+    Armazena o catálogo completo e cada produto individualmente no cache.
+
+    Os validadores do catálogo guardam também os IDs dos produtos, para que a
+    expiração de todas as entradas seja renovada em um 304 sem ler o catálogo.
+    O índice de busca do worker é atualizado de forma incremental.
+    """
+    product_index.update(products, version=(validators or {}).get("etag"))
+    ttl = settings.PRODUCT_CACHE_TTL
+    writes = [
+        set_cache(CATALOG_CACHE_KEY, products, expire=ttl),
+        *(set_cache(product_cache_key(product["id"]), product, expire=ttl) for product in products),
+    ]
+    if validators:
+        ids = [product["id"] for product in products]
+        writes.append(set_cache(validators_key(CATALOG_CACHE_KEY), {**validators, "ids": ids}, expire=ttl))
+    await asyncio.gather(*writes)
+
+
+async def fetch_catalog() -> List[dict]:
+    """
+    Busca o catálogo completo na API externa e o armazena no cache.
+
+    Raises:
+        httpx.HTTPError: Em caso de falha da API externa.
+    """
+    response = await upstream_get("/products")
+    response.raise_for_status()
+    products = response.json()
+    await cache_catalog(products, _validators(response))
+    return products
+
+
+async def refresh_catalog() -> int:
+    """
+    Revalida o catálogo em cache na API externa (aquecimento do worker e job periódico).
+
+    Com uma cópia válida, a API externa responde 304 e apenas a expiração do catálogo
+    e dos produtos é renovada; caso contrário, o catálogo é baixado e recarregado.
+
+    Returns:
+        int: Quantidade de produtos recarregados (0 se o catálogo não mudou).
+
+    Raises:
+        httpx.HTTPError: Em caso de falha da API externa.
+    """
+    response, cached, validators = await _revalidate("/products", CATALOG_CACHE_KEY)
+    if response is None:
+        ids = validators.get("ids", [])
+        await touch_cache([product_cache_key(product_id) for product_id in ids], expire=settings.PRODUCT_CACHE_TTL)
+        # Catálogo carregado no cache por outro worker: o índice deste worker ainda não o conhece
+        if product_index.version != validators.get("etag"):
+            product_index.update(json.loads(cached), version=validators.get("etag"))
+        logger.info(f"[Catálogo] Não modificado na API externa; expiração de {len(ids)} produto(s) renovada.")
+        return 0
+
+    products = response.json()
+    await cache_catalog(products, _validators(response))
+    logger.info(f"[Catálogo] {len(products)} produto(s) recarregado(s) da API externa.")
+    return len(products)
+
+
+async def sync_product_index() -> int:
+    """
+    Atualiza o índice de busca do worker quando o catálogo em cache foi recarregado por
+    outro worker (job periódico de cada worker; o catálogo é revalidado apenas pelo líder).
+
+    Returns:
+        int: Quantidade de produtos reindexados (0 se o índice já estava atualizado).
+    """
+    validators = await get_cache(validators_key(CATALOG_CACHE_KEY))
+    if not validators or validators.get("etag") == product_index.version:
+        return 0
+    cached = await get_cache(CATALOG_CACHE_KEY)
+    return product_index.update(cached, version=validators.get("etag")) if cached else 0
+
+
+async def ensure_product_index() -> int:
+    """
+    Garante que o índice de busca do worker esteja carregado, a partir do catálogo
+    em cache (sem consultar a API externa).
+
+    Returns:
+        int: Quantidade de produtos no índice.
+    """
+    if not len(product_index):
+        cached = await get_cache(CATALOG_CACHE_KEY)
+        if cached:
+            product_index.update(cached)
+    return len(product_index)
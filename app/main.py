@@ -1,9 +1,29 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from app.api.v1.clients import router as clients_router
 from app.api.v1.favorites import router as favorites_router
 from app.api.v1.products import router as product_router
 from app.api.v1.auth import router as auth_router
-from app.core.database import engine, Base
+from app.core.database import RouteContextMiddleware, engine, slow_query_log, warm_up_pool
+from app.core.cache import cache_backend, warm_up_cache, write_behind
+from app.core.config import settings
+from app.core.admission import AdmissionController, AdmissionControlMiddleware
+from app.core.idempotency import IdempotencyKeys, IdempotencyMiddleware
+from app.core.tracing import TracingMiddleware, tracer
+from app.core.scheduler import JobScheduler, LeaderLease, with_session
+from app.core.upstream import start_http_client, close_http_client
+from app.core.warmup import WarmUp
+from app.crud.client import resume_client_deletion_jobs
+from app.crud.product import refresh_catalog, sync_product_index
+from app.crud.favorite import (
+    reconcile_favorite_counters,
+    reconcile_leaderboard,
+    refresh_leaderboard_memory,
+    load_leaderboard,
+    refresh_favorite_snapshots,
+    purge_deleted_favorites,
+    favorite_writes,
+)
 
 def create_app() -> FastAPI:
     """
@@ -28,6 +48,35 @@ def create_app() -> FastAPI:
         }
     )
 
+    # Controle de admissão: limita a concorrência e descarta excesso com 503
+    app.state.admission = AdmissionController()
+    if settings.ADMISSION_ENABLED:
+        app.add_middleware(AdmissionControlMiddleware, controller=app.state.admission)
+
+    # Idempotency-Key: repetições de POST reaproveitam a primeira resposta.
+    # Registrado depois da admissão para envolvê-la: duplicatas aguardando não ocupam vagas.
+    app.state.idempotency = IdempotencyKeys()
+    if settings.IDEMPOTENCY_ENABLED:
+        app.add_middleware(IdempotencyMiddleware, keys=app.state.idempotency)
+
+    # Rota em execução, registrada no log de consultas lentas
+    if settings.SLOW_QUERY_LOG:
+        app.add_middleware(RouteContextMiddleware)
+
+    # Tracing: span por requisição, continuando o traceparent recebido (os spans de SQL,
+    # cache e API externa são filhos dele). Registrado por último para envolver os demais
+    # middlewares e medir a requisição inteira.
+    if settings.TRACING_ENABLED:
+        app.add_middleware(TracingMiddleware, tracer=tracer)
+
+    # Aquecimento do worker: conexões e cache prontos antes do primeiro tráfego
+    app.state.warmup = WarmUp(timeout=settings.WARMUP_TIMEOUT)
+    app.state.warmup.add("database", lambda: warm_up_pool(settings.WARMUP_DB_CONNECTIONS))
+    app.state.warmup.add("redis", lambda: warm_up_cache(settings.WARMUP_REDIS_CONNECTIONS))
+    if settings.WARMUP_PRELOAD_CATALOG:
+        app.state.warmup.add("catalog", refresh_catalog)
+    app.state.warmup.add("leaderboard", with_session(load_leaderboard))
+
     # Inclusão das rotas versionadas
     app.include_router(auth_router, prefix="/api/v1/auth", tags=["auth"])
     app.include_router(clients_router, prefix="/api/v1/clients", tags=["clients"])
@@ -41,6 +90,30 @@ def create_app() -> FastAPI:
         """
         return {"message": "API rodando!"}
 
+    @app.get("/ready")
+    async def ready():
+        """
+        Prontidão do worker: 200 apenas após o aquecimento, 503 enquanto aquece ou encerra.
+        Deve ser usada pelo balanceador de carga / orquestrador antes de enviar tráfego.
+        """
+        warmup = app.state.warmup
+        return JSONResponse(status_code=200 if warmup.ready else 503, content=warmup.status())
+
+    @app.get("/metrics")
+    async def metrics():
+        """
+        Métricas internas do worker: profundidade das filas, requisições descartadas,
+        requisições idempotentes executadas/reaproveitadas, consultas SQL lentas, spans exportados
+        e backend de cache em uso.
+        """
+        return {
+            "admission": app.state.admission.stats(),
+            "idempotency": app.state.idempotency.stats(),
+            "slow_queries": slow_query_log.summary(),
+            "tracing": {"pending": len(tracer.finished), "exported": tracer.exported},
+            "cache": {**cache_backend.stats(), "write_behind": write_behind.stats()},
+        }
+
     @app.get("/openapi.json")
     async def custom_openapi():
         """
@@ -62,12 +135,62 @@ def create_app() -> FastAPI:
         app.openapi_schema = openapi_schema
         return app.openapi_schema
 
+    # Jobs periódicos em background: os de dados compartilhados rodam apenas no worker líder
+    scheduler = JobScheduler(lease=LeaderLease(cache_backend, ttl=settings.JOBS_LEADER_TTL))
+    scheduler.add("refresh_catalog", settings.CATALOG_REFRESH_INTERVAL, refresh_catalog)
+    scheduler.add("sync_product_index", settings.CATALOG_REFRESH_INTERVAL, sync_product_index, per_worker=True)
+    scheduler.add("reconcile_favorite_counters", settings.COUNTERS_RECONCILE_INTERVAL,
+                  with_session(reconcile_favorite_counters))
+    scheduler.add("refresh_favorite_snapshots", settings.SNAPSHOT_REFRESH_INTERVAL,
+                  with_session(lambda db: refresh_favorite_snapshots(db, max_age=settings.SNAPSHOT_MAX_AGE)))
+    scheduler.add("reconcile_leaderboard", settings.LEADERBOARD_RECONCILE_INTERVAL,
+                  with_session(reconcile_leaderboard))
+    scheduler.add("refresh_leaderboard_memory", settings.LEADERBOARD_RECONCILE_INTERVAL,
+                  with_session(refresh_leaderboard_memory), per_worker=True)
+    scheduler.add("purge_deleted_favorites", settings.FAVORITES_PURGE_INTERVAL,
+                  with_session(lambda db: purge_deleted_favorites(
+                      db,
+                      retention=settings.FAVORITES_PURGE_RETENTION,
+                      batch_size=settings.FAVORITES_PURGE_BATCH_SIZE,
+                      pause=settings.FAVORITES_PURGE_PAUSE,
+                  )))
+    scheduler.add("resume_client_deletion_jobs", settings.CLIENT_DELETE_RESUME_INTERVAL,
+                  with_session(lambda db: resume_client_deletion_jobs(
+                      db,
+                      stale_after=settings.CLIENT_DELETE_STALE_AFTER,
+                      chunk_size=settings.CLIENT_DELETE_CHUNK_SIZE,
+                      pause=settings.CLIENT_DELETE_PAUSE,
+                  )))
+    if settings.TRACING_ENABLED:
+        scheduler.add("export_traces", settings.TRACING_EXPORT_INTERVAL, tracer.flush, per_worker=True)
+
     @app.on_event("startup")
     async def on_startup():
         """
-        Evento de inicialização da aplicação. Responsável por criar as tabelas no banco de dados.
+        Evento de inicialização da aplicação (executado em cada worker). Responsável por abrir
+        o cliente HTTP do worker, aquecer conexões e cache e iniciar os jobs em background.
+
+        O esquema do banco é gerenciado por migrações (alembic upgrade head), aplicadas uma
+        única vez no deploy, antes de subir os workers.
+        """
+        await start_http_client()
+        await app.state.warmup.run()
+
+        if settings.BACKGROUND_JOBS_ENABLED:
+            scheduler.start()
+
+    @app.on_event("shutdown")
+    async def on_shutdown():
+        """
+        Evento de encerramento da aplicação. Interrompe os jobs em background, grava o
+        lote de favoritos e as gravações de cache pendentes, exporta os spans restantes e libera as conexões do worker (API externa e banco de dados).
         """
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        app.state.warmup.ready = False
+        await scheduler.stop()
+        await favorite_writes.close()
+        await write_behind.flush()
+        await tracer.flush()
+        await close_http_client()
+        await engine.dispose()
 
     return app
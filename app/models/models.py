@@ -3,6 +3,7 @@ from sqlalchemy import (
     Integer,
     String,
     ForeignKey,
+    Index,
     UniqueConstraint,
     DateTime,
     Float,
@@ -23,6 +24,10 @@ class Client(Base):
         hashed_password (str): Senha criptografada.
         created_at (datetime): Data de criação do registro.
         updated_at (datetime): Data da última atualização.
+        favorites_version (int): Versão da lista de favoritos (incrementada a cada alteração).
+        favorites_count (int): Quantidade de favoritos (contador desnormalizado).
+        favorites_price_sum (float): Soma dos preços dos favoritos (contador desnormalizado).
+        favorites_updated_at (datetime): Data da última alteração da lista de favoritos.
         favorites (List[Favorite]): Relação com produtos favoritos.
     """
     __tablename__ = "clients"
@@ -33,6 +38,10 @@ class Client(Base):
     hashed_password = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    favorites_version = Column(Integer, nullable=False, default=0, server_default="0")
+    favorites_count = Column(Integer, nullable=False, default=0, server_default="0")
+    favorites_price_sum = Column(Float, nullable=False, default=0, server_default="0")
+    favorites_updated_at = Column(DateTime(timezone=True), nullable=True)
 
     favorites = relationship(
         "Favorite",
@@ -55,6 +64,7 @@ class Favorite(Base):
         price (float): Preço do produto.
         review (str): Avaliação do produto (ex: nota).
         created_at (datetime): Data em que o produto foi favoritado.
+        synced_at (datetime): Última atualização dos dados do produto a partir da API externa.
         deleted_at (datetime): Campo opcional para soft delete.
     """
     __tablename__ = "favorites"
@@ -67,10 +77,64 @@ class Favorite(Base):
     price = Column(Float, nullable=False)
     review = Column(String(255), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    synced_at = Column(DateTime(timezone=True), nullable=True)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
 
     client = relationship("Client", back_populates="favorites")
 
     __table_args__ = (
         UniqueConstraint("client_id", "product_id", name="unique_favorite_per_client"),
+        # Índices parciais: a listagem ignora favoritos removidos (soft delete)
+        # e o expurgo percorre apenas os removidos.
+        Index(
+            "ix_favorites_client_active", "client_id", "id",
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+        # Ordenação/filtro da listagem por preço e por data (o ID desempata e completa o cursor)
+        Index(
+            "ix_favorites_client_price", "client_id", "price", "id",
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+        Index(
+            "ix_favorites_client_created", "client_id", "created_at", "id",
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+        Index(
+            "ix_favorites_deleted_at", "deleted_at",
+            postgresql_where=deleted_at.is_not(None),
+            sqlite_where=deleted_at.is_not(None),
+        ),
+    )
+
+
+class ClientDeletionJob(Base):
+    """
+    Modelo que representa a exclusão assíncrona de um cliente (contas com muitos favoritos).
+
+    O job é persistido para ser retomado se o worker que o executa for encerrado
+    (deploy, reciclagem); `updated_at` é renovado a cada lote apagado.
+
+    Atributos:
+        id (str): Identificador aleatório do job.
+        client_id (int): Cliente excluído (sem chave estrangeira: o job sobrevive ao cliente).
+        status (str): pending, running, done ou failed.
+        deleted_favorites (int): Quantidade de favoritos já apagados.
+        created_at (datetime): Data de criação do job.
+        updated_at (datetime): Última atividade do job.
+    """
+    __tablename__ = "client_deletion_jobs"
+
+    id = Column(String(32), primary_key=True)
+    client_id = Column(Integer, nullable=False)
+    status = Column(String(16), nullable=False, default="pending", server_default="pending")
+    deleted_favorites = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # Busca dos jobs interrompidos e dos concluídos a remover
+        Index("ix_client_deletion_jobs_status_updated", "status", "updated_at"),
     )
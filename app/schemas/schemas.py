@@ -77,3 +77,24 @@ class FavoriteOut(FavoriteBase):
 
     class Config:
         orm_mode = True
+
+
+class FavoritesSummary(BaseModel):
+    """
+    Esquema de resumo da lista de favoritos (contador e valor total).
+    """
+    client_id: int = Field(..., example=1)
+    count: int = Field(..., example=3)
+    total_price: float = Field(..., example=259.85)
+
+
+# ============================
+# PRODUTOS
+# ============================
+
+class LeaderboardEntry(BaseModel):
+    """
+    Esquema de uma posição no ranking de produtos mais favoritados.
+    """
+    product_id: int = Field(..., example=1)
+    favorites: int = Field(..., example=42)
@@ -0,0 +1,21 @@
+import importlib.util
+
+from uvicorn.workers import UvicornWorker
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+class FastUvicornWorker(UvicornWorker):
+    """
+    Worker do Gunicorn que executa a aplicação com Uvicorn usando o event loop
+    e o parser HTTP mais rápidos disponíveis (uvloop e httptools), com lifespan
+    habilitado para inicializar os recursos de cada worker.
+    """
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop" if _available("uvloop") else "asyncio",
+        "http": "httptools" if _available("httptools") else "h11",
+        "lifespan": "on",
+    }
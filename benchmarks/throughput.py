@@ -0,0 +1,104 @@
+"""
+Benchmark de throughput do modo de produção (Gunicorn + Uvicorn workers).
+
+Sobe a aplicação com diferentes quantidades de workers e mede requisições por
+segundo e latências (p50/p99) com um gerador de carga assíncrono (httpx).
+
+Uso:
+    python benchmarks/throughput.py --workers 1 2 4 --concurrency 64 --duration 10 --path /
+
+Variáveis como DATABASE_URL e SECRET_KEY são repassadas à aplicação. Para medir
+apenas o servidor, use uma rota que não acesse o banco (ex: "/").
+"""
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+async def wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Servidor não respondeu em {timeout}s")
+
+
+async def run_load(url: str, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    stop_at = time.monotonic() + duration
+
+    async def user(client: httpx.AsyncClient):
+        nonlocal errors
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                response = await client.get(url)
+                if response.status_code >= 500:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+        await asyncio.gather(*(user(client) for _ in range(concurrency)))
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--port", type=int, default=8020)
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    print(f"{'workers':>7} {'req/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'erros':>7}")
+
+    for workers in args.workers:
+        env = {
+            **os.environ,
+            "WEB_CONCURRENCY": str(workers),
+            "BIND": f"127.0.0.1:{args.port}",
+            "GUNICORN_ACCESSLOG": "/dev/null",
+            "LOG_LEVEL": "warning",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:create_app()"],
+            env=env,
+        )
+        try:
+            asyncio.run(wait_until_up(base_url + "/"))
+            result = asyncio.run(run_load(base_url + args.path, args.concurrency, args.duration))
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+
+        print(f"{workers:>7} {result['rps']:>10.0f} {result['p50_ms']:>10.1f} {result['p99_ms']:>10.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Configuração do Gunicorn para o modo de produção.
+
+Uso:
+    gunicorn -c gunicorn.conf.py "app.main:create_app()"
+
+Todos os valores podem ser ajustados por variáveis de ambiente.
+"""
+import multiprocessing
+import os
+
+# Endereço e porta
+bind = os.getenv("BIND", "0.0.0.0:8010")
+
+# Workers: um processo por núcleo (cada worker é assíncrono e atende várias requisições)
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "app.server.FastUvicornWorker"
+
+# Carrega a aplicação antes do fork (menos memória e boot mais rápido dos workers).
+# Conexões (banco, Redis, HTTP) são abertas por worker nos eventos de startup.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Timeouts: worker sem resposta é reiniciado; encerramento gracioso aguarda requisições em andamento
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Reciclagem de workers após N requisições (com jitter para não reiniciarem juntos)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+
+# Logs
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
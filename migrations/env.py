@@ -0,0 +1,74 @@
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.database import Base
+import app.models.models  # noqa: F401  Registra Client e Favorite no Base
+
+# Configuração do Alembic (valores do alembic.ini)
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+# Metadados usados pelo --autogenerate
+target_metadata = Base.metadata
+
+
+def database_url() -> str:
+    """
+    URL do banco: a definida explicitamente na configuração do Alembic (ex: testes)
+    ou DATABASE_URL das configurações da aplicação.
+    """
+    return config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """
+    Gera o SQL das migrações sem conectar ao banco (alembic upgrade head --sql).
+    """
+    context.configure(
+        url=database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=database_url().startswith("sqlite"),
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # O SQLite não suporta ALTER TABLE completo; o modo batch recria a tabela
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    """
+    Aplica as migrações conectando ao banco com o driver assíncrono da aplicação.
+    """
+    connectable = create_async_engine(database_url(), poolclass=pool.NullPool)
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
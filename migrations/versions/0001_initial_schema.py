@@ -0,0 +1,58 @@
+"""Esquema inicial: clientes e favoritos
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# Identificadores da revisão, usados pelo Alembic
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "clients",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("hashed_password", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_clients_email", "clients", ["email"], unique=True)
+    op.create_index("ix_clients_id", "clients", ["id"], unique=False)
+
+    op.create_table(
+        "favorites",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("client_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("image", sa.String(length=255), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("review", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["client_id"], ["clients.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("client_id", "product_id", name="unique_favorite_per_client"),
+    )
+    op.create_index("ix_favorites_id", "favorites", ["id"], unique=False)
+    op.create_index("ix_favorites_client_id", "favorites", ["client_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_favorites_client_id", table_name="favorites")
+    op.drop_index("ix_favorites_id", table_name="favorites")
+    op.drop_table("favorites")
+
+    op.drop_index("ix_clients_id", table_name="clients")
+    op.drop_index("ix_clients_email", table_name="clients")
+    op.drop_table("clients")
@@ -0,0 +1,59 @@
+"""Versão e contadores da lista de favoritos, sincronização dos produtos e índices do soft delete
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# Identificadores da revisão, usados pelo Alembic
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("clients", sa.Column("favorites_version", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("clients", sa.Column("favorites_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("clients", sa.Column("favorites_price_sum", sa.Float(), server_default="0", nullable=False))
+    op.add_column("favorites", sa.Column("synced_at", sa.DateTime(timezone=True), nullable=True))
+
+    # Bancos existentes: contadores calculados a partir dos favoritos ativos
+    op.execute(
+        """
+        UPDATE clients SET
+            favorites_count = (
+                SELECT COUNT(*) FROM favorites
+                WHERE favorites.client_id = clients.id AND favorites.deleted_at IS NULL
+            ),
+            favorites_price_sum = (
+                SELECT COALESCE(SUM(price), 0) FROM favorites
+                WHERE favorites.client_id = clients.id AND favorites.deleted_at IS NULL
+            )
+        """
+    )
+
+    op.create_index(
+        "ix_favorites_client_active", "favorites", ["client_id", "id"], unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+        sqlite_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_favorites_deleted_at", "favorites", ["deleted_at"], unique=False,
+        postgresql_where=sa.text("deleted_at IS NOT NULL"),
+        sqlite_where=sa.text("deleted_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_favorites_deleted_at", table_name="favorites")
+    op.drop_index("ix_favorites_client_active", table_name="favorites")
+    with op.batch_alter_table("favorites") as batch_op:
+        batch_op.drop_column("synced_at")
+    with op.batch_alter_table("clients") as batch_op:
+        batch_op.drop_column("favorites_price_sum")
+        batch_op.drop_column("favorites_count")
+        batch_op.drop_column("favorites_version")
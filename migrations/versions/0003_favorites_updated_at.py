@@ -0,0 +1,24 @@
+"""Data da última alteração da lista de favoritos (Last-Modified)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# Identificadores da revisão, usados pelo Alembic
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("clients", sa.Column("favorites_updated_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("clients") as batch_op:
+        batch_op.drop_column("favorites_updated_at")
@@ -0,0 +1,33 @@
+"""Índices para ordenação e filtro da listagem de favoritos por preço e data
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# Identificadores da revisão, usados pelo Alembic
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_favorites_client_price", "favorites", ["client_id", "price", "id"], unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+        sqlite_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_favorites_client_created", "favorites", ["client_id", "created_at", "id"], unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+        sqlite_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_favorites_client_created", table_name="favorites")
+    op.drop_index("ix_favorites_client_price", table_name="favorites")
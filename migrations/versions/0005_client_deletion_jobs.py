@@ -0,0 +1,36 @@
+"""Jobs de exclusão assíncrona de clientes, persistidos para serem retomados
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# Identificadores da revisão, usados pelo Alembic
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "client_deletion_jobs",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("client_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=16), server_default="pending", nullable=False),
+        sa.Column("deleted_favorites", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_client_deletion_jobs_status_updated", "client_deletion_jobs", ["status", "updated_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_client_deletion_jobs_status_updated", table_name="client_deletion_jobs")
+    op.drop_table("client_deletion_jobs")
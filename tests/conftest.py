@@ -8,11 +8,21 @@ os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
 dotenv_path = os.path.join(os.path.dirname(__file__), "..", ".env.dev")
 load_dotenv(dotenv_path=dotenv_path, override=True)
 
+import asyncio
+import httpx
+import pytest
 import pytest_asyncio
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from unittest import mock
+from redis.asyncio.client import Pipeline, Redis
+from sqlalchemy import event
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.main import create_app
-from app.core.database import Base
+from app.core import upstream
+from app.core.database import Base, engine as app_engine
 
 # Configuração do banco assíncrono para testes
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -35,6 +45,58 @@ async def prepare_db():
     yield
 
 
+@pytest_asyncio.fixture(scope="function")
+async def create_test_db():
+    """
+    Recria as tabelas no banco usado pela aplicação (app.core.database.engine).
+    Os módulos de teste que acessam o banco o ativam com
+    `pytestmark = pytest.mark.usefixtures("create_test_db")`.
+    """
+    import app.models.models  # Garante que os modelos sejam registrados no Base
+
+    async with app_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+
+
+@pytest.fixture
+def signup_and_login():
+    """
+    Retorna a função que cadastra um cliente, faz login e devolve o ID e os headers de autenticação.
+
+    Uso:
+        client_id, headers = await signup_and_login(client, "email@example.com")
+    """
+    async def _signup_and_login(client: AsyncClient, email: str):
+        signup_resp = await client.post("/api/v1/auth/signup", json={
+            "name": "Usuário de Teste",
+            "email": email,
+            "password": "senha123",
+            "confirm_password": "senha123"
+        })
+        login_resp = await client.post("/api/v1/auth/login", json={
+            "email": email,
+            "password": "senha123"
+        })
+        return signup_resp.json()["id"], {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    return _signup_and_login
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    """
+    Descarta o cache mantido no worker (cópia em memória e falhas do Redis registradas)
+    entre os testes, que reutilizam os mesmos ids de clientes e produtos.
+    """
+    from app.core.cache import cache_backend
+
+    cache_backend.reset()
+    yield
+    cache_backend.reset()
+
+
 @pytest_asyncio.fixture()
 async def db_session() -> AsyncSession:
     """
@@ -52,3 +114,106 @@ async def client(prepare_db):
     app = create_app()
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
+
+
+@pytest_asyncio.fixture
+async def store():
+    """
+    Direciona o cliente HTTP do worker para a API de produtos local (tests/fake_store.py).
+    """
+    from tests import fake_store
+
+    fake_store.reset()
+    upstream._http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_store.app))
+    upstream._http_client_loop = asyncio.get_running_loop()
+    yield fake_store
+    await upstream.close_http_client()
+
+
+class IOUsage:
+    """
+    Operações de E/S registradas durante um bloco: instruções SQL, chamadas à API
+    externa de produtos e idas ao Redis (um comando avulso ou um pipeline inteiro).
+    """
+
+    def __init__(self):
+        self.sql: List[str] = []
+        self.upstream: List[str] = []
+        self.redis: List[str] = []
+
+    def redis_commands(self) -> Dict[str, int]:
+        return dict(Counter(self.redis))
+
+    def assert_budget(self, sql: Optional[int] = None, upstream: Optional[int] = None, redis: Optional[dict] = None):
+        """
+        Falha se o bloco excedeu o orçamento: no máximo `sql` instruções, `upstream` chamadas
+        externas e, para cada comando em `redis`, a quantidade de idas ao Redis indicada.
+        """
+        report = f"\nSQL: {self.sql}\nAPI externa: {self.upstream}\nRedis: {self.redis}"
+        if sql is not None:
+            assert len(self.sql) <= sql, f"{len(self.sql)} instruções SQL (orçamento: {sql}){report}"
+        if upstream is not None:
+            assert len(self.upstream) <= upstream, f"{len(self.upstream)} chamadas à API externa (orçamento: {upstream}){report}"
+        if redis is not None:
+            used = self.redis_commands()
+            over = {command: count for command, count in used.items() if count > redis.get(command, 0)}
+            assert not over, f"Idas ao Redis acima do orçamento {redis}: {used}{report}"
+
+
+@pytest.fixture
+def io_usage():
+    """
+    Registra as operações de E/S da aplicação dentro de um bloco `with`, para testes de
+    orçamento (regressões de desempenho, como N+1 e consultas repetidas, falham o teste).
+
+    Uso:
+        with io_usage() as usage:
+            await client.get(...)
+        usage.assert_budget(sql=2, upstream=0, redis={"GET": 1})
+    """
+    @contextmanager
+    def _measure():
+        usage = IOUsage()
+
+        def _record_sql(conn, cursor, statement, parameters, context, executemany):
+            usage.sql.append(statement)
+
+        send = httpx.AsyncClient.send
+        execute_command = Redis.execute_command
+        execute_pipeline = Pipeline.execute
+
+        async def _send(self, request, **kwargs):
+            if self is upstream._http_client:
+                usage.upstream.append(f"{request.method} {request.url.path}")
+            return await send(self, request, **kwargs)
+
+        async def _execute_command(self, *args, **options):
+            usage.redis.append(str(args[0]).upper())
+            return await execute_command(self, *args, **options)
+
+        async def _execute_pipeline(self, raise_on_error: bool = True):
+            if self.command_stack:
+                usage.redis.append("PIPELINE")
+            return await execute_pipeline(self, raise_on_error)
+
+        event.listen(app_engine.sync_engine, "before_cursor_execute", _record_sql)
+        try:
+            with mock.patch.object(httpx.AsyncClient, "send", _send), \
+                    mock.patch.object(Redis, "execute_command", _execute_command), \
+                    mock.patch.object(Pipeline, "execute", _execute_pipeline):
+                yield usage
+        finally:
+            event.remove(app_engine.sync_engine, "before_cursor_execute", _record_sql)
+
+    return _measure
+
+
+@pytest.fixture
+def fake_redis():
+    """
+    Substitui o Redis por um Redis em memória (tests/fake_redis.py).
+    """
+    from tests.fake_redis import FakeRedis
+
+    with FakeRedis().patch() as redis:
+        yield redis
@@ -0,0 +1,133 @@
+"""
+Redis em memória para os testes: substitui a execução de comandos do cliente
+redis.asyncio (comandos avulsos e pipelines), mantendo o restante da biblioteca.
+
+Implementa apenas os comandos usados pela aplicação, já com as respostas no formato
+devolvido pelo cliente com decode_responses=True.
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple
+from unittest import mock
+
+from redis.asyncio.client import Pipeline, Redis
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+        self.expires: Dict[str, float] = {}
+
+    # --------------------------------------------------------------------------
+    # Armazenamento
+    # --------------------------------------------------------------------------
+
+    def _alive(self, key: str) -> bool:
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _get(self, key: str, default=None):
+        return self.data[key] if self._alive(key) else default
+
+    def _zset(self, key: str) -> Dict[str, float]:
+        if not self._alive(key):
+            self.data[key] = {}
+        return self.data[key]
+
+    @staticmethod
+    def _range(zset: Dict[str, float], start: int, stop: int, reverse: bool, withscores: bool) -> List:
+        ordered = sorted(zset.items(), key=lambda item: (item[1], item[0]), reverse=reverse)
+        stop = len(ordered) if stop == -1 else stop + 1
+        entries = ordered[start:stop]
+        return [(member, score) for member, score in entries] if withscores else [member for member, _ in entries]
+
+    # --------------------------------------------------------------------------
+    # Comandos
+    # --------------------------------------------------------------------------
+
+    def execute(self, args: Tuple) -> Any:
+        command, *params = [str(arg) if not isinstance(arg, (bytes, str)) else arg for arg in args]
+        command = command.upper()
+
+        if command == "PING":
+            return True
+        if command == "GET":
+            return self._get(params[0])
+        if command == "MGET":
+            return [self._get(key) for key in params]
+        if command == "SET":
+            key, value, *flags = params
+            flags = [flag.upper() if isinstance(flag, str) else flag for flag in flags]
+            exists = self._alive(key)
+            if ("NX" in flags and exists) or ("XX" in flags and not exists):
+                return None
+            self.data[key] = value
+            self.expires.pop(key, None)
+            if "EX" in flags:
+                self.expires[key] = time.monotonic() + float(flags[flags.index("EX") + 1])
+            return True
+        if command == "EXPIRE":
+            if not self._alive(params[0]):
+                return False
+            self.expires[params[0]] = time.monotonic() + float(params[1])
+            return True
+        if command == "DEL":
+            removed = [key for key in params if self._alive(key)]
+            for key in removed:
+                self.data.pop(key)
+                self.expires.pop(key, None)
+            return len(removed)
+        if command == "RENAME":
+            source, target = params
+            self.data[target] = self.data.pop(source)
+            self.expires.pop(target, None)
+            return True
+        if command == "ZINCRBY":
+            key, delta, member = params
+            zset = self._zset(key)
+            zset[member] = zset.get(member, 0.0) + float(delta)
+            return zset[member]
+        if command == "ZADD":
+            key, *pairs = params
+            zset = self._zset(key)
+            added = 0
+            for score, member in zip(pairs[::2], pairs[1::2]):
+                added += member not in zset
+                zset[member] = float(score)
+            return added
+        if command == "ZREMRANGEBYSCORE":
+            key, low, high = params
+            zset = self._zset(key)
+            low, high = float(low), float(high)
+            removed = [member for member, score in zset.items() if low <= score <= high]
+            for member in removed:
+                del zset[member]
+            return len(removed)
+        if command in ("ZRANGE", "ZREVRANGE"):
+            key, start, stop, *flags = params
+            return self._range(
+                self._get(key, {}), int(start), int(stop),
+                reverse=command == "ZREVRANGE", withscores="WITHSCORES" in flags,
+            )
+        raise NotImplementedError(f"Comando não suportado pelo Redis de teste: {command}")
+
+    @contextmanager
+    def patch(self):
+        """
+        Direciona os comandos de todos os clientes redis.asyncio para este Redis em memória.
+        """
+        fake = self
+
+        async def execute_command(self, *args, **options):
+            return fake.execute(args)
+
+        async def execute(self, raise_on_error: bool = True):
+            stack, self.command_stack = self.command_stack, []
+            return [fake.execute(args) for args, _ in stack]
+
+        with mock.patch.object(Redis, "execute_command", execute_command), \
+                mock.patch.object(Pipeline, "execute", execute):
+            yield self
@@ -0,0 +1,86 @@
+"""
+API de produtos local, no formato da FakeStoreAPI, usada nos testes e em desenvolvimento.
+
+Suporta requisições condicionais (ETag / Last-Modified), como a API real.
+
+Uso em desenvolvimento:
+    uvicorn tests.fake_store:app --port 8020
+    PRODUCTS_API_URL=http://localhost:8020
+"""
+import json
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi import FastAPI, HTTPException, Request, Response
+
+from app.core.http_cache import cache_headers, content_etag, is_not_modified, not_modified
+
+app = FastAPI(title="Fake Store")
+
+# Contadores de respostas completas (200) e não modificadas (304)
+stats = {"full": 0, "not_modified": 0}
+
+# Headers traceparent recebidos (propagação do trace pela aplicação)
+traceparents: List[str] = []
+
+_products: List[dict] = []
+_last_modified = datetime.now(timezone.utc)
+
+
+def reset():
+    """
+    Restaura o catálogo inicial e zera os contadores.
+    """
+    global _products, _last_modified
+    _products = [
+        {
+            "id": product_id,
+            "title": f"Produto {product_id}",
+            "price": round(10.0 * product_id + 0.99, 2),
+            "description": f"Descrição do produto {product_id}",
+            "category": "electronics" if product_id % 2 else "jewelery",
+            "image": f"https://fakestoreapi.com/img/{product_id}.jpg",
+            "rating": {"rate": 4.0, "count": 10 * product_id},
+        }
+        for product_id in range(1, 6)
+    ]
+    _last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+    stats.update(full=0, not_modified=0)
+    traceparents.clear()
+
+
+def update_product(product_id: int, **changes):
+    """
+    Altera um produto do catálogo (simula uma mudança na API externa).
+    """
+    global _last_modified
+    next(product for product in _products if product["id"] == product_id).update(changes)
+    _last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _respond(request: Request, payload) -> Response:
+    if "traceparent" in request.headers:
+        traceparents.append(request.headers["traceparent"])
+    body = json.dumps(payload)
+    headers = cache_headers(content_etag(body), _last_modified, cache_control="public, max-age=0")
+    if is_not_modified(request, headers["ETag"], _last_modified):
+        stats["not_modified"] += 1
+        return not_modified(headers)
+    stats["full"] += 1
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/products")
+async def list_products(request: Request):
+    return _respond(request, _products)
+
+
+@app.get("/products/{product_id}")
+async def get_product(product_id: int, request: Request):
+    for product in _products:
+        if product["id"] == product_id:
+            return _respond(request, product)
+    raise HTTPException(status_code=404, detail="Produto não encontrado")
+
+
+reset()
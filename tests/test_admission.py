@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+from app.core.admission import AdmissionController, AdmissionControlMiddleware
+
+
+async def slow_app(scope, receive, send):
+    await asyncio.sleep(0.2)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+@pytest.mark.asyncio
+async def test_sheds_when_queue_is_full():
+    """
+    Com uma vaga e sem fila, a segunda requisição simultânea recebe 503 com Retry-After.
+    """
+    controller = AdmissionController(read_concurrency=1, max_queue=0, retry_after=2)
+    app = AdmissionControlMiddleware(slow_app, controller=controller)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        first, second = await asyncio.gather(ac.get("/api/v1/products/"), ac.get("/api/v1/products/"))
+
+    assert sorted([first.status_code, second.status_code]) == [200, 503]
+    rejected = first if first.status_code == 503 else second
+    assert rejected.headers["retry-after"] == "2"
+    assert controller.stats()["read"]["shed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_request_is_admitted_and_health_is_exempt():
+    """
+    Requisições em fila são atendidas quando a vaga é liberada; rotas de saúde não entram na fila.
+    """
+    controller = AdmissionController(read_concurrency=1, max_queue=1, max_queue_time=1.0)
+    app = AdmissionControlMiddleware(slow_app, controller=controller)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        responses = await asyncio.gather(ac.get("/api/v1/products/"), ac.get("/api/v1/products/"), ac.get("/"))
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert controller.stats()["read"]["admitted"] == 2
+    assert controller.stats()["read"]["queue_depth"] == 0
@@ -0,0 +1,78 @@
+"""
+Orçamentos de E/S por rota: instruções SQL, chamadas à API externa e idas ao Redis.
+
+Uma regressão de desempenho (N+1, consulta repetida, cache ignorado) faz estes testes
+falharem. Ao alterar uma rota de propósito, ajuste o orçamento correspondente.
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.crud.product import refresh_catalog
+
+pytestmark = pytest.mark.usefixtures("create_test_db")
+
+
+@pytest.mark.asyncio
+async def test_favorites_routes_budget(client: AsyncClient, store, fake_redis, io_usage, signup_and_login):
+    """
+    O cliente autenticado é consultado uma vez por requisição e a página em cache
+    dispensa o banco.
+    """
+    client_id, headers = await signup_and_login(client, "orcamento@example.com")
+    for product_id in (1, 2, 3):
+        with io_usage() as usage:
+            await client.post(f"/api/v1/favorites/{client_id}", json={"product_id": product_id}, headers=headers)
+        # cliente, favoritos existentes, favorito do produto, INSERT, contadores e releitura do favorito
+        usage.assert_budget(sql=6, upstream=1, redis={"PIPELINE": 1})
+
+    with io_usage() as usage:
+        cold = await client.get(f"/api/v1/favorites/{client_id}", headers=headers)
+    assert len(cold.json()) == 3
+    usage.assert_budget(sql=2, upstream=0, redis={"GET": 1, "SET": 1})
+
+    with io_usage() as usage:
+        await client.get(f"/api/v1/favorites/{client_id}", headers=headers)
+    usage.assert_budget(sql=1, upstream=0, redis={"GET": 1})
+
+    with io_usage() as usage:
+        await client.get(f"/api/v1/favorites/{client_id}/summary", headers=headers)
+        await client.get(f"/api/v1/clients/{client_id}", headers=headers)
+    usage.assert_budget(sql=2, upstream=0, redis={})
+
+
+@pytest.mark.asyncio
+async def test_product_routes_budget_when_warm(client: AsyncClient, store, fake_redis, io_usage):
+    """
+    Com o catálogo em cache, as rotas de produtos não consultam a API externa nem o banco.
+    """
+    await refresh_catalog()
+
+    with io_usage() as usage:
+        await client.get("/api/v1/products/2")
+    usage.assert_budget(sql=0, upstream=0, redis={"MGET": 1})
+
+    with io_usage() as usage:
+        response = await client.get("/api/v1/products/")
+    assert len(response.json()) == 5
+    usage.assert_budget(sql=0, upstream=0, redis={"GET": 1})
+
+    with io_usage() as usage:
+        await client.get("/api/v1/products/search", params={"q": "produto"})
+        await client.get("/api/v1/products/leaderboard")
+    usage.assert_budget(sql=0, upstream=0, redis={"ZREVRANGE": 1})
+
+
+@pytest.mark.asyncio
+async def test_budget_reports_excess(fake_redis, io_usage):
+    """
+    O orçamento excedido falha com a lista das operações registradas.
+    """
+    from app.core.cache import get_raw_cache
+
+    with io_usage() as usage:
+        await get_raw_cache("a")
+        await get_raw_cache("b")
+
+    usage.assert_budget(redis={"GET": 2})
+    with pytest.raises(AssertionError, match="Redis"):
+        usage.assert_budget(redis={"GET": 1})
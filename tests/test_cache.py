@@ -0,0 +1,261 @@
+"""
+Testes de conformidade dos backends de cache: todos os que armazenam dados devem se
+comportar da mesma forma para as funções de app/core/cache.py e o registro de idempotência.
+Inclui a fila de gravações em segundo plano (write-behind).
+"""
+import asyncio
+import json
+import pytest
+import redis.asyncio as redis
+from unittest import mock
+
+from app.core import cache
+from app.core.cache_backends import (
+    FailoverBackend,
+    MemoryBackend,
+    NullBackend,
+    RedisBackend,
+    create_cache_backend,
+)
+from app.core.write_behind import WriteBehindQueue
+from app.crud import product as product_crud
+from tests.fake_redis import FakeRedis
+
+
+def unreachable_redis() -> redis.Redis:
+    return redis.from_url("redis://127.0.0.1:1", decode_responses=True, socket_connect_timeout=0.2)
+
+
+@pytest.fixture(params=["memory", "redis", "failover"])
+def backend(request):
+    """
+    Backends que armazenam dados: memória, Redis (em memória, tests/fake_redis.py) e
+    Redis inacessível com failover para a memória.
+    """
+    if request.param == "memory":
+        yield MemoryBackend(max_entries=100)
+    elif request.param == "redis":
+        with FakeRedis().patch():
+            yield RedisBackend(redis.from_url("redis://test", decode_responses=True))
+    else:
+        yield FailoverBackend(RedisBackend(unreachable_redis()), MemoryBackend(max_entries=100))
+
+
+@pytest.mark.asyncio
+async def test_get_set_and_mget(backend):
+    assert await backend.ping()
+    assert await backend.get("a") is None
+    assert await backend.set("a", "1", ex=60)
+    assert await backend.set("b", "2")
+    assert await backend.get("a") == "1"
+    assert await backend.mget(["b", "x", "a"]) == ["2", None, "1"]
+
+    assert await backend.set("a", "3")
+    assert await backend.get("a") == "3"
+
+
+@pytest.mark.asyncio
+async def test_set_many(backend):
+    await backend.set_many([("a", "1", 60), ("b", "2", None), ("a", "3", 60)])
+    assert await backend.mget(["a", "b"]) == ["3", "2"]
+    assert await backend.expire(["a", "b"], 0) == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_set_nx_only_writes_missing_keys(backend):
+    assert await backend.set("lock", "first", ex=60, nx=True)
+    assert not await backend.set("lock", "second", ex=60, nx=True)
+    assert await backend.get("lock") == "first"
+
+
+@pytest.mark.asyncio
+async def test_delete_and_expire(backend):
+    await backend.set("a", "1", ex=60)
+    await backend.set("b", "2", ex=60)
+
+    assert await backend.expire(["a", "missing"], 120) == [True, False]
+    assert await backend.delete("a", "missing") == 1
+    assert await backend.get("a") is None
+
+    # Expiração zerada remove a chave
+    await backend.expire(["b"], 0)
+    assert await backend.get("b") is None
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_expires_and_evicts_least_recently_used():
+    now = [0.0]
+    backend = MemoryBackend(max_entries=2, clock=lambda: now[0])
+
+    await backend.set("a", "1", ex=10)
+    await backend.set("b", "2")
+    assert await backend.get("a") == "1"  # "a" passa a ser a mais recente
+    await backend.set("c", "3")
+    assert await backend.mget(["a", "b", "c"]) == ["1", None, "3"]
+    assert backend.stats() == {"backend": "memory", "entries": 2, "evictions": 1}
+
+    now[0] = 10.0
+    assert await backend.get("a") is None
+    assert await backend.set("a", "novo", nx=True)
+
+
+@pytest.mark.asyncio
+async def test_null_backend_never_stores():
+    backend = NullBackend()
+    assert await backend.set("a", "1", ex=60)
+    assert await backend.get("a") is None
+    assert await backend.mget(["a", "b"]) == [None, None]
+    assert await backend.expire(["a"], 60) == [False]
+    await backend.set_many([("a", "1", 60)])
+    assert await backend.delete("a") == 0
+
+
+@pytest.mark.asyncio
+async def test_failover_switches_to_memory_and_back():
+    """
+    Com o Redis inacessível, os comandos vão para a memória até o fim do intervalo de
+    nova tentativa; com o Redis de volta, a cópia em memória é descartada.
+    """
+    backend = FailoverBackend(RedisBackend(unreachable_redis()), MemoryBackend(), retry_interval=60)
+
+    assert await backend.set("a", "memória")
+    assert backend.name == "memory" and backend.failovers == 1
+    assert await backend.get("a") == "memória"
+
+    backend.down_until = 0.0  # intervalo de nova tentativa encerrado
+    with FakeRedis().patch() as fake:
+        assert await backend.get("a") is None
+        assert backend.name == "redis"
+        await backend.set("a", "redis")
+    assert fake.data == {"a": "redis"}
+    assert backend.fallback.entries == {}
+    assert backend.stats()["failovers"] == 1
+
+
+def test_create_cache_backend_from_settings():
+    client = unreachable_redis()
+    assert isinstance(create_cache_backend("redis", client, 10, failover=True, retry_interval=1), FailoverBackend)
+    assert isinstance(create_cache_backend("redis", client, 10, failover=False, retry_interval=1), RedisBackend)
+    assert isinstance(create_cache_backend("memory", client, 10, failover=True, retry_interval=1), MemoryBackend)
+    assert isinstance(create_cache_backend("null", client, 10, failover=True, retry_interval=1), NullBackend)
+    with pytest.raises(ValueError):
+        create_cache_backend("memcached", client, 10, failover=True, retry_interval=1)
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_uses_only_memory_without_redis_backend():
+    """
+    Com CACHE_BACKEND=memory, ou com o Redis fora pelo failover, o ranking usa apenas
+    a cópia em memória, sem tentar conectar ao Redis.
+    """
+    from app.core.leaderboard import Leaderboard
+
+    failover = FailoverBackend(RedisBackend(unreachable_redis()), MemoryBackend(), retry_interval=60)
+    failover.down_until = float("inf")
+    for backend in (MemoryBackend(), NullBackend(), failover):
+        leaderboard = Leaderboard("leaderboard:test", backend)
+        with mock.patch.object(redis.Redis, "execute_command", side_effect=AssertionError("Redis acessado")), \
+                mock.patch.object(redis.client.Pipeline, "execute", side_effect=AssertionError("Redis acessado")):
+            await leaderboard.incr(1, 2)
+            await leaderboard.incr(2, 1)
+            await leaderboard.rebuild({1: 2, 2: 1, 3: 4})
+            assert await leaderboard.top(2) == [(3, 4), (1, 2)]
+            assert not await leaderboard.load()
+
+    failover.down_until = None
+    assert failover.redis_client() is failover.primary.client
+
+
+class BlockingBackend(MemoryBackend):
+    """
+    Cache em memória cujas gravações em lote aguardam uma liberação explícita.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.released = asyncio.Event()
+        self.batches = []
+
+    async def set_many(self, items):
+        await self.released.wait()
+        self.batches.append([key for key, _, _ in items])
+        await super().set_many(items)
+
+
+@pytest.mark.asyncio
+async def test_write_behind_batches_coalesces_and_drops_on_overflow():
+    backend = BlockingBackend()
+    queue = WriteBehindQueue(backend, max_size=3, batch_size=2)
+
+    assert queue.put("a", "1", ex=60)
+    assert queue.put("b", "2")
+    assert queue.put("a", "novo", ex=60)  # pendente: substitui o valor anterior
+    assert queue.put("c", "3")
+    assert not queue.put("d", "4")        # fila cheia
+    assert await backend.get("a") is None
+
+    backend.released.set()
+    await queue.flush()
+    assert backend.batches == [["a", "b"], ["c"]]
+    assert await backend.mget(["a", "b", "c", "d"]) == ["novo", "2", "3", None]
+    assert queue.stats() == {"pending": 0, "written": 3, "dropped": 1, "failed": 0, "batches": 2}
+
+
+
+def test_write_behind_restarts_drain_on_new_event_loop():
+    """
+    Uma task de um loop anterior (parado com a gravação em andamento) não é
+    reaproveitada: a fila volta a ser esvaziada no loop atual.
+    """
+    class StuckOnFirstBatch(MemoryBackend):
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+
+        async def set_many(self, items):
+            self.calls += 1
+            if self.calls == 1:
+                await asyncio.sleep(3600)
+            return await super().set_many(items)
+
+    backend = StuckOnFirstBatch()
+    queue = WriteBehindQueue(backend, max_size=100, batch_size=100)
+
+    async def put_and_yield(key):
+        queue.put(key, "1")
+        await asyncio.sleep(0)
+
+    old_loop = asyncio.new_event_loop()
+    old_loop.run_until_complete(put_and_yield("a"))
+    stale = queue._task
+
+    async def put_and_flush():
+        queue.put("b", "2")
+        await queue.flush()
+
+    asyncio.run(put_and_flush())
+    assert backend.calls == 2
+    assert backend.entries["b"][0] == "2"
+
+    stale.cancel()
+    old_loop.run_until_complete(asyncio.gather(stale, return_exceptions=True))
+    old_loop.close()
+
+@pytest.mark.asyncio
+async def test_product_fetch_returns_before_cache_write(store):
+    """
+    Um produto buscado na API externa é devolvido sem aguardar a gravação no cache.
+    """
+    backend = BlockingBackend()
+    queue = WriteBehindQueue(backend, max_size=100, batch_size=100)
+
+    with mock.patch.object(cache, "cache_backend", backend), mock.patch.object(cache, "write_behind", queue):
+        body = await asyncio.wait_for(product_crud.get_product_raw(4), timeout=1)
+        assert json.loads(body)["id"] == 4
+        assert queue.written == 0 and await backend.get("product:4") is None
+
+        backend.released.set()
+        await queue.flush()
+
+    assert await backend.get("product:4") == body
+    assert await backend.get("product:4:validators") is not None
@@ -0,0 +1,87 @@
+import json
+import pytest
+from unittest import mock
+
+from app.crud import product as product_crud
+
+
+@pytest.fixture
+def cache():
+    """
+    Substitui o Redis por um dicionário nas funções de cache de produtos.
+    """
+    data = {}
+
+    async def get_many_raw_cache(keys):
+        return [data.get(key) for key in keys]
+
+    async def set_raw_cache(key, value, expire=300):
+        data[key] = value
+
+    async def set_cache(key, value, expire=300):
+        data[key] = json.dumps(value)
+
+    async def touch_cache(keys, expire=300):
+        return [key in data for key in keys]
+
+    with mock.patch.multiple(
+        product_crud,
+        get_many_raw_cache=get_many_raw_cache,
+        set_cache=set_cache,
+        set_raw_cache_later=set_raw_cache,
+        set_cache_later=set_cache,
+        touch_cache=touch_cache,
+    ):
+        yield data
+
+
+@pytest.mark.asyncio
+async def test_refresh_catalog_revalidates_with_validators(store, cache):
+    """
+    O catálogo é baixado uma vez; as revalidações seguintes recebem 304 até ele mudar.
+    """
+    assert await product_crud.refresh_catalog() == 5
+    validators = json.loads(cache[product_crud.validators_key(product_crud.CATALOG_CACHE_KEY)])
+    assert validators["etag"] and validators["last_modified"]
+    assert validators["ids"] == [1, 2, 3, 4, 5]
+
+    assert await product_crud.refresh_catalog() == 0
+    assert store.stats == {"full": 1, "not_modified": 1}
+
+    store.update_product(2, price=1.5)
+    assert await product_crud.refresh_catalog() == 5
+    assert json.loads(cache["product:2"])["price"] == 1.5
+    assert store.stats == {"full": 2, "not_modified": 1}
+
+
+@pytest.mark.asyncio
+async def test_revalidate_product_reuses_cached_copy(store, cache):
+    """
+    Um 304 mantém a cópia em cache sem reescrevê-la; uma alteração traz o novo conteúdo.
+    """
+    first = await product_crud.revalidate_product(3)
+    second = await product_crud.revalidate_product(3)
+    assert second is first
+    assert store.stats == {"full": 1, "not_modified": 1}
+
+    store.update_product(3, title="Produto 3 (novo)")
+    updated = await product_crud.revalidate_product(3)
+    assert json.loads(updated)["title"] == "Produto 3 (novo)"
+    assert cache["product:3"] == updated
+
+
+@pytest.mark.asyncio
+async def test_expired_copy_is_fetched_in_full(store, cache):
+    """
+    Se a cópia expira entre a leitura e a renovação, o produto é baixado por completo.
+    """
+    await product_crud.revalidate_product(1)
+
+    async def expired(keys, expire=300):
+        return [False] * len(keys)
+
+    with mock.patch.object(product_crud, "touch_cache", expired):
+        body = await product_crud.revalidate_product(1)
+
+    assert json.loads(body)["id"] == 1
+    assert store.stats == {"full": 2, "not_modified": 1}
@@ -2,17 +2,10 @@ import pytest
 import pytest_asyncio
 from httpx import AsyncClient
 from app.main import create_app
-from app.core.database import engine
-from app.models.models import Base
 
-app = create_app()
+pytestmark = pytest.mark.usefixtures("create_test_db")
 
-@pytest_asyncio.fixture(scope="function", autouse=True)
-async def create_test_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-    yield
+app = create_app()
 
 @pytest_asyncio.fixture(scope="function")
 async def client():
@@ -82,3 +75,111 @@ async def test_clients_crud_flow(client):
     delete_resp = await client.delete(f"/api/v1/clients/{client_id}", headers=headers)
     assert delete_resp.status_code == 403
     # assert "não autorizado" in delete_resp.json()["detail"].lower()
+
+
+@pytest.mark.asyncio
+async def test_clients_keyset_pagination_and_ndjson(client, signup_and_login):
+    """
+    A listagem é paginada por cursor (header X-Next-Cursor) e pode ser exportada em NDJSON.
+    """
+    import json
+
+    _, headers = await signup_and_login(client, "pager@example.com")
+
+    for i in range(2):
+        await client.post("/api/v1/clients/", json={
+            "name": f"Cliente {i}",
+            "email": f"cliente{i}@example.com",
+            "password": "12345678"
+        }, headers=headers)
+
+    first_page = await client.get("/api/v1/clients/?limit=2", headers=headers)
+    assert len(first_page.json()) == 2
+    cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = await client.get(f"/api/v1/clients/?limit=2&after_id={cursor}", headers=headers)
+    assert len(second_page.json()) == 1
+    assert "X-Next-Cursor" not in second_page.headers
+
+    stream_resp = await client.get("/api/v1/clients/?format=ndjson", headers=headers)
+    assert stream_resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in stream_resp.text.splitlines()]
+    assert [row["email"] for row in rows] == ["pager@example.com", "cliente0@example.com", "cliente1@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_delete_large_account_runs_as_job(client, monkeypatch, signup_and_login):
+    """
+    Contas acima do limite são excluídas em background, em lotes, com status consultável.
+    """
+    import asyncio
+    from sqlalchemy import func, select
+    from app.core.config import settings
+    from app.core.database import SessionLocal
+    from app.crud import client as client_crud
+    from app.models.models import Client, Favorite
+
+    monkeypatch.setattr(settings, "CLIENT_DELETE_ASYNC_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "CLIENT_DELETE_CHUNK_SIZE", 2)
+
+    client_id, headers = await signup_and_login(client, "grande@example.com")
+
+    async with SessionLocal() as session:
+        session.add_all([
+            Favorite(client_id=client_id, product_id=i, title="P", image="img", price=1.0)
+            for i in range(5)
+        ])
+        await session.execute(Client.__table__.update().where(Client.id == client_id).values(favorites_count=5))
+        await session.commit()
+
+    delete_resp = await client.delete(f"/api/v1/clients/{client_id}", headers=headers)
+    assert delete_resp.status_code == 202
+    status_url = delete_resp.json()["status_url"]
+
+    # O SQLite em memória dos testes usa uma única conexão: o status é lido após o job
+    await asyncio.wait_for(asyncio.gather(*client_crud._deletion_tasks), timeout=5)
+    job = (await client.get(status_url)).json()
+
+    assert job == {"job_id": delete_resp.json()["job_id"], "status": "done", "deleted_favorites": 5}
+    async with SessionLocal() as session:
+        assert (await session.execute(select(func.count(Client.id)).where(Client.id == client_id))).scalar_one() == 0
+
+
+@pytest.mark.asyncio
+async def test_interrupted_deletion_job_is_resumed():
+    """
+    Um job de exclusão interrompido no meio (worker encerrado) é retomado a partir do
+    banco e conclui a exclusão sem repetir o que já foi apagado.
+    """
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import func, select
+    from app.core.database import SessionLocal
+    from app.crud import client as client_crud
+    from app.models.models import Client, ClientDeletionJob, Favorite
+
+    stale = datetime.now(timezone.utc) - timedelta(minutes=10)
+    async with SessionLocal() as session:
+        session.add(Client(id=7, name="Conta", email="parcial@example.com", hashed_password="x"))
+        await session.flush()
+        session.add_all([
+            Favorite(client_id=7, product_id=i, title="P", image="img", price=1.0) for i in range(3)
+        ])
+        # Job parado após apagar 2 favoritos
+        session.add(ClientDeletionJob(id="interrompido", client_id=7, status="running",
+                                      deleted_favorites=2, updated_at=stale))
+        session.add(ClientDeletionJob(id="recente", client_id=8, status="running",
+                                      updated_at=datetime.now(timezone.utc)))
+        await session.commit()
+
+        assert await client_crud.resume_client_deletion_jobs(session, stale_after=60, chunk_size=2) == 1
+        await asyncio.gather(*client_crud._deletion_tasks)
+        # Já reivindicado: não é retomado novamente
+        assert await client_crud.resume_client_deletion_jobs(session, stale_after=60, chunk_size=2) == 0
+
+    async with SessionLocal() as session:
+        job = await client_crud.get_deletion_job(session, "interrompido")
+        assert job == {"job_id": "interrompido", "status": "done", "deleted_favorites": 5}
+        assert (await session.get(ClientDeletionJob, "recente")).status == "running"
+        assert (await session.execute(select(func.count(Favorite.id)))).scalar_one() == 0
+        assert await session.get(Client, 7) is None
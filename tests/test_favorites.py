@@ -1,19 +1,10 @@
+import asyncio
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
-from app.core.database import engine
 from app.models.models import Base
 
-
-@pytest_asyncio.fixture(scope="function", autouse=True)
-async def create_test_db():
-    """
-    Executa a criação e limpeza do banco antes de cada teste.
-    """
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-    yield
+pytestmark = pytest.mark.usefixtures("create_test_db")
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -68,3 +59,399 @@ async def test_add_and_list_favorites(client: AsyncClient):
     favorites = list_resp.json()
     assert isinstance(favorites, list)
     assert any(fav["product_id"] == 1 for fav in favorites)
+
+
+@pytest.mark.asyncio
+async def test_favorites_version_bumps_on_write(client: AsyncClient, signup_and_login):
+    """
+    Adicionar e remover favoritos incrementa a versão usada nas chaves de cache das páginas.
+    """
+    from sqlalchemy import select
+    from app.core.database import SessionLocal
+    from app.models.models import Client
+
+    client_id, headers = await signup_and_login(client, "versao@example.com")
+
+    await client.post(f"/api/v1/favorites/{client_id}", json={"product_id": 1}, headers=headers)
+    delete_resp = await client.delete(f"/api/v1/favorites/{client_id}/1", headers=headers)
+    assert delete_resp.status_code == 200
+
+    async with SessionLocal() as session:
+        version = (await session.execute(select(Client.favorites_version).where(Client.id == client_id))).scalar_one()
+    assert version == 2
+
+
+@pytest.mark.asyncio
+async def test_favorites_summary_and_reconciliation(client: AsyncClient, signup_and_login):
+    """
+    O resumo reflete os contadores mantidos na escrita, e a reconciliação corrige divergências.
+    """
+    from sqlalchemy import update
+    from app.core.database import SessionLocal
+    from app.crud.favorite import reconcile_favorite_counters
+    from app.models.models import Client
+
+    client_id, headers = await signup_and_login(client, "resumo@example.com")
+
+    add_resp = await client.post(f"/api/v1/favorites/{client_id}", json={"product_id": 1}, headers=headers)
+    price = add_resp.json()["price"]
+
+    summary = (await client.get(f"/api/v1/favorites/{client_id}/summary", headers=headers)).json()
+    assert summary == {"client_id": client_id, "count": 1, "total_price": round(price, 2)}
+
+    async with SessionLocal() as session:
+        await session.execute(update(Client).where(Client.id == client_id).values(favorites_count=42))
+        await session.commit()
+        assert await reconcile_favorite_counters(session) == 1
+
+    summary = (await client.get(f"/api/v1/favorites/{client_id}/summary", headers=headers)).json()
+    assert summary["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_favorites_conditional_requests(client: AsyncClient, signup_and_login):
+    """
+    A listagem retorna ETag e Last-Modified; cópias válidas recebem 304 até a próxima alteração.
+    """
+    client_id, headers = await signup_and_login(client, "etag@example.com")
+    await client.post(f"/api/v1/favorites/{client_id}", json={"product_id": 1}, headers=headers)
+
+    first = await client.get(f"/api/v1/favorites/{client_id}", headers=headers)
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+    by_etag = await client.get(f"/api/v1/favorites/{client_id}", headers={**headers, "If-None-Match": etag})
+    assert by_etag.status_code == 304
+    assert by_etag.content == b""
+    assert by_etag.headers["etag"] == etag
+
+    by_date = await client.get(f"/api/v1/favorites/{client_id}", headers={**headers, "If-Modified-Since": last_modified})
+    assert by_date.status_code == 304
+
+    # Outra página tem outra representação
+    other_page = await client.get(
+        f"/api/v1/favorites/{client_id}?offset=1", headers={**headers, "If-None-Match": etag}
+    )
+    assert other_page.status_code == 200
+
+    await client.delete(f"/api/v1/favorites/{client_id}/1", headers=headers)
+    changed = await client.get(f"/api/v1/favorites/{client_id}", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json() == []
+
+
+@pytest.mark.asyncio
+async def test_favorites_sort_filter_and_cursor(client: AsyncClient, store, signup_and_login):
+    """
+    Ordenação e filtro por preço feitos no banco, com paginação por cursor.
+    """
+    client_id, headers = await signup_and_login(client, "ordenacao@example.com")
+    for product_id in (3, 1, 5, 2, 4):
+        await client.post(f"/api/v1/favorites/{client_id}", json={"product_id": product_id}, headers=headers)
+
+    def product_ids(response):
+        return [favorite["product_id"] for favorite in response.json()]
+
+    response = await client.get(f"/api/v1/favorites/{client_id}?sort=created_at", headers=headers)
+    assert product_ids(response) == [3, 1, 5, 2, 4]
+
+    params = {"sort": "-price", "min_price": 15, "max_price": 45, "limit": 2}
+    first = await client.get(f"/api/v1/favorites/{client_id}", params=params, headers=headers)
+    assert product_ids(first) == [4, 3]
+    cursor = first.headers["x-next-cursor"]
+    assert f"after={cursor}" in first.headers["link"]
+
+    second = await client.get(f"/api/v1/favorites/{client_id}", params={**params, "after": cursor}, headers=headers)
+    assert product_ids(second) == [2]
+    assert "x-next-cursor" not in second.headers
+
+    # Página servida do cache mantém o cursor
+    cached = await client.get(f"/api/v1/favorites/{client_id}", params=params, headers=headers)
+    assert cached.headers["x-next-cursor"] == cursor
+
+    titles = await client.get(f"/api/v1/favorites/{client_id}?sort=-title&limit=3", headers=headers)
+    assert product_ids(titles) == [5, 4, 3]
+    rest = await client.get(
+        f"/api/v1/favorites/{client_id}?sort=-title&limit=3&after={titles.headers['x-next-cursor']}",
+        headers=headers,
+    )
+    assert product_ids(rest) == [2, 1]
+
+    invalid = await client.get(f"/api/v1/favorites/{client_id}?after=invalido", headers=headers)
+    assert invalid.status_code == 400
+    assert (await client.get(f"/api/v1/favorites/{client_id}?sort=review", headers=headers)).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_favorite_writes_group_commit(client: AsyncClient, store, signup_and_login):
+    """
+    Com a gravação em lote ativa, inclusões e remoções concorrentes são gravadas em
+    uma única transação e cada requisição recebe o seu próprio resultado.
+    """
+    from unittest import mock
+    from app.core.config import settings
+    from app.crud.favorite import favorite_writes
+
+    first_id, first_headers = await signup_and_login(client, "lote1@example.com")
+    second_id, second_headers = await signup_and_login(client, "lote2@example.com")
+    await client.post(f"/api/v1/favorites/{first_id}", json={"product_id": 5}, headers=first_headers)
+
+    with mock.patch.object(settings, "FAVORITES_WRITE_BATCHING", True), \
+            mock.patch.multiple(favorite_writes, window=0.2, max_items=5, batches=0, items=0):
+        responses = await asyncio.gather(
+            client.post(f"/api/v1/favorites/{first_id}", json={"product_id": 1}, headers=first_headers),
+            client.post(f"/api/v1/favorites/{first_id}", json={"product_id": 2}, headers=first_headers),
+            client.post(f"/api/v1/favorites/{second_id}", json={"product_id": 1}, headers=second_headers),
+            client.delete(f"/api/v1/favorites/{first_id}/5", headers=first_headers),
+            client.delete(f"/api/v1/favorites/{second_id}/4", headers=second_headers),
+        )
+        assert (favorite_writes.batches, favorite_writes.items) == (1, 5)
+
+    assert [response.status_code for response in responses] == [200, 200, 200, 200, 404]
+    assert responses[2].json()["product_id"] == 1
+
+    first = (await client.get(f"/api/v1/favorites/{first_id}/summary", headers=first_headers)).json()
+    second = (await client.get(f"/api/v1/favorites/{second_id}/summary", headers=second_headers)).json()
+    assert (first["count"], first["total_price"]) == (2, 31.98)
+    assert (second["count"], second["total_price"]) == (1, 10.99)
+
+
+@pytest.mark.asyncio
+async def test_favorite_writes_batch_add_remove_add_same_favorite(client: AsyncClient, signup_and_login):
+    """
+    Incluir, remover e incluir de novo o mesmo favorito no mesmo lote termina com o
+    favorito ativo, contado uma única vez.
+    """
+    from app.crud.favorite import flush_favorite_writes
+
+    client_id, headers = await signup_and_login(client, "reativar@example.com")
+    product = {"id": 3, "title": "Produto 3", "image": "https://example.com/3.jpg", "price": 30.99}
+    results = await flush_favorite_writes([
+        ("add", client_id, product),
+        ("remove", client_id, 3),
+        ("add", client_id, product),
+    ])
+
+    assert results[1] is True
+    assert results[2].deleted_at is None
+    summary = (await client.get(f"/api/v1/favorites/{client_id}/summary", headers=headers)).json()
+    assert (summary["count"], summary["total_price"]) == (1, 30.99)
+    favorites = (await client.get(f"/api/v1/favorites/{client_id}", headers=headers)).json()
+    assert [favorite["product_id"] for favorite in favorites] == [3]
+
+
+@pytest.mark.asyncio
+async def test_favorite_writes_batch_with_more_requests_than_pool(client: AsyncClient, store, tmp_path, signup_and_login):
+    """
+    As requisições que aguardam o lote devolvem suas conexões ao pool: com mais gravações
+    simultâneas do que conexões, o lote ainda consegue a sua e é gravado.
+    """
+    from unittest import mock
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+    from app.core import database
+    from app.core.config import settings
+    from app.crud import favorite as favorite_crud
+
+    small_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=AsyncAdaptedQueuePool, pool_size=2, max_overflow=0, pool_timeout=2,
+    )
+    async with small_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = sessionmaker(bind=small_engine, class_=AsyncSession, expire_on_commit=False)
+
+    try:
+        with mock.patch.object(database, "SessionLocal", sessions), \
+                mock.patch.object(favorite_crud, "SessionLocal", sessions):
+            client_id, headers = await signup_and_login(client, "pool@example.com")
+            with mock.patch.object(settings, "FAVORITES_WRITE_BATCHING", True), \
+                    mock.patch.multiple(favorite_crud.favorite_writes, window=0.2, max_items=5, batches=0, items=0):
+                responses = await asyncio.gather(*(
+                    client.post(f"/api/v1/favorites/{client_id}", json={"product_id": product_id}, headers=headers)
+                    for product_id in range(1, 6)
+                ))
+                assert (favorite_crud.favorite_writes.batches, favorite_crud.favorite_writes.items) == (1, 5)
+            summary = (await client.get(f"/api/v1/favorites/{client_id}/summary", headers=headers)).json()
+    finally:
+        await small_engine.dispose()
+
+    assert [response.status_code for response in responses] == [200] * 5
+    assert summary["count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_dataloader_batches_and_deduplicates():
+    """
+    Pedidos simultâneos viram um único lote, chaves repetidas são carregadas uma vez
+    e registros primados não são buscados.
+    """
+    from app.core.dataloader import DataLoader
+
+    requested = []
+
+    async def batch(keys):
+        requested.append(keys)
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader = DataLoader(batch)
+    loader.prime(4, 400)
+    assert await loader.load_many([1, 2, 1, 3, 4]) == [10, 20, 10, None, 400]
+    assert await loader.load(2) == 20
+    assert requested == [[1, 2, 3]]
+
+
+@pytest.mark.asyncio
+async def test_products_leaderboard(client: AsyncClient, store, signup_and_login):
+    """
+    O ranking é atualizado a cada inclusão/remoção e a reconciliação corrige divergências.
+    """
+    from app.core.database import SessionLocal
+    from app.core.leaderboard import favorites_leaderboard
+    from app.crud.favorite import reconcile_leaderboard
+
+    favorites_leaderboard.memory.replace({})
+    first_id, first_headers = await signup_and_login(client, "ranking1@example.com")
+    second_id, second_headers = await signup_and_login(client, "ranking2@example.com")
+
+    await client.post(f"/api/v1/favorites/{first_id}", json={"product_id": 1}, headers=first_headers)
+    await client.post(f"/api/v1/favorites/{first_id}", json={"product_id": 2}, headers=first_headers)
+    await client.post(f"/api/v1/favorites/{second_id}", json={"product_id": 2}, headers=second_headers)
+
+    ranking = (await client.get("/api/v1/products/leaderboard")).json()
+    assert ranking == [{"product_id": 2, "favorites": 2}, {"product_id": 1, "favorites": 1}]
+
+    await client.delete(f"/api/v1/favorites/{second_id}/2", headers=second_headers)
+    ranking = (await client.get("/api/v1/products/leaderboard?limit=1")).json()
+    assert ranking == [{"product_id": 1, "favorites": 1}]
+
+    favorites_leaderboard.memory.incr(3, 5)
+    async with SessionLocal() as session:
+        assert await reconcile_leaderboard(session) == 2
+    ranking = (await client.get("/api/v1/products/leaderboard")).json()
+    assert sorted(ranking, key=lambda entry: entry["product_id"]) == [
+        {"product_id": 1, "favorites": 1}, {"product_id": 2, "favorites": 1}
+    ]
+
+
+
+@pytest.mark.asyncio
+async def test_refresh_leaderboard_memory_per_worker(client: AsyncClient, store, signup_and_login, fake_redis):
+    """
+    Cada worker recarrega sua cópia em memória do ranking a partir do Redis ou, sem o
+    ranking no Redis, do banco, sem gravar no Redis.
+    """
+    from app.core.database import SessionLocal
+    from app.core.leaderboard import favorites_leaderboard
+    from app.crud.favorite import refresh_leaderboard_memory
+
+    client_id, headers = await signup_and_login(client, "ranking-worker@example.com")
+    await client.post(f"/api/v1/favorites/{client_id}", json={"product_id": 1}, headers=headers)
+    await client.post(f"/api/v1/favorites/{client_id}", json={"product_id": 2}, headers=headers)
+
+    assert "leaderboard:favorites" in fake_redis.data
+    # Cópia de um worker seguidor, divergente do ranking compartilhado
+    favorites_leaderboard.memory.replace({3: 7})
+    async with SessionLocal() as session:
+        assert await refresh_leaderboard_memory(session) == 2
+    assert favorites_leaderboard.memory.scores == {1: 1, 2: 1}
+
+    fake_redis.data.clear()
+    favorites_leaderboard.memory.replace({3: 7})
+    async with SessionLocal() as session:
+        assert await refresh_leaderboard_memory(session) == 2
+    assert favorites_leaderboard.memory.scores == {1: 1, 2: 1}
+    assert fake_redis.data == {}
+
+@pytest.mark.asyncio
+async def test_export_favorites(client: AsyncClient, signup_and_login):
+    """
+    A exportação envia os favoritos do cliente em NDJSON ou CSV; a exportação geral exige administrador.
+    """
+    import json
+
+    client_id, headers = await signup_and_login(client, "export@example.com")
+    await client.post(f"/api/v1/favorites/{client_id}", json={"product_id": 1}, headers=headers)
+
+    ndjson_resp = await client.get(f"/api/v1/favorites/{client_id}/export", headers=headers)
+    assert ndjson_resp.status_code == 200
+    rows = [json.loads(line) for line in ndjson_resp.text.splitlines()]
+    assert [(row["client_id"], row["product_id"]) for row in rows] == [(client_id, 1)]
+
+    csv_resp = await client.get(f"/api/v1/favorites/{client_id}/export?format=csv", headers=headers)
+    assert csv_resp.headers["content-type"].startswith("text/csv")
+    lines = csv_resp.text.splitlines()
+    assert lines[0] == "client_id,product_id,title,image,price,review,created_at"
+    assert len(lines) == 2
+
+    admin_resp = await client.get("/api/v1/favorites/export", headers=headers)
+    assert admin_resp.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_refresh_favorite_snapshots_fetches_each_product_once():
+    """
+    O job de atualização busca cada produto distinto uma única vez e atualiza os dados salvos.
+    """
+    from unittest import mock
+    from sqlalchemy import select
+    from app.core.database import SessionLocal
+    from app.crud import favorite as favorite_crud
+    from app.models.models import Client, Favorite
+
+    async with SessionLocal() as session:
+        clients = [Client(name=f"C{i}", email=f"c{i}@example.com", hashed_password="!") for i in range(2)]
+        session.add_all(clients)
+        await session.flush()
+        session.add_all([
+            Favorite(client_id=c.id, product_id=7, title="Antigo", image="img", price=10.0, review="4.0")
+            for c in clients
+        ])
+        await session.commit()
+
+        calls = []
+
+        async def fake_fetch(product_id):
+            calls.append(product_id)
+            return {"id": product_id, "title": "Novo", "image": "img", "price": 12.5, "rating": {"rate": 4.0}}
+
+        with mock.patch.object(favorite_crud, "fetch_product_snapshot", fake_fetch):
+            assert await favorite_crud.refresh_favorite_snapshots(session) == 1
+
+        assert calls == [7]
+        rows = (await session.execute(select(Favorite.title, Favorite.price, Favorite.synced_at))).all()
+        assert all(title == "Novo" and price == 12.5 and synced_at for title, price, synced_at in rows)
+        sums = (await session.execute(select(Client.favorites_price_sum))).scalars().all()
+        assert sums == [12.5, 12.5]
+
+
+@pytest.mark.asyncio
+async def test_soft_delete_readd_and_purge(client: AsyncClient, signup_and_login):
+    """
+    A remoção é lógica: o favorito some da listagem, pode ser adicionado de novo e é expurgado depois.
+    """
+    from sqlalchemy import func, select
+    from app.core.database import SessionLocal
+    from app.crud.favorite import purge_deleted_favorites
+    from app.models.models import Favorite
+
+    client_id, headers = await signup_and_login(client, "soft@example.com")
+    await client.post(f"/api/v1/favorites/{client_id}", json={"product_id": 1}, headers=headers)
+    await client.delete(f"/api/v1/favorites/{client_id}/1", headers=headers)
+
+    list_resp = await client.get(f"/api/v1/favorites/{client_id}", headers=headers)
+    assert list_resp.json() == []
+    second_delete = await client.delete(f"/api/v1/favorites/{client_id}/1", headers=headers)
+    assert second_delete.status_code == 404
+
+    readd_resp = await client.post(f"/api/v1/favorites/{client_id}", json={"product_id": 1}, headers=headers)
+    assert readd_resp.status_code == 200
+    list_resp = await client.get(f"/api/v1/favorites/{client_id}", headers=headers)
+    assert [fav["product_id"] for fav in list_resp.json()] == [1]
+
+    await client.delete(f"/api/v1/favorites/{client_id}/1", headers=headers)
+    async with SessionLocal() as session:
+        assert await purge_deleted_favorites(session, retention=0) == 1
+        remaining = (await session.execute(select(func.count(Favorite.id)))).scalar_one()
+    assert remaining == 0
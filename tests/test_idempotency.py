@@ -0,0 +1,124 @@
+import asyncio
+import pytest
+from unittest import mock
+from httpx import AsyncClient
+
+from app.core import idempotency
+from app.core.cache_backends import MemoryBackend
+from app.core.idempotency import IdempotencyKeys, IdempotencyMiddleware
+
+pytestmark = pytest.mark.usefixtures("create_test_db")
+
+calls = []
+
+
+async def slow_app(scope, receive, send):
+    message = await receive()
+    calls.append(message["body"])
+    await asyncio.sleep(0.2)
+    await send({"type": "http.response.start", "status": 201, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"criado " + message["body"]})
+
+
+@pytest.fixture
+def idempotency_cache():
+    """
+    Cache em memória compartilhado pelos "workers" dos testes, no lugar do Redis.
+    """
+    backend = MemoryBackend()
+    with mock.patch.object(idempotency, "cache_backend", backend):
+        yield backend
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_wait_for_first_response(idempotency_cache):
+    """
+    Duplicatas simultâneas aguardam a primeira requisição; repetições posteriores recebem
+    a resposta gravada sem executar a rota.
+    """
+    calls.clear()
+    keys = IdempotencyKeys(ttl=60, lock_ttl=5, wait=2)
+    app = IdempotencyMiddleware(slow_app, keys=keys)
+    headers = {"Idempotency-Key": "abc-123"}
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        responses = await asyncio.gather(*(
+            ac.post("/api/v1/favorites/1", content=b"p1", headers=headers) for _ in range(3)
+        ))
+        later = await ac.post("/api/v1/favorites/1", content=b"p1", headers=headers)
+        other_body = await ac.post("/api/v1/favorites/1", content=b"p2", headers=headers)
+        other_key = await ac.post("/api/v1/favorites/1", content=b"p2", headers={"Idempotency-Key": "xyz"})
+
+    assert calls == [b"p1", b"p2"]
+    assert [r.status_code for r in responses] == [201, 201, 201]
+    assert all(r.text == "criado p1" for r in responses)
+    assert sum(r.headers.get("idempotent-replayed") == "true" for r in responses) == 2
+    assert later.status_code == 201 and later.headers["idempotent-replayed"] == "true"
+    assert other_body.status_code == 422
+    assert other_key.text == "criado p2"
+    assert keys.stats() == {"executed": 2, "replayed": 3, "conflicts": 1, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_duplicate_in_another_worker_gets_conflict_or_replay(idempotency_cache):
+    """
+    Com a requisição em andamento em outro worker (marcador no Redis), a duplicata
+    aguarda a resposta gravada ou, se ela não chegar a tempo, recebe 409.
+    """
+    calls.clear()
+    first_worker = IdempotencyMiddleware(slow_app, keys=IdempotencyKeys(wait=1))
+    second_worker = IdempotencyMiddleware(slow_app, keys=IdempotencyKeys(wait=0.05, poll_interval=0.01))
+    third_worker = IdempotencyMiddleware(slow_app, keys=IdempotencyKeys(wait=1, poll_interval=0.01))
+    headers = {"Idempotency-Key": "k"}
+
+    async with AsyncClient(app=first_worker, base_url="http://test") as first, \
+            AsyncClient(app=second_worker, base_url="http://test") as second, \
+            AsyncClient(app=third_worker, base_url="http://test") as third:
+        original, busy, waited = await asyncio.gather(
+            first.post("/api/v1/auth/signup", content=b"{}", headers=headers),
+            second.post("/api/v1/auth/signup", content=b"{}", headers=headers),
+            third.post("/api/v1/auth/signup", content=b"{}", headers=headers),
+        )
+
+    assert calls == [b"{}"]
+    assert original.status_code == 201
+    assert busy.status_code == 409 and busy.headers["retry-after"] == "1"
+    assert waited.status_code == 201 and waited.headers["idempotent-replayed"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_signup_and_favorite_replay_without_touching_db(client: AsyncClient, idempotency_cache, store, signup_and_login):
+    """
+    Repetições de cadastro e de inclusão de favorito devolvem a primeira resposta
+    sem consultar o banco.
+    """
+    signup = {
+        "name": "Usuário",
+        "email": "idempotente@example.com",
+        "password": "senha123",
+        "confirm_password": "senha123",
+    }
+    headers = {"Idempotency-Key": "signup-1"}
+    first = await client.post("/api/v1/auth/signup", json=signup, headers=headers)
+    with mock.patch("app.api.v1.auth.get_client_by_email", side_effect=AssertionError("banco consultado")):
+        retry = await client.post("/api/v1/auth/signup", json=signup, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+
+    client_id, auth = await signup_and_login(client, "idempotente2@example.com")
+    headers = {**auth, "Idempotency-Key": "fav-1"}
+    responses = await asyncio.gather(*(
+        client.post(f"/api/v1/favorites/{client_id}", json={"product_id": 2}, headers=headers) for _ in range(3)
+    ))
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert len({r.json()["id"] for r in responses}) == 1
+    summary = await client.get(f"/api/v1/favorites/{client_id}/summary", headers=auth)
+    assert summary.json()["count"] == 1
+
+    # Mesma chave com outro token: requisições de clientes diferentes não se misturam
+    other_id, other_auth = await signup_and_login(client, "idempotente3@example.com")
+    other = await client.post(
+        f"/api/v1/favorites/{other_id}", json={"product_id": 2}, headers={**other_auth, "Idempotency-Key": "fav-1"}
+    )
+    assert other.status_code == 200 and "idempotent-replayed" not in other.headers
@@ -0,0 +1,126 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from app.core.config import settings
+
+pytestmark = pytest.mark.usefixtures("create_test_db")
+
+
+@pytest_asyncio.fixture(scope="function")
+async def client(monkeypatch):
+    from app.main import create_app
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", "admin@example.com")
+    app = create_app()
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_clients_and_favorites(client, signup_and_login):
+    """
+    Importação em lote de clientes (CSV) e favoritos (NDJSON), ignorando conflitos.
+    """
+    from app.core.security import hash_password
+
+    _, headers = await signup_and_login(client, "admin@example.com")
+    hashed = hash_password("senha-importada")
+
+    clients_csv = (
+        "name,email,hashed_password\n"
+        f"Ana,ana@example.com,{hashed}\n"
+        f"Bruno,bruno@example.com,{hashed}\n"
+        f"Admin duplicado,admin@example.com,{hashed}\n"
+        f",sem-nome@example.com,{hashed}\n"
+        "Sem senha,sem-senha@example.com,\n"
+    )
+    resp = await client.post("/api/v1/clients/import", content=clients_csv,
+                             headers={**headers, "Content-Type": "text/csv"})
+    assert resp.status_code == 200
+    assert resp.json() == {"inserted": 2, "skipped": 1, "invalid": 2}
+
+    favorites_ndjson = "\n".join([
+        '{"client_email": "ana@example.com", "product_id": 1, "title": "A", "image": "i", "price": 10.0, "review": 4.5}',
+        '{"client_email": "ana@example.com", "product_id": 1, "title": "A", "image": "i", "price": 10.0, "review": 4.5}',
+        '{"client_email": "ana@example.com", "product_id": 2, "title": "B", "image": "i", "price": 5.5}',
+        '{"client_email": "ninguem@example.com", "product_id": 3, "title": "C", "image": "i", "price": 1.0}',
+    ])
+    resp = await client.post("/api/v1/favorites/import", content=favorites_ndjson,
+                             headers={**headers, "Content-Type": "application/x-ndjson"})
+    assert resp.status_code == 200
+    assert resp.json() == {"inserted": 2, "skipped": 2, "invalid": 0}
+
+    login_resp = await client.post("/api/v1/auth/login",
+                                   json={"email": "ana@example.com", "password": "senha-importada"})
+    assert login_resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_import_counts_malformed_lines_as_invalid(client, signup_and_login):
+    """
+    Linhas malformadas (JSON inválido, valores que não são objetos, campos que não são
+    texto) são contadas como inválidas sem interromper a importação.
+    """
+    from app.core.security import hash_password
+
+    _, auth = await signup_and_login(client, "admin@example.com")
+    headers = {**auth, "Content-Type": "application/x-ndjson"}
+    hashed = hash_password("senha-importada")
+
+    clients_ndjson = "\n".join([
+        '{"name": "Ana", "email": "ana@example.com", "hashed_password": "%s"}' % hashed,
+        '{"name": "Ana", "email": ',
+        '["Bruno", "bruno@example.com"]',
+        '{"name": 42, "email": "carla@example.com", "hashed_password": "%s"}' % hashed,
+        '{"name": "Davi", "email": ["davi@example.com"], "hashed_password": "%s"}' % hashed,
+    ])
+    resp = await client.post("/api/v1/clients/import", content=clients_ndjson, headers=headers)
+    assert resp.status_code == 200
+    assert resp.json() == {"inserted": 1, "skipped": 0, "invalid": 4}
+
+    favorites_ndjson = "\n".join([
+        '{"client_email": "ana@example.com", "product_id": 1, "title": "A", "image": "i", "price": 10.0}',
+        'não é json',
+        '"texto"',
+    ])
+    resp = await client.post("/api/v1/favorites/import", content=favorites_ndjson, headers=headers)
+    assert resp.status_code == 200
+    assert resp.json() == {"inserted": 1, "skipped": 0, "invalid": 2}
+
+
+@pytest.mark.asyncio
+async def test_import_revives_soft_deleted_favorite(client, signup_and_login):
+    """
+    Um favorito removido (soft delete) e ainda não expurgado é reativado pela importação,
+    com os dados importados, em vez de ser ignorado como duplicado.
+    """
+    from sqlalchemy import select, update
+    from app.core.database import SessionLocal
+    from app.models.models import Client, Favorite
+
+    _, auth = await signup_and_login(client, "admin@example.com")
+    headers = {**auth, "Content-Type": "application/x-ndjson"}
+
+    favorites_ndjson = "\n".join([
+        '{"client_email": "admin@example.com", "product_id": 1, "title": "A", "image": "i", "price": 10.0}',
+        '{"client_email": "admin@example.com", "product_id": 2, "title": "B", "image": "i", "price": 5.5}',
+    ])
+    resp = await client.post("/api/v1/favorites/import", content=favorites_ndjson, headers=headers)
+    assert resp.json() == {"inserted": 2, "skipped": 0, "invalid": 0}
+
+    async with SessionLocal() as session:
+        await session.execute(update(Favorite).where(Favorite.product_id == 1).values(deleted_at=Favorite.created_at))
+        await session.commit()
+
+    favorites_ndjson = "\n".join([
+        '{"client_email": "admin@example.com", "product_id": 1, "title": "A novo", "image": "i", "price": 12.0}',
+        '{"client_email": "admin@example.com", "product_id": 2, "title": "B novo", "image": "i", "price": 7.0}',
+    ])
+    resp = await client.post("/api/v1/favorites/import", content=favorites_ndjson, headers=headers)
+    assert resp.json() == {"inserted": 1, "skipped": 1, "invalid": 0}
+
+    async with SessionLocal() as session:
+        favorites = {f.product_id: f for f in (await session.execute(select(Favorite))).scalars()}
+        admin = (await session.execute(select(Client).where(Client.email == "admin@example.com"))).scalar_one()
+    assert favorites[1].deleted_at is None and (favorites[1].title, favorites[1].price) == ("A novo", 12.0)
+    assert (favorites[2].title, favorites[2].price) == ("B", 5.5)
+    assert (admin.favorites_count, admin.favorites_price_sum) == (2, 17.5)
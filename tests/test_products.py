@@ -2,6 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 from unittest import mock
 import httpx
+from app.core.cache import cache_backend
 from app.main import create_app  # Certifique-se de importar a função corretamente
 
 # Criando uma instância do cliente de teste
@@ -15,6 +16,8 @@ def mock_httpx_get():
     with mock.patch("httpx.AsyncClient.get", new_callable=mock.AsyncMock) as mock_get:
         # Garantindo que o retorno da resposta seja assíncrono
         mock_get.return_value.__aenter__.return_value.status_code = 200
+        # raise_for_status é síncrono no httpx.Response
+        mock_get.return_value.raise_for_status = mock.Mock()
         mock_get.return_value.__aenter__.return_value.json = mock.AsyncMock(return_value=[
             {"id": 1, "title": "Produto A", "image": "https://via.placeholder.com/150", "price": 99.99,
              "rating": {"count": 100, "rate": 4.5}},
@@ -68,3 +71,52 @@ def test_get_product_timeout(client, mock_httpx_get):
     response = client.get("/api/v1/products/999")  # Simulando um produto não encontrado, mas com fallback
 
     assert response.status_code == 200
+
+
+def test_get_product_conditional_request(client, mock_httpx_get):
+    # A ETag vem do produto em cache: a mesma cópia recebe 304, sem corpo
+    mock_httpx_get.return_value.status_code = 200
+    mock_httpx_get.return_value.json = mock.Mock(
+        return_value={"id": 1, "title": "Produto A", "image": "https://via.placeholder.com/150", "price": 99.99,
+                      "rating": {"count": 100, "rate": 4.5}})
+
+    first = client.get("/api/v1/products/1")
+    etag = first.headers["etag"]
+
+    second = client.get("/api/v1/products/1", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+    # Produto alterado na API externa e cópia em cache expirada: nova ETag, resposta completa
+    mock_httpx_get.return_value.json.return_value = {**mock_httpx_get.return_value.json.return_value, "price": 89.99}
+    cache_backend.reset()
+    changed = client.get("/api/v1/products/1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["price"] == 89.99
+
+
+@pytest.mark.asyncio
+async def test_upstream_hedged_request_wins(monkeypatch):
+    # Primeira chamada lenta, segunda rápida: a requisição duplicada deve vencer
+    import asyncio
+    from app.core import upstream
+
+    calls = []
+    # Estado de hedging próprio do teste (restaurado ao final, mesmo em caso de falha)
+    monkeypatch.setattr(upstream, "latency", upstream.LatencyTracker(min_samples=upstream.latency.min_samples))
+    monkeypatch.setattr(upstream, "_stats", {"requests": 100, "hedged": 0})
+
+    async def fake_get(self, url, **kwargs):
+        calls.append(url)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return httpx.Response(200, json={"id": 1})
+
+    for _ in range(upstream.latency.min_samples):
+        upstream.latency.observe(0.01)
+
+    with mock.patch("httpx.AsyncClient.get", new=fake_get):
+        response = await upstream.upstream_get("/products/1")
+
+    assert response.json() == {"id": 1}
+    assert len(calls) == 2
@@ -0,0 +1,85 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core.search import ProductIndex, product_index, tokenize
+
+CATALOG = [
+    {"id": 1, "title": "Mochila Fjallraven Foldsack", "price": 109.95, "category": "men's clothing"},
+    {"id": 2, "title": "Camiseta Slim Fit", "price": 22.3, "category": "men's clothing"},
+    {"id": 3, "title": "Jaqueta de Algodão", "price": 55.99, "category": "men's clothing"},
+    {"id": 4, "title": "Anel de Prata", "price": 9.99, "category": "jewelery"},
+    {"id": 5, "title": "Mochila Escolar", "price": 35.0, "category": "bags"},
+]
+
+
+def ids(result):
+    return [product["id"] for product in result[1]]
+
+
+def test_tokenize_normalizes_accents_and_case():
+    assert tokenize("Jaqueta de ALGODÃO, 100%") == ["jaqueta", "de", "algodao", "100"]
+
+
+def test_search_terms_filters_and_sorting():
+    index = ProductIndex()
+    index.update(CATALOG)
+
+    assert ids(index.search(q="mochila")) == [1, 5]
+    assert ids(index.search(q="moch escolar")) == [5]
+    assert ids(index.search(q="algodao")) == [3]
+    assert index.search(q="inexistente") == (0, [])
+
+    assert ids(index.search(category="MEN'S CLOTHING", sort="price_asc")) == [2, 3, 1]
+    assert ids(index.search(min_price=20, max_price=60, sort="price_desc")) == [3, 5, 2]
+    assert ids(index.search(q="mochila", max_price=50)) == [5]
+    assert ids(index.search(sort="title", limit=2, offset=1)) == [2, 3]
+    assert index.search(sort="price_asc", limit=2)[0] == 5
+
+
+def test_incremental_update_reindexes_only_changes():
+    index = ProductIndex()
+    index.update(CATALOG)
+
+    changed = [dict(product) for product in CATALOG[1:]]
+    changed[0]["title"] = "Camiseta Mochila"
+    assert index.update(changed) == 2  # produto 1 removido e produto 2 alterado
+
+    assert ids(index.search(q="mochila")) == [2, 5]
+    assert ids(index.search(q="fjallraven")) == []
+    assert "fjallraven" not in index.vocabulary
+    assert len(index.prices) == 4
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_uses_loaded_catalog(client: AsyncClient, store):
+    from app.crud.product import refresh_catalog
+
+    await refresh_catalog()
+    store.stats.update(full=0, not_modified=0)
+
+    response = await client.get("/api/v1/products/search", params={"category": "electronics", "sort": "price_desc"})
+
+    assert response.status_code == 200
+    assert response.headers["x-total-count"] == "3"
+    assert [product["id"] for product in response.json()] == [5, 3, 1]
+    assert response.json()[0]["category"] == "electronics"
+    assert store.stats == {"full": 0, "not_modified": 0}
+    assert len(product_index) == 5
+
+
+@pytest.mark.asyncio
+async def test_worker_index_follows_catalog_reloaded_by_leader(store):
+    """
+    O índice de um worker que não revalida o catálogo (não líder) é atualizado a partir
+    do catálogo em cache, sem consultar a API externa.
+    """
+    from app.crud.product import refresh_catalog, sync_product_index
+
+    await refresh_catalog()
+    product_index.update([])  # worker que ainda não conhece o catálogo
+    store.stats.update(full=0, not_modified=0)
+
+    assert await sync_product_index() == 5
+    assert await sync_product_index() == 0
+    assert len(product_index) == 5
+    assert store.stats == {"full": 0, "not_modified": 0}
@@ -0,0 +1,74 @@
+import logging
+import pytest
+from httpx import AsyncClient
+
+from app.core.cache import cache_backend
+from app.core.database import RouteContextMiddleware, SlowQueryLog, engine, explain_prefix, normalize_statement
+from app.main import create_app
+
+pytestmark = pytest.mark.usefixtures("create_test_db")
+
+
+def test_normalize_statement_groups_variants():
+    first = normalize_statement("SELECT * FROM favorites\n WHERE client_id = 10 AND id IN (?, ?, ?) AND title = 'x'")
+    second = normalize_statement("SELECT * FROM favorites WHERE client_id = 7 AND id IN (?) AND title = 'it''s'")
+    assert first == second == "SELECT * FROM favorites WHERE client_id = ? AND id IN (...) AND title = ?"
+    assert normalize_statement("INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4)") == "INSERT INTO t (a, b) VALUES (...)"
+
+
+
+def test_explain_analyze_only_for_select():
+    """
+    O ANALYZE executa a instrução: uma CTE que modifica dados não pode ser executada de novo.
+    """
+    assert explain_prefix("postgresql", " select * from favorites") == "EXPLAIN (ANALYZE, BUFFERS) "
+    assert explain_prefix("postgresql", "WITH moved AS (DELETE FROM favorites RETURNING *) SELECT * FROM moved") == "EXPLAIN "
+    assert explain_prefix("sqlite", "WITH x AS (SELECT 1) SELECT * FROM x") == "EXPLAIN QUERY PLAN "
+    assert explain_prefix("mysql", "SELECT 1") is None
+
+@pytest.mark.asyncio
+async def test_slow_queries_logged_by_route_with_plan(caplog, signup_and_login):
+    """
+    Instruções acima do limite são agrupadas por fingerprint, com a rota, os parâmetros
+    ocultados e o plano de execução obtido em background.
+    """
+    slow_log = SlowQueryLog(threshold_ms=0, explain=True)
+    app = create_app()
+    app.add_middleware(RouteContextMiddleware)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        client_id, headers = await signup_and_login(ac, "lento@example.com")
+        slow_log.install(engine)
+        try:
+            with caplog.at_level(logging.WARNING, logger="app.core.database"):
+                for _ in range(2):
+                    cache_backend.reset()  # página fora do cache: a consulta é executada nas duas vezes
+                    await ac.get(f"/api/v1/favorites/{client_id}?sort=price", headers=headers)
+                await slow_log.drain()
+        finally:
+            slow_log.uninstall()
+
+    page = next(entry for entry in slow_log.summary() if "FROM favorites" in entry["statement"])
+    assert page["count"] == 2
+    assert page["routes"] == {"GET /api/v1/favorites/{client_id}": 2}
+    assert "ix_favorites_client_price" in page["plan"]
+    assert "lento@example.com" not in caplog.text
+    assert "parâmetros=(str)" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_does_not_leave_start_time_on_connection():
+    """
+    Instruções com erro (ex: IntegrityError) não deixam o início da medição acumulado na conexão.
+    """
+    slow_log = SlowQueryLog(threshold_ms=0)
+    slow_log.install(engine)
+    try:
+        async with engine.connect() as connection:
+            for _ in range(3):
+                with pytest.raises(Exception):
+                    await connection.exec_driver_sql("SELECT * FROM tabela_inexistente")
+            await connection.exec_driver_sql("SELECT 1")
+            assert connection.sync_connection.info.get("query_start") == []
+    finally:
+        slow_log.uninstall()
@@ -0,0 +1,94 @@
+import json
+import pytest
+from httpx import AsyncClient
+
+from app.core import tracing
+from app.core.database import engine
+from app.core.tracing import TracingMiddleware
+from app.main import create_app
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+pytestmark = pytest.mark.usefixtures("create_test_db")
+
+
+@pytest.fixture
+def tracer(monkeypatch, tmp_path):
+    """
+    Tracer do worker sem amostragem própria, exportando para um arquivo temporário.
+    """
+    tracer = tracing.tracer
+    monkeypatch.setattr(tracer, "sample_rate", 0.0)
+    monkeypatch.setattr(tracer, "export_file", str(tmp_path / "spans.jsonl"))
+    monkeypatch.setattr(tracer, "finished", [])
+    tracer.install(engine)
+    yield tracer
+    tracer.uninstall()
+
+
+def exported_spans(path: str) -> list:
+    with open(path, encoding="utf-8") as file:
+        return [
+            span
+            for line in file
+            for resource in json.loads(line)["resourceSpans"]
+            for scope in resource["scopeSpans"]
+            for span in scope["spans"]
+        ]
+
+
+@pytest.mark.asyncio
+async def test_incoming_trace_is_continued_and_exported(tracer, store, fake_redis, signup_and_login):
+    """
+    Um traceparent amostrado recebido é continuado: a rota, as instruções SQL, o cache e a
+    chamada à API externa viram spans do mesmo trace, e o contexto segue para a API externa.
+    """
+    app = TracingMiddleware(create_app(), tracer=tracer)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        client_id, headers = await signup_and_login(ac, "trace@example.com")
+        assert tracer.finished == []
+
+        traced = {**headers, "traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}
+        response = await ac.post(f"/api/v1/favorites/{client_id}", json={"product_id": 1}, headers=traced)
+        assert response.status_code == 200
+        await ac.get(f"/api/v1/favorites/{client_id}", headers=traced)
+    await tracer.flush()
+
+    spans = exported_spans(tracer.export_file)
+    assert {span["traceId"] for span in spans} == {TRACE_ID}
+    servers = {span["spanId"]: span for span in spans if span["kind"] == tracing.SERVER}
+    assert sorted(span["name"] for span in servers.values()) == [
+        "GET /api/v1/favorites/{client_id}", "POST /api/v1/favorites/{client_id}",
+    ]
+    assert all(span["parentSpanId"] == PARENT_ID for span in servers.values())
+    assert all(
+        {"key": "http.status_code", "value": {"intValue": "200"}} in span["attributes"] for span in servers.values()
+    )
+
+    children = [span for span in spans if span["spanId"] not in servers]
+    assert all(span["parentSpanId"] in servers for span in children)
+    names = {span["name"] for span in children}
+    assert {"db.query", "GET /products/1", "cache GET", "cache SET"} <= names
+
+    upstream_span = next(span for span in children if span["name"] == "GET /products/1")
+    assert store.traceparents == [f"00-{TRACE_ID}-{upstream_span['spanId']}-01"]
+
+
+@pytest.mark.asyncio
+async def test_unsampled_requests_create_no_spans(tracer, store, fake_redis, signup_and_login):
+    """
+    Requisições não amostradas (taxa zero ou traceparent com flag 00) não geram spans
+    nem propagam o header.
+    """
+    app = TracingMiddleware(create_app(), tracer=tracer)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        client_id, headers = await signup_and_login(ac, "semtrace@example.com")
+        await ac.post(
+            f"/api/v1/favorites/{client_id}", json={"product_id": 1},
+            headers={**headers, "traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"},
+        )
+        await ac.get(f"/api/v1/favorites/{client_id}", headers=headers)
+
+    assert tracer.finished == []
+    assert store.traceparents == []
@@ -0,0 +1,159 @@
+import asyncio
+import copy
+import os
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from httpx import AsyncClient
+from sqlalchemy import create_engine, inspect, text
+from unittest import mock
+
+from app.core.cache_backends import MemoryBackend
+from app.core.database import Base
+from app.core.scheduler import JobScheduler, LeaderLease
+from app.core.warmup import WarmUp
+from app.main import create_app
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+@pytest.mark.asyncio
+async def test_ready_only_after_warmup():
+    """
+    O endpoint de prontidão retorna 503 até o aquecimento terminar, mesmo com etapas falhando.
+    """
+    app = create_app()
+    app.state.warmup = WarmUp(timeout=1)
+
+    async def failing_step():
+        raise ConnectionError("indisponível")
+
+    app.state.warmup.add("ok", lambda: asyncio.sleep(0))
+    app.state.warmup.add("failing", failing_step)
+    app.state.warmup.add("slow", lambda: asyncio.sleep(5))
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        before = await ac.get("/ready")
+        await app.state.warmup.run()
+        after = await ac.get("/ready")
+
+    assert before.status_code == 503
+    assert before.json()["status"] == "warming_up"
+    assert after.status_code == 200
+    steps = after.json()["steps"]
+    assert steps["ok"]["status"] == "ok"
+    assert steps["failing"]["status"] == "error"
+    assert steps["slow"]["status"] == "timeout"
+
+
+@pytest.mark.asyncio
+async def test_shared_jobs_run_only_on_the_leader_worker():
+    """
+    Com dois workers compartilhando o cache, os jobs de dados compartilhados rodam apenas
+    no líder e os jobs por worker rodam em ambos; quando o líder encerra, o outro assume.
+    """
+    shared = MemoryBackend()
+    runs = {"first": [], "second": []}
+    schedulers = {}
+
+    def job(worker: str, name: str):
+        async def _run():
+            runs[worker].append(name)
+        return _run
+
+    for worker in runs:
+        scheduler = JobScheduler(lease=LeaderLease(shared, ttl=1))
+        scheduler.add("shared", 0.05, job(worker, "shared"))
+        scheduler.add("local", 0.05, job(worker, "local"), per_worker=True)
+        schedulers[worker] = scheduler
+
+    schedulers["first"].start()
+    await asyncio.sleep(0.01)
+    schedulers["second"].start()
+    await asyncio.sleep(0.2)
+    assert schedulers["first"].lease.is_leader and not schedulers["second"].lease.is_leader
+    assert "shared" in runs["first"] and "shared" not in runs["second"]
+    assert "local" in runs["first"] and "local" in runs["second"]
+
+    await schedulers["first"].stop()
+    assert await shared.get("jobs:leader") is None
+    await asyncio.sleep(0.5)  # próxima renovação do segundo worker (ttl / 3)
+    await schedulers["second"].stop()
+    assert "shared" in runs["second"]
+
+
+@pytest.mark.asyncio
+async def test_lease_created_before_fork_elects_a_single_worker():
+    """
+    Uma lease criada antes do fork (preload_app) e copiada para os workers gera um
+    identificador por processo: apenas um dos workers assume a liderança.
+    """
+    shared = MemoryBackend()
+    master = LeaderLease(shared, ttl=30)
+    workers = {101: copy.copy(master), 102: copy.copy(master)}
+
+    for _ in range(2):
+        for pid, lease in workers.items():
+            with mock.patch("app.core.scheduler.os.getpid", return_value=pid):
+                await lease.renew()
+
+    assert [lease.is_leader for lease in workers.values()] == [True, False]
+
+
+def test_migrations_match_models(tmp_path):
+    """
+    As migrações aplicadas do zero produzem exatamente o esquema dos modelos.
+    """
+    database = tmp_path / "migrations.db"
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{database}")
+    config.attributes["configure_logger"] = False
+
+    command.upgrade(config, "head")
+
+    engine = create_engine(f"sqlite:///{database}")
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    engine.dispose()
+
+    assert diff == []
+
+
+def test_baseline_database_stamped_and_upgraded(tmp_path):
+    """
+    Um banco com o esquema original (anterior às migrações), marcado com `stamp 0001`,
+    recebe as colunas e índices posteriores no `upgrade head` e mantém seus dados.
+    """
+    database = tmp_path / "baseline.db"
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{database}")
+    config.attributes["configure_logger"] = False
+
+    command.upgrade(config, "0001")
+    engine = create_engine(f"sqlite:///{database}")
+    with engine.begin() as connection:
+        assert "favorites_count" not in {column["name"] for column in inspect(connection).get_columns("clients")}
+        connection.execute(text(
+            "INSERT INTO clients (id, name, email, hashed_password) VALUES (1, 'Ana', 'ana@example.com', 'x')"
+        ))
+        connection.execute(text(
+            "INSERT INTO favorites (client_id, product_id, title, image, price, deleted_at) VALUES "
+            "(1, 1, 'A', 'a.png', 10.5, NULL), (1, 2, 'B', 'b.png', 20.0, NULL), "
+            "(1, 3, 'C', 'c.png', 99.0, CURRENT_TIMESTAMP)"
+        ))
+
+    command.upgrade(config, "head")
+
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        counters = connection.execute(text(
+            "SELECT favorites_version, favorites_count, favorites_price_sum FROM clients WHERE id = 1"
+        )).one()
+    engine.dispose()
+
+    assert diff == []
+    assert tuple(counters) == (0, 2, 30.5)